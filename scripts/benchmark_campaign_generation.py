@@ -0,0 +1,84 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import importlib.resources
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.fuzzing.generators import FuzzGeneratorFactory
+from src.ecstatic.fuzzing.generators.FuzzGenerator import fill_out_defaults
+from src.ecstatic.util.UtilClasses import Benchmark, BenchmarkRecord
+
+
+def scaled_configuration_space(tool: str, copies: int) -> str:
+    """Writes the tool's configuration space with every option repeated copies times, and returns its location."""
+    with importlib.resources.files("src.resources.configuration_spaces").joinpath(f"{tool}_config.json").open() as f:
+        space = json.load(f)
+    space["options"] = [{**o, "name": o["name"] if i == 0 else f'{o["name"]}_{i}'}
+                        for i in range(copies) for o in space["options"]]
+    fd, location = tempfile.mkstemp(suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(space, f)
+    return location
+
+
+def main():
+    """
+    Measures how fast a tool's generator derives mutants (mutate_config) and whole campaigns (generate_campaign,
+    with full campaigns on a single benchmark). --copies scales the configuration space up, to see how generation
+    grows with the number of options.
+    """
+    p = argparse.ArgumentParser(description="Benchmark campaign generation.")
+    p.add_argument("tool", help="Tool whose configuration space and grammar to use, e.g., soot.")
+    p.add_argument("--copies", type=int, default=1, help="How many times to repeat each option.")
+    p.add_argument("--seeds", type=int, default=20, help="Number of seeds to mutate.")
+    p.add_argument("--campaigns", type=int, default=5, help="Number of campaigns to generate.")
+    args = p.parse_args()
+
+    random.seed(0)
+    model = scaled_configuration_space(args.tool, args.copies)
+    grammar = importlib.resources.files("src.resources.grammars").joinpath(f"{args.tool}_grammar.json")
+    try:
+        generator = FuzzGeneratorFactory.get_fuzz_generator_for_name(
+            args.tool, model, str(grammar), Benchmark([BenchmarkRecord("program.jar")]), full_campaigns=True)
+    finally:
+        os.remove(model)
+    partial_orders = [p for o in generator.model.get_options() for p in o.partial_orders]
+    print(f'{len(generator.model.get_options())} options, {len(partial_orders)} partial orders.')
+
+    generator.first_run = False
+    seeds = [fill_out_defaults(generator.model, generator.make_new_seed()) for _ in range(args.seeds)]
+    start = time.perf_counter()
+    mutants = sum(len(generator.mutate_config(seed, p)) for seed in seeds for p in partial_orders)
+    elapsed = time.perf_counter() - start
+    print(f'mutate_config: {mutants / elapsed:10.0f} mutants/s')
+
+    generator.first_run = True
+    start = time.perf_counter()
+    jobs = sum(len(generator.generate_campaign()[0].jobs) for _ in range(args.campaigns))
+    elapsed = time.perf_counter() - start
+    print(f'generate_campaign: {args.campaigns / elapsed:8.2f} campaigns/s, {jobs / elapsed:10.0f} jobs/s')
+
+
+if __name__ == "__main__":
+    main()
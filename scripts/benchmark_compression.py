@@ -0,0 +1,84 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.util.Compression import CODECS, compress_file, open_result
+
+
+def synthetic_callgraph(file: str, edges: int):
+    """Writes a call graph in the tab-separated format the call graph readers consume."""
+    classes = [f'org.example.pkg{i % 20}.Class{i}' for i in range(500)]
+    with open(file, 'w') as f:
+        for i in range(edges):
+            caller = random.choice(classes)
+            target = random.choice(classes)
+            f.write(f'<{caller}: void method{i % 50}()>\tvirtualinvoke $r{i % 10}.<{target}: void run()>()\t[]\t'
+                    f'<{target}: void run()>\t[]\n')
+
+
+def main():
+    """
+    Reports, per codec, the compressed size of tool outputs and the throughput of compressing them
+    (as the runners do) and of reading them back line by line (as the readers do).
+    Pass real .raw files from a campaign to get representative numbers; otherwise a synthetic call graph is used.
+    """
+    p = argparse.ArgumentParser(description="Benchmark result compression codecs.")
+    p.add_argument("files", nargs='*', help="Uncompressed tool outputs to benchmark on.")
+    p.add_argument("--edges", type=int, default=500000, help="Size of the synthetic call graph.")
+    p.add_argument("--codecs", nargs='+', choices=CODECS, default=CODECS)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files
+        if len(files) == 0:
+            synthetic_callgraph(f := os.path.join(tmp, 'synthetic.raw'), args.edges)
+            files = [f]
+        original_size = sum(os.path.getsize(f) for f in files)
+        print(f'{len(files)} file(s), {original_size / 1e6:.1f} MB uncompressed')
+        for codec in [None] + args.codecs:
+            copies = []
+            for i, f in enumerate(files):
+                shutil.copyfile(f, copy := os.path.join(tmp, f'{i}.raw'))
+                copies.append(copy)
+            start = time.perf_counter()
+            if codec is not None:
+                copies = [compress_file(c, codec) for c in copies]
+            write_time = time.perf_counter() - start
+            size = sum(os.path.getsize(c) for c in copies)
+            start = time.perf_counter()
+            for c in copies:
+                with open_result(c) as infile:
+                    for _ in infile:
+                        pass
+            read_time = time.perf_counter() - start
+            write = f'{original_size / 1e6 / write_time:8.1f} MB/s' if codec is not None else '       -    '
+            print(f'{str(codec):>5}: {size / 1e6:8.1f} MB ({size / original_size:6.1%}), '
+                  f'compress {write}, read {original_size / 1e6 / read_time:8.1f} MB/s')
+            for c in copies:
+                os.remove(c)
+
+
+if __name__ == "__main__":
+    main()
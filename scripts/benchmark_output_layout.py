@@ -0,0 +1,78 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.util.OutputLayout import shard_directory
+
+
+def populate(folder: str, hashes, shard_depth: int):
+    for h in hashes:
+        directory = shard_directory(folder, h, shard_depth)
+        Path(directory).mkdir(exist_ok=True, parents=True)
+        for name in [f'{h}_target.raw', f'.{h}_target.raw.time', f'.{h}_target.raw.log']:
+            Path(os.path.join(directory, name)).touch()
+
+
+def time_lookups(folder: str, hashes, shard_depth: int) -> float:
+    """Returns the mean latency in microseconds of the existence checks run_job does for each job."""
+    start = time.perf_counter()
+    for h in hashes:
+        directory = shard_directory(folder, h, shard_depth)
+        os.path.exists(os.path.join(directory, f'{h}_target.raw'))
+        os.path.exists(os.path.join(directory, f'{h}_missing.raw'))
+    return (time.perf_counter() - start) / len(hashes) * 1e6
+
+
+def main():
+    """
+    Compares result lookup latency between the flat layout and hash-prefix sharded layouts on a synthetic
+    campaign with --files jobs (three files per job, like a real campaign). Use --location to benchmark on the
+    file system that holds your results, since the benefit of sharding depends heavily on it.
+    """
+    p = argparse.ArgumentParser(description="Benchmark flat vs. sharded campaign layouts.")
+    p.add_argument("--files", type=int, default=100000, help="Number of synthetic jobs.")
+    p.add_argument("--lookups", type=int, default=10000, help="Number of jobs to look up.")
+    p.add_argument("--depths", type=int, nargs='+', default=[0, 1, 2], help="Shard depths to compare.")
+    p.add_argument("--location", default=None, help="Where to create the synthetic campaigns.")
+    args = p.parse_args()
+
+    hashes = [hashlib.md5(str(i).encode()).hexdigest() for i in range(args.files)]
+    sample = random.sample(hashes, min(args.lookups, len(hashes)))
+    with tempfile.TemporaryDirectory(dir=args.location) as root:
+        for depth in args.depths:
+            folder = os.path.join(root, f'depth{depth}')
+            start = time.perf_counter()
+            populate(folder, hashes, depth)
+            populate_time = time.perf_counter() - start
+            start = time.perf_counter()
+            listed = sum(len(files) for _, _, files in os.walk(folder))
+            walk_time = time.perf_counter() - start
+            print(f'depth {depth}: created {listed} files in {populate_time:.2f}s, '
+                  f'walked in {walk_time:.2f}s, mean lookup {time_lookups(folder, sample, depth):.1f}us')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import dill as pickle
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.debugging.AbstractDeltaDebugger import DeltaDebuggingJob, ViolationReproduced
+from src.ecstatic.debugging.ParallelDDMin import ParallelDDMin, ReductionMode
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+
+
+def synthetic_cases(cases: int, units: int, failure_size: int, probe_seconds: float, seed: int) -> \
+        List[Callable[[ReductionMode, SlotScheduler], Dict]]:
+    """Reductions of units to a random failure-inducing subset, where each probe sleeps for probe_seconds."""
+    rng = random.Random(seed)
+
+    def case(failure):
+        def run(mode: ReductionMode, scheduler: SlotScheduler) -> Dict:
+            def test(kept):
+                time.sleep(probe_seconds)
+                return failure <= set(kept)
+            ddmin = ParallelDDMin(test, scheduler, mode)
+            kept = ddmin.reduce(list(range(units)))
+            ddmin.drain()
+            return {"units": units, "kept": len(kept), **ddmin.as_dict()}
+        return run
+
+    return [case(set(rng.sample(range(units), failure_size))) for _ in range(cases)]
+
+
+def violation_cases(results: Path, tool: str, task: str, limit: int) -> List[Callable[[ReductionMode, SlotScheduler],
+                                                                                     Dict]]:
+    """Reductions of the source files of the direct violations that were pickled under results."""
+    from src.ecstatic.debugging.JavaViolationDeltaDebugger import JavaViolationDeltaDebugger
+    from src.ecstatic.readers import ReaderFactory
+    from src.ecstatic.runners import RunnerFactory
+    from src.ecstatic.violation_checkers import ViolationCheckerFactory
+
+    runner = RunnerFactory.get_runner_for_tool(tool)
+    reader = ReaderFactory.get_reader_for_task_and_tool(task, tool)
+    checker = ViolationCheckerFactory.get_violation_checker_for_task(task, tool, jobs=1, ground_truths=None,
+                                                                     reader=reader, output_folder=None)
+    debugger = JavaViolationDeltaDebugger(runner, reader, checker)
+    violations: List[PotentialViolation] = []
+    for f in sorted(results.rglob('pickles/*.pickle')):
+        with open(f, 'rb') as infile:
+            v: PotentialViolation = pickle.load(infile)
+        if v.is_violation and not v.is_transitive and len(v.job1.job.target.sources) > 0:
+            violations.append(v)
+    print(f'Found {len(violations)} direct violations with sources; using {min(limit, len(violations))}.')
+
+    def case(v: PotentialViolation):
+        def run(mode: ReductionMode, scheduler: SlotScheduler) -> Dict:
+            directory = tempfile.mkdtemp()
+            pv = copy.deepcopy(v)
+            pv.job1.job.target = pv.job2.job.target = debugger.snapshot.materialize(v.job1.job.target, directory)
+            # No probe cache, so that neither mode profits from the other's probes.
+            job = DeltaDebuggingJob(ViolationReproduced(pv.partial_orders), pv, runner, reader, checker)
+            debugger.reduction, debugger.scheduler = mode, scheduler
+            if debugger.reduce_files(job, v.job1.job.target, directory, runner.timeout) is None:
+                return {"units": 0, "kept": 0, "mode": mode.name, "probes": 0, "cancelled": 0, "seconds": 0.0}
+            with open(Path(directory) / 'ddmin.json') as f:
+                return json.load(f)
+        return run
+
+    return [case(v) for v in violations[:limit]]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare the time to a minimal program of sequential and speculative "
+                                            "ddmin.")
+    p.add_argument("--results", help="Results folder (e.g., /results/soot/cats-microbenchmark) whose pickled "
+                                     "violations to reduce. Without it, synthetic reductions are run.", type=Path)
+    p.add_argument("--tool", help="Tool that produced the results.", default="soot")
+    p.add_argument("--task", help="Task of the results.", default="cg")
+    p.add_argument("--cases", type=int, default=5, help="Number of violations (or synthetic reductions).")
+    p.add_argument("--slots", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                   help="Slots of the scheduler, i.e., probes that may run at once.")
+    p.add_argument("--units", type=int, default=64, help="Units of a synthetic reduction.")
+    p.add_argument("--failure-size", type=int, default=3, help="Failure-inducing units of a synthetic reduction.")
+    p.add_argument("--probe-seconds", type=float, default=0.05, help="Duration of a synthetic probe.")
+    p.add_argument("--seed", type=int, default=2001)
+    args = p.parse_args()
+
+    if args.results is not None:
+        cases = violation_cases(args.results, args.tool, args.task, args.cases)
+    else:
+        cases = synthetic_cases(args.cases, args.units, args.failure_size, args.probe_seconds, args.seed)
+
+    for mode in ReductionMode:
+        runs = [case(mode, SlotScheduler(args.slots)) for case in cases]
+        print(f'{mode.name.lower():>12}: {statistics.mean(r["seconds"] for r in runs):8.2f} s to minimal program '
+              f'(mean), {statistics.mean(r["probes"] for r in runs):6.1f} probes, '
+              f'{statistics.mean(r["cancelled"] for r in runs):6.1f} cancelled')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import importlib.resources
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.fuzzing.generators import FuzzGeneratorFactory
+from src.ecstatic.fuzzing.CoveringArray import InteractionCoverage
+from src.ecstatic.fuzzing.generators.FuzzGenerator import SeedGenerationMode, fill_out_defaults
+from src.ecstatic.util.UtilClasses import Benchmark, BenchmarkRecord
+
+
+def main():
+    """
+    Measures how many seed configurations per second each seed generation mode produces for a tool, including
+    the one-time setup cost (reading the model, and converting the grammar in GRAMMAR mode), and the t-wise
+    interaction coverage of its first seeds.
+    """
+    p = argparse.ArgumentParser(description="Benchmark seed generation modes.")
+    p.add_argument("tool", help="Tool whose configuration space and grammar to use, e.g., soot.")
+    p.add_argument("--seeds", type=int, default=2000, help="Number of seeds to generate per mode.")
+    p.add_argument("--coverage-seeds", type=int, default=30, help="Number of seeds to measure coverage over.")
+    p.add_argument("--strength", type=int, default=2, help="t for the interaction coverage.")
+    args = p.parse_args()
+
+    model = importlib.resources.files("src.resources.configuration_spaces").joinpath(f"{args.tool}_config.json")
+    grammar = importlib.resources.files("src.resources.grammars").joinpath(f"{args.tool}_grammar.json")
+    for mode in SeedGenerationMode:
+        start = time.perf_counter()
+        generator = FuzzGeneratorFactory.get_fuzz_generator_for_name(
+            args.tool, str(model), str(grammar), Benchmark([BenchmarkRecord("program.jar")]),
+            seed_generation=mode)
+        generator.first_run = False
+        coverage = InteractionCoverage(generator.model, args.strength)
+        coverage.observe(fill_out_defaults(generator.model, generator.make_new_seed()))  # Pays for any lazy setup.
+        setup = time.perf_counter() - start
+        for _ in range(args.coverage_seeds - 1):
+            coverage.observe(fill_out_defaults(generator.model, generator.make_new_seed()))
+        start = time.perf_counter()
+        for _ in range(args.seeds):
+            generator.make_new_seed()
+        elapsed = time.perf_counter() - start
+        print(f'{mode.name:>14}: setup {setup:.2f}s, {args.seeds / elapsed:10.0f} seeds/s, '
+              f'{args.strength}-wise coverage {coverage.coverage():.1%} after {args.coverage_seeds} seeds')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# The modules that the entry points (tester, dispatcher, deltadebugger) and the delta debugging probe script load
+# before doing any work. JobSpec is what deltadebugger imports to rebuild a job.
+ENTRY_MODULES = ['src.ecstatic.Tester',
+                 'src.ecstatic.dispatcher.Dispatcher',
+                 'src.ecstatic.debugging.DeltaDebuggerEntry',
+                 'src.ecstatic.debugging.JobSpec',
+                 'src.ecstatic.debugging.PredicateClient']
+
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Imports module in a fresh interpreter with -X importtime. Returns the cumulative milliseconds of the module,
+    and the cumulative milliseconds of each top-level package it imported.
+    """
+    fin = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    lines = [(int(m.group(2)) / 1000, len(m.group(3)), m.group(4)) for m in
+             map(IMPORTTIME.match, fin.stderr.splitlines()) if m is not None]
+    # Modules are listed when their import finishes, so module's imports are the (more deeply nested) lines right
+    # before it. The interpreter's own start-up imports (e.g., site) come before those.
+    end = max(i for i, (_, _, name) in enumerate(lines) if name == module)
+    total, depth, _ = lines[end]
+    packages: Dict[str, float] = defaultdict(float)
+    for cumulative, indent, name in reversed(lines[:end]):
+        if indent <= depth:
+            break
+        # Submodules are included in their package's cumulative time, so only top-level packages are counted.
+        top = '.'.join(name.split('.')[:3]) if name.startswith('src.') else name.split('.')[0]
+        if top == name:
+            packages[top] = max(packages[top], cumulative)
+    return total, packages
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure the import time of ECSTATIC's entry points with -X importtime.")
+    p.add_argument("modules", nargs='*', default=ENTRY_MODULES, help="Modules to import.")
+    p.add_argument("--runs", type=int, default=5, help="Imports of each module; the median is reported.")
+    p.add_argument("--top", type=int, default=5, help="Number of the most expensive imported packages to list.")
+    p.add_argument("--budget", type=float, help="Import time budget in milliseconds. If set, exits with 1 if a "
+                                                "module's median import time exceeds it.")
+    args = p.parse_args()
+
+    over_budget: List[str] = []
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.runs)]
+        median = statistics.median(r[0] for r in runs)
+        packages = {name: statistics.median(r[1].get(name, 0.0) for r in runs) for name in runs[0][1]}
+        heaviest = sorted(((t, n) for n, t in packages.items() if n != module), reverse=True)[:args.top]
+        print(f'{module:45} {median:8.1f} ms   ' + ', '.join(f'{n} {t:.0f}' for t, n in heaviest))
+        if args.budget is not None and median > args.budget:
+            over_budget.append(module)
+    if over_budget:
+        print(f'Over the budget of {args.budget} ms: {", ".join(over_budget)}')
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.util.JobManifest import JobManifest, MANIFEST_NAME, SUCCESS
+
+
+def main():
+    """
+    Reports how many of the outputs in a results folder are duplicates of another output, per tool and per
+    option under investigation ("base" for the jobs of the base configuration testing phase).
+    Sizes are of the result files as stored, so they reflect compression.
+        python scripts/dedup_report.py results
+    """
+    p = argparse.ArgumentParser(description="Report output deduplication ratios.")
+    p.add_argument("results", help="The results folder (containing one folder per tool).")
+    args = p.parse_args()
+
+    outputs: Dict[Tuple[str, str], int] = defaultdict(int)
+    distinct: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+    logical_bytes: Dict[str, int] = defaultdict(int)
+    physical: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for manifest_file in Path(args.results).rglob(MANIFEST_NAME):
+        campaign = manifest_file.parent
+        tool = campaign.relative_to(args.results).parts[0]
+        for entry in JobManifest(campaign).entries():
+            if entry.status != SUCCESS or entry.output_digest is None:
+                continue
+            key = (tool, entry.option_under_investigation or 'base')
+            outputs[key] += 1
+            distinct[key].add(entry.output_digest)
+            try:
+                size = os.path.getsize(campaign / entry.output)
+            except OSError:
+                continue
+            logical_bytes[tool] += size
+            physical[tool][entry.output_digest] = size
+
+    print('tool,option,outputs,distinct,dedup_ratio')
+    for key in sorted(outputs):
+        print(f'{key[0]},{key[1]},{outputs[key]},{len(distinct[key])},{outputs[key] / len(distinct[key]):.2f}')
+    print()
+    print('tool,logical_mb,deduplicated_mb')
+    for tool in sorted(logical_bytes):
+        print(f'{tool},{logical_bytes[tool] / 1e6:.1f},{sum(physical[tool].values()) / 1e6:.1f}')
+
+
+if __name__ == "__main__":
+    main()
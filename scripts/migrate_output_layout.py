@@ -0,0 +1,44 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.util.OutputLayout import migrate
+
+
+def main():
+    """
+    Moves the results of existing campaigns into the hash-prefix sharded layout used by --shard-depth.
+    Run it on every campaign folder that you want to resume with a non-zero shard depth, e.g.,
+        find results -type d -name 'campaign*' | python scripts/migrate_output_layout.py --shard-depth 2
+    """
+    p = argparse.ArgumentParser(description="Migrate flat campaign folders to a sharded layout.")
+    p.add_argument("campaigns", nargs='*', help="Campaign folders to migrate. Read from stdin if none are given.")
+    p.add_argument("--shard-depth", type=int, default=2, help="Number of hash-prefix directory levels.")
+    args = p.parse_args()
+
+    campaigns = args.campaigns if len(args.campaigns) > 0 else [l.strip() for l in sys.stdin if l.strip() != '']
+    for c in campaigns:
+        moved = migrate(c, args.shard_depth)
+        print(f'{c}: moved {moved} files.')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.ecstatic.fuzzing.Bandit import ThompsonBandit
+from src.ecstatic.util.JobManifest import JobManifest, MANIFEST_NAME, SUCCESS
+
+Pair = Tuple[str, str]  # (partial order, benchmark)
+
+
+class History:
+    """
+    What a recorded results folder (of one tool and benchmark suite) knows: for every (partial order, benchmark)
+    pair that was compared, whether it exhibited a violation, and for every benchmark, the mean job runtime.
+    """
+
+    def __init__(self, results: Path):
+        self.outcomes: Dict[Pair, bool] = {}
+        for f in results.rglob('*.json'):
+            if 'DIRECT' not in f.parts:
+                continue
+            with open(f) as infile:
+                try:
+                    record = json.load(infile)
+                except json.JSONDecodeError:
+                    continue
+            for p in record['partial_orders']:
+                pair = (p, os.path.basename(record['target']))
+                self.outcomes[pair] = self.outcomes.get(pair, False) or record['violated']
+        runtimes: Dict[str, List[float]] = defaultdict(list)
+        for manifest in results.rglob(MANIFEST_NAME):
+            for entry in JobManifest(manifest.parent).entries():
+                if entry.status == SUCCESS:
+                    runtimes[os.path.basename(entry.target)].append(entry.execution_time)
+        self.runtime = {b: statistics.mean(r) for b, r in runtimes.items()}
+        self.default_runtime = statistics.mean(self.runtime.values()) if len(self.runtime) > 0 else 1.0
+        self.partial_orders = sorted({p for p, _ in self.outcomes})
+        self.benchmarks = sorted({b for _, b in self.outcomes})
+
+    def cost(self, benchmark: str) -> float:
+        # Both sides of a partial order are run.
+        return 2 * self.runtime.get(benchmark, self.default_runtime)
+
+
+class RandomStrategy:
+    def __init__(self, history: History, rng: random.Random):
+        self.history, self.rng = history, rng
+
+    def choose(self) -> Tuple[List[str], List[str]]:
+        return (self.rng.sample(self.history.partial_orders, min(2, len(self.history.partial_orders))),
+                self.rng.sample(self.history.benchmarks, min(4, len(self.history.benchmarks))))
+
+    def update(self, pos: List[str], benchmarks: List[str], new: Set[Pair]):
+        pass
+
+
+class GuidedStrategy(RandomStrategy):
+    """The GUIDED weighting of FuzzGenerator: held-out partial orders gain weight, violated ones are dropped."""
+
+    def __init__(self, history: History, rng: random.Random):
+        super().__init__(history, rng)
+        self.po_weights = {p: 1 for p in history.partial_orders}
+        self.benchmark_weights = {b: 1 for b in history.benchmarks}
+
+    def _sample(self, weights: Dict[str, int], k: int) -> List[str]:
+        chosen: Set[str] = set()
+        while len(chosen) < min(k, len(weights)):
+            chosen.update(self.rng.sample(sorted(weights), 1, counts=[weights[w] for w in sorted(weights)]))
+        return list(chosen)
+
+    def choose(self) -> Tuple[List[str], List[str]]:
+        if len(self.po_weights) == 0:
+            return [], []
+        pos = self._sample(self.po_weights, 2)
+        for p in self.po_weights:
+            if p not in pos:
+                self.po_weights[p] += 1
+        return pos, self._sample(self.benchmark_weights, 4)
+
+    def update(self, pos: List[str], benchmarks: List[str], new: Set[Pair]):
+        buggy = {b for _, b in new}
+        for p, _ in new:
+            self.po_weights.pop(p, None)
+        for b in self.benchmark_weights:
+            self.benchmark_weights[b] = self.benchmark_weights[b] + 10 if b in buggy else \
+                max(self.benchmark_weights[b] - 1, 1)
+
+
+class BanditStrategy(RandomStrategy):
+    """The BANDIT strategy of FuzzGenerator."""
+
+    def __init__(self, history: History, rng: random.Random):
+        super().__init__(history, rng)
+        self.po_bandit = ThompsonBandit(rng)
+        self.benchmark_bandit = ThompsonBandit(rng)
+
+    def choose(self) -> Tuple[List[str], List[str]]:
+        benchmarks = self.benchmark_bandit.choose(self.history.benchmarks, 4, cost=self.history.cost)
+        pos = self.po_bandit.choose(self.history.partial_orders, 2,
+                                    cost=lambda p: sum(self.history.cost(b) for b in benchmarks))
+        return pos, benchmarks
+
+    def update(self, pos: List[str], benchmarks: List[str], new: Set[Pair]):
+        for p in pos:
+            self.po_bandit.update(p, any(q == p for q, _ in new))
+        for b in benchmarks:
+            self.benchmark_bandit.update(b, any(c == b for _, c in new))
+
+
+STRATEGIES = {'random': RandomStrategy, 'guided': GuidedStrategy, 'bandit': BanditStrategy}
+
+
+def replay(history: History, strategy, budget: float) -> Tuple[int, float]:
+    """
+    Runs campaigns chosen by strategy until budget CPU seconds are spent. Outcomes are looked up in the history;
+    pairs that were never recorded cost their runtime but cannot exhibit a violation.
+
+    Returns
+    -------
+    The number of distinct violations found, and the CPU seconds spent.
+    """
+    found: Set[Pair] = set()
+    spent = 0.0
+    while spent < budget:
+        pos, benchmarks = strategy.choose()
+        if len(pos) == 0:
+            break
+        new = {(p, b) for p in pos for b in benchmarks if history.outcomes.get((p, b), False)} - found
+        found |= new
+        spent += sum(history.cost(b) for _ in pos for b in benchmarks)
+        strategy.update(pos, benchmarks, new)
+    return len(found), spent
+
+
+def main():
+    """
+    Offline replay of partial order selection strategies against a recorded results folder, e.g.,
+        python scripts/replay_strategies.py results/soot/cats-microbenchmark --budget 86400
+    Histories with full campaigns (--full-campaigns) give exact replays, since every pair has a recorded outcome.
+    """
+    p = argparse.ArgumentParser(description="Score fuzzing strategies against recorded campaigns.")
+    p.add_argument("results", help="Results folder of one tool and benchmark.")
+    p.add_argument("--budget", type=float, default=24 * 3600, help="CPU seconds per replay.")
+    p.add_argument("--trials", type=int, default=20, help="Replays per strategy.")
+    p.add_argument("--strategies", nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    history = History(Path(args.results))
+    print(f'{len(history.outcomes)} recorded pairs, {len([v for v in history.outcomes.values() if v])} violations.')
+    print('strategy,mean_violations,stdev,violations_per_cpu_hour')
+    for name in args.strategies:
+        scores = []
+        rates = []
+        for trial in range(args.trials):
+            found, spent = replay(history, STRATEGIES[name](history, random.Random(args.seed + trial)), args.budget)
+            scores.append(found)
+            rates.append(found / (spent / 3600) if spent > 0 else 0.0)
+        print(f'{name},{statistics.mean(scores):.2f},{statistics.pstdev(scores):.2f},{statistics.mean(rates):.3f}')
+
+
+if __name__ == "__main__":
+    main()
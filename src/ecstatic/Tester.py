@@ -25,38 +25,57 @@ import pickle
 import random
 import subprocess
 import time
+from collections import Counter, defaultdict
 from functools import partial
 from multiprocessing.dummy import Pool
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum_actions import enum_action
 
 from tqdm import tqdm
 
+from src.ecstatic.debugging.DeltaDebuggingPlanner import DeltaDebuggingPlanner
 from src.ecstatic.debugging.JavaViolationDeltaDebugger import JavaViolationDeltaDebugger
+from src.ecstatic.debugging.ParallelDDMin import ReductionMode
+from src.ecstatic.debugging.ViolationConfirmer import ViolationConfirmer
+from src.ecstatic.fuzzing.ConfigurationSampler import DEFAULT_MAX_OPTIONS
+from src.ecstatic.fuzzing.FailurePredictor import FailurePredictor, DEFAULT_EXPLORATION_RATE
 from src.ecstatic.fuzzing.generators import FuzzGeneratorFactory
-from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator, FuzzOptions
+from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator, FuzzOptions, SeedGenerationMode, \
+    DEFAULT_MAX_SEEDS_PER_CAMPAIGN
 from src.ecstatic.readers import ReaderFactory
 from src.ecstatic.runners import RunnerFactory
 from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
 from src.ecstatic.util.BenchmarkReader import BenchmarkReader
+from src.ecstatic.util.BlobStore import BlobStore
+from src.ecstatic.util.Compression import CODECS
+from src.ecstatic.util.JobManifest import get_manifest
 from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.SeenSet import SeenSet
+from src.ecstatic.util.SlotScheduler import SlotScheduler
 from src.ecstatic.util.UtilClasses import FuzzingCampaign, Benchmark, \
-    BenchmarkRecord
+    BenchmarkRecord, FuzzingJob, FinishedFuzzingJob
 from src.ecstatic.util.Violation import Violation
 from src.ecstatic.violation_checkers import ViolationCheckerFactory
 from src.ecstatic.violation_checkers.AbstractViolationChecker import AbstractViolationChecker
+from src.ecstatic.violation_checkers.ComparisonCache import ComparisonCache
 
 
 logger = logging.getLogger(__name__)
 
 
+def run_job_on_target(runner: AbstractCommandLineToolRunner, job: FuzzingJob, output_folder: str) -> \
+        Tuple[str, Optional[FinishedFuzzingJob]]:
+    return job.target.name, runner.run_job(job, output_folder=output_folder)
+
+
 class ToolTester:
 
     def __init__(self, generator, runner: AbstractCommandLineToolRunner, debugger: Optional[JavaViolationDeltaDebugger],
                  results_location: str,
                  num_processes: int, fuzzing_timeout: int, checker: AbstractViolationChecker,
-                 seed: int):
+                 seed: int, planner: Optional[DeltaDebuggingPlanner] = None,
+                 confirmer: Optional[ViolationConfirmer] = None):
         self.generator: FuzzGenerator = generator
         self.runner: AbstractCommandLineToolRunner = runner
         self.debugger: JavaViolationDeltaDebugger = debugger
@@ -66,6 +85,9 @@ class ToolTester:
         self.fuzzing_timeout = fuzzing_timeout
         self.checker = checker
         self.seed = seed
+        self.planner = planner if planner is not None else DeltaDebuggingPlanner()
+        # If set, violations are rerun before they are delta debugged, and those that do not reproduce are dropped.
+        self.confirmer = confirmer
 
     def read_violation_from_file(self, file: str) -> Violation:
         with open(file, 'rb') as f:
@@ -91,25 +113,57 @@ class ToolTester:
             with open(Path(campaign_folder) / "fuzzer_state.json", 'w') as f:
                 json.dump(generator_state, f)
 
-            partial_run_job = partial(self.runner.run_job, output_folder=campaign_folder)
-            with Pool(self.num_processes) as p:
-                results = []
-                for r in tqdm(p.imap(partial_run_job, campaign.jobs), total=len(campaign.jobs)):
-                    results.append(r)
-            results = [r for r in results if r is not None and r.results_location is not None]
-            print(f'Campaign {campaign_index} finished (time {time.time() - campaign_start_time} seconds)')
             violations_folder = Path(campaign_folder) / 'violations'
             self.checker.output_folder = violations_folder
-            print(f'Now checking for violations.')
+            # Without a comparison cache, the violations of an earlier run of this campaign are reloaded wholesale,
+            # if that run checked all of them.
+            stream = self.checker.comparison_cache is not None or not self.checker.is_checked()
             Path(violations_folder).mkdir(exist_ok=True)
-            violations: List[PotentialViolation] = self.checker.check_violations(results)
+
+            partial_run_job = partial(run_job_on_target, self.runner, output_folder=campaign_folder)
+            remaining = Counter(j.target.name for j in campaign.jobs)
+            finished: Dict[str, List[FinishedFuzzingJob]] = defaultdict(list)
+            results: List[FinishedFuzzingJob] = []
+            violations: List[PotentialViolation] = []
+            with Pool(self.num_processes) as p:
+                # Jobs are handed out in campaign order, so the targets that come first finish first.
+                for target, r in tqdm(p.imap_unordered(partial_run_job, campaign.jobs), total=len(campaign.jobs)):
+                    if r is not None and r.results_location is not None:
+                        results.append(r)
+                        finished[target].append(r)
+                    remaining[target] -= 1
+                    if stream and remaining[target] == 0:
+                        # Jobs are only compared to jobs on the same target, so this target's violations are final.
+                        target_violations = self.checker.check_violations(finished.pop(target), load_existing=False)
+                        violations.extend(target_violations)
+                        print(f'Checked {os.path.basename(target)} after {time.time() - campaign_start_time:.1f} '
+                              f'seconds: {len([v for v in target_violations if v.is_violation])} violations '
+                              f'({len([v for v in violations if v.is_violation])} so far).')
+            # Every job of the campaign has been looked up in its manifest, so any legacy results are imported.
+            get_manifest(campaign_folder).complete_legacy_import()
+            self.generator.record_finished(campaign, results, campaign_index, campaign_folder)
+            print(f'Campaign {campaign_index} finished (time {time.time() - campaign_start_time} seconds)')
+            if len(results) > 0:
+                unique = len({r.output_digest for r in results if r.output_digest is not None})
+                print(f'{len(results)} results had {unique} distinct outputs.')
+            if not stream:
+                print(f'Now checking for violations.')
+                violations = self.checker.check_violations(results)
+            self.checker.mark_checked()
             if self.debugger is not None:
+                planned = self.planner.plan(violations)
+                if self.confirmer is not None:
+                    planned = self.confirmer.confirm_all(planned, os.path.join(campaign_folder, 'confirmation'),
+                                                         self.planner)
                 with Pool(max(int(self.num_processes / 2),
                               1)) as p:  # /2 because each delta debugging process needs 2 cores.
-                    direct_violations = [v for v in violations if not v.is_transitive]
-                    print(f'Delta debugging {len(direct_violations)} cases with {self.num_processes} cores.')
-                    p.map(partial(self.debugger.delta_debug, campaign_directory=campaign_folder,
-                                  timeout=self.runner.timeout), direct_violations)
+                    print(f'Delta debugging {len(planned)} cases with {self.num_processes} cores.')
+                    # Cases are started in the planned order, cheapest first.
+                    for v, stats in zip(planned, p.imap(partial(self.debugger.delta_debug,
+                                                                campaign_directory=campaign_folder,
+                                                                timeout=self.runner.timeout), planned)):
+                        if stats is not None:
+                            self.planner.record(v, campaign_folder, stats["probes"], stats["probe_seconds"])
             self.generator.feedback(violations)
             print(f'Done with campaign {campaign_index}!')
             campaign_index += 1
@@ -150,8 +204,45 @@ def main():
     )
     p.add_argument("--seed", help="Seed to use for the random fuzzer", type=int, default=2001)
     p.add_argument("--fuzzing-strategy", action=enum_action(FuzzOptions), default="GUIDED")
+    p.add_argument("--cpu-budget", help="Estimated CPU seconds each campaign may take with the cost_aware "
+                                        "fuzzing strategy.", type=float, default=None)
+    p.add_argument("--max-seeds-per-campaign", help="How many seeds a campaign may merge to keep all --jobs slots "
+                                                    "busy. 1 runs one seed per campaign.",
+                   type=int, default=DEFAULT_MAX_SEEDS_PER_CAMPAIGN)
+    p.add_argument("--no-top-up", help="Do not add mutants for more partial orders to campaigns that are too small "
+                                       "to keep all --jobs slots busy.", action='store_true')
+    p.add_argument("--seed-generation", help="How to generate seed configurations: by fuzzing the tool's grammar, "
+                                             "by sampling the configuration space directly, or from t-wise "
+                                             "covering arrays.",
+                   action=enum_action(SeedGenerationMode), default="GRAMMAR")
+    p.add_argument("--max-options", help="The largest number of options a seed sets with direct seed generation.",
+                   type=int, default=DEFAULT_MAX_OPTIONS)
+    p.add_argument("--interaction-strength", help="t for covering_array seed generation and for the t-wise "
+                                                  "interaction coverage logged per campaign.", type=int, default=2)
     p.add_argument("--full-campaigns", help="Do not sample at all, just do full campaigns.", action='store_true')
     p.add_argument("--hdd-only", help="Disable the delta debugger's CDG phase.", action='store_true')
+    p.add_argument("--parallel-reduction", help="Before delta debugging, remove unneeded source files with ddmin, "
+                                                "testing one candidate at a time (sequential) or several at once "
+                                                "(speculative).",
+                   action=enum_action(ReductionMode), default=None)
+    p.add_argument("--confirm-violations", help="Before delta debugging, rerun both jobs of each violation this "
+                                                "many times, and drop the violations that do not reproduce every "
+                                                "time as flaky.", type=int, default=None)
+    p.add_argument("--no-comparison-cache", help="Do not reuse pairwise comparisons from earlier campaigns.",
+                   action='store_true')
+    p.add_argument("--shard-depth", help="Number of hash-prefix directory levels to store results in "
+                                         "(0 stores all results of a campaign in one folder).", type=int, default=0)
+    p.add_argument("--compression", help="Compress tool outputs with this codec once they are written.",
+                   choices=CODECS, default=None)
+    p.add_argument("--no-seen-set", help="Run jobs even if they were already run in an earlier campaign.",
+                   action='store_true')
+    p.add_argument("--failure-prediction", help="Skip mutant jobs that are predicted to crash or time out.",
+                   action='store_true')
+    p.add_argument("--failure-exploration-rate", help="Fraction of the jobs predicted to fail that are run anyway, "
+                                                      "so that the predictor keeps learning.",
+                   type=float, default=DEFAULT_EXPLORATION_RATE)
+    p.add_argument("--no-dedup", help="Do not store identical outputs of different configurations only once.",
+                   action='store_true')
 
     args = p.parse_args()
 
@@ -196,25 +287,65 @@ def main():
         # Set timeout.
         if args.timeout is not None:
             runner.timeout = args.timeout
+        runner.shard_depth = args.shard_depth
+        runner.compression = args.compression
+        runner.blob_store = None if args.no_dedup else BlobStore(results_location / "blobs")
 
         generator = FuzzGeneratorFactory.get_fuzz_generator_for_name(args.tool, model_location, grammar,
                                                                      benchmark, args.fuzzing_strategy,
-                                                                     args.full_campaigns)
+                                                                     args.full_campaigns,
+                                                                     seed_generation=args.seed_generation,
+                                                                     interaction_strength=args.interaction_strength,
+                                                                     max_options=args.max_options)
+        if not args.no_seen_set:
+            # Campaign indices restart for every seed and strategy (see ToolTester.main), so each keeps its own set.
+            generator.seen = SeenSet(results_location / str(args.seed) / args.fuzzing_strategy.name /
+                                     ("seen_full_jobs.sqlite" if args.full_campaigns else "seen_jobs.sqlite"))
+        if args.failure_prediction:
+            generator.failure_predictor = FailurePredictor(generator.cost_model.defaults,
+                                                           exploration_rate=args.failure_exploration_rate)
+        # Runtime estimates drive the COST_AWARE and BANDIT strategies, and how many seeds fill a campaign.
+        generator.load_manifests(results_location)
+        generator.slots = args.jobs
+        generator.top_up = not args.no_top_up
+        generator.max_seeds_per_campaign = args.max_seeds_per_campaign
+        if args.fuzzing_strategy is FuzzOptions.BANDIT:
+            generator.bandit_state = results_location / "bandit_posterior.json"
+            if generator.load_bandit_state():
+                print(f'Resumed bandit posterior from {generator.bandit_state}.')
+        if args.cpu_budget is not None:
+            generator.cpu_budget = args.cpu_budget
         reader = ReaderFactory.get_reader_for_task_and_tool(args.task, args.tool)
         checker = ViolationCheckerFactory.get_violation_checker_for_task(args.task, args.tool,
                                                                          jobs=args.jobs,
                                                                          ground_truths=groundtruths,
                                                                          reader=reader,
-                                                                         output_folder=results_location / "violations")
+                                                                         output_folder=results_location / "violations",
+                                                                         comparison_cache=None if
+                                                                         args.no_comparison_cache else
+                                                                         ComparisonCache(results_location /
+                                                                                         "comparison_cache"))
 
     match args.delta_debugging_mode.lower():
         case 'violation': debugger = JavaViolationDeltaDebugger(runner, reader, checker, hdd_only=args.hdd_only)
         case 'benchmark': debugger = JavaBenchmarkDeltaDebugger(runner, reader, checker, hdd_only=args.hdd_only)
         case _: debugger = None
+    if debugger is not None:
+        debugger.tool = args.tool
+        debugger.task = args.task
+        debugger.reduction = args.parallel_reduction
+        # Shared by all delta debugging sessions; each probe runs two tool instances.
+        debugger.scheduler = SlotScheduler(max(int(args.jobs / 2), 1))
+    confirmer = None
+    if debugger is not None and args.confirm_violations is not None:
+        # Confirmation finishes before delta debugging starts, so the two can share the scheduler.
+        confirmer = ViolationConfirmer(runner, checker, debugger.scheduler, repetitions=args.confirm_violations)
 
     t = ToolTester(generator, runner, debugger, results_location,
                    num_processes=args.jobs, fuzzing_timeout=args.fuzzing_timeout,
-                   checker=checker, seed=args.seed)
+                   checker=checker, seed=args.seed,
+                   planner=DeltaDebuggingPlanner(results_location / "delta_debugging_index.json"),
+                   confirmer=confirmer)
     t.main()
 
 
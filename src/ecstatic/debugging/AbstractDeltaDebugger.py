@@ -15,35 +15,52 @@
 #      You should have received a copy of the GNU General Public License
 #      along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import argparse
 import copy
 import json
 import logging
 import os
+import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
 from abc import abstractmethod, ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from functools import partial
 from multiprocessing.dummy import Pool
 from pathlib import Path
-from typing import Optional, Callable, TypeAlias, Iterable, List, Set, Tuple
+from typing import Optional, Callable, TypeAlias, Iterable, List, Set, Tuple, Dict
 
-import dill as pickle
 
+from src.ecstatic.debugging.BuildCache import BuildCache
+from src.ecstatic.debugging.ParallelDDMin import ParallelDDMin, ReductionMode
+from src.ecstatic.debugging.PredicateServer import PredicateServer
+from src.ecstatic.debugging.ProbeCache import ProbeCache
 from src.ecstatic.readers.AbstractReader import AbstractReader, T
 from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
-from src.ecstatic.util.BenchmarkReader import validate
+from src.ecstatic.util.BenchmarkSnapshot import BenchmarkSnapshot
+from src.ecstatic.util.SlotScheduler import SlotScheduler
 from src.ecstatic.util.PartialOrder import PartialOrder
 from src.ecstatic.util.PotentialViolation import PotentialViolation
-from src.ecstatic.util.UtilClasses import FinishedFuzzingJob
+from src.ecstatic.util.UtilClasses import FinishedFuzzingJob, FuzzingJob, BenchmarkRecord
 from src.ecstatic.violation_checkers.AbstractViolationChecker import get_file_name, AbstractViolationChecker
 
 DeltaDebuggingPredicate: TypeAlias = Callable[[PotentialViolation], bool]
 
 
+@dataclass
+class ViolationReproduced:
+    """
+    The predicate that a reduced program still violates the same partial orders. run_predicate recognizes it, and
+    checks it with the checker's check_pair instead of building the pair's PotentialViolations.
+    """
+    partial_orders: Tuple[PartialOrder, ...]
+
+    def __call__(self, pv: PotentialViolation) -> bool:
+        return pv.is_violation and pv.partial_orders == self.partial_orders
+
+
 @dataclass
 class GroundTruth:
     partial_order: PartialOrder
@@ -58,12 +75,18 @@ class DeltaDebuggingJob:
     runner: AbstractCommandLineToolRunner
     reader: AbstractReader
     violation_checker: AbstractViolationChecker
+    probe_cache: Optional[ProbeCache] = None
 
 
 logger = logging.getLogger(__name__)
 
+# The folder containing src/, so that the scripts we write can run our modules from any working directory.
+_source_root = str(Path(__file__).resolve().parents[3])
+
 
 class AbstractDeltaDebugger(ABC):
+    # Source files with these suffixes are the units of the file-level reduction (see reduce_files).
+    reducible_suffixes: Tuple[str, ...] = ()
 
     @abstractmethod
     def make_predicates(self, potential_violation: PotentialViolation) -> \
@@ -78,16 +101,34 @@ class AbstractDeltaDebugger(ABC):
         pass
 
     def __init__(self, runner: AbstractCommandLineToolRunner, reader: AbstractReader,
-                 violation_checker: AbstractViolationChecker):
+                 violation_checker: AbstractViolationChecker, snapshot: Optional[BenchmarkSnapshot] = None):
         self.runner = runner
         self.reader = reader
         self.violation_checker = violation_checker
+        self.snapshot = snapshot if snapshot is not None else BenchmarkSnapshot()
+        # If set, the source files are reduced with ddmin before the delta debugger runs. The ddmin probes and those
+        # of the delta debugger are throttled by the scheduler, which is shared by all sessions.
+        self.reduction: Optional[ReductionMode] = None
+        self.scheduler: Optional[SlotScheduler] = None
+        # The tool and task the runner, reader and checker were made for. If set, jobs are written as JobSpecs
+        # (which the probe rebuilds with the factories) rather than pickled.
+        self.tool: Optional[str] = None
+        self.task: Optional[str] = None
 
     def get_base_directory(self) -> Path:
         return Path("")
 
-    def delta_debug(self, pv: PotentialViolation, campaign_directory: str, timeout: Optional[int]):
+    def delta_debug(self, pv: PotentialViolation, campaign_directory: str, timeout: Optional[int]) -> \
+            Optional[Dict[str, float]]:
+        """
+        Delta debugs the violation, once per predicate.
+
+        Returns
+        -------
+        The number of probes and the seconds they took, or None if the violation was delta debugged before.
+        """
         logger.debug("In delta debug.")
+        stats = {"probes": 0, "probe_seconds": 0.0}
         for index, (predicate, ground_truth) in enumerate(self.make_predicates(pv)):
             logger.debug(f"Got ground truth {ground_truth} at index {index}")
 
@@ -112,10 +153,12 @@ class AbstractDeltaDebugger(ABC):
                 shutil.rmtree(directory, ignore_errors=True)
             Path(directory).mkdir(exist_ok=True, parents=True)
 
-            # Copy benchmarks folder so that we have our own code location.
-            shutil.copytree(src="/benchmarks", dst=os.path.join(directory, "benchmarks"))
-            potential_violation.job1.job.target = validate(potential_violation.job1.job.target, directory)
-            logger.info(f'Moved benchmark, so target is now {potential_violation.job1.job.target}')
+            # Snapshot the benchmark so that we have our own code location.
+            start = time.time()
+            potential_violation.job1.job.target = self.snapshot.materialize(potential_violation.job1.job.target,
+                                                                            directory)
+            logger.info(f'Moved benchmark in {time.time() - start:.3f} seconds, so target is now '
+                        f'{potential_violation.job1.job.target}')
             potential_violation.job2.job.target = potential_violation.job1.job.target
             try:
                 pass
@@ -127,76 +170,233 @@ class AbstractDeltaDebugger(ABC):
                 logger.exception(potential_violation.job1.job.target)
 
             # Then, create the script.
+            # Tool outputs are shared by the sessions of the campaign, verdicts are specific to this predicate.
+            probe_cache = ProbeCache(os.path.join(campaign_directory, self.get_base_directory(), 'probe_cache'),
+                                     directory)
+            build_cache = BuildCache(os.path.join(campaign_directory, self.get_base_directory(), 'build_cache'),
+                                     directory)
             job = DeltaDebuggingJob(predicate=predicate,
                                     runner=self.runner,
                                     reader=self.reader,
                                     violation_checker=self.violation_checker,
-                                    potential_violation=potential_violation)
+                                    potential_violation=potential_violation,
+                                    probe_cache=probe_cache)
 
-            script_location = self.create_script(job, directory)
+            server = PredicateServer(partial(run_predicate, job), directory, self.scheduler)
+            script_location = self.create_script(job, directory, server.socket_path)
             build_script = potential_violation.job1.job.target.build_script
             if build_script is not None:
                 os.chmod(build_script, 0o766)
             os.chmod(script_location, 0o766)
 
+            if self.reduction is not None:
+                self.reduce_files(job, directory, timeout, build_cache)
+            if build_script is not None:
+                build_script = self.create_build_script(potential_violation.job1.job.target, build_cache, directory)
+
             cmd = self.get_delta_debugger_cmd(build_script, directory, potential_violation, script_location)
 
             print(f"Running delta debugger with cmd {' '.join(cmd)}")
-            fin = subprocess.run(cmd, capture_output=True, text=True)
+            with server:
+                fin = subprocess.run(cmd, capture_output=True, text=True)
+            stats["probes"] += server.probes
+            stats["probe_seconds"] += server.probe_time
+            print(f"{directory}: {probe_cache.summary()} {build_cache.summary()}")
             with open(Path(directory) / '.stdout', 'w') as f:
                 f.writelines(fin.stdout)
             with open(Path(directory) / '.stderr', 'w') as f:
                 f.writelines(fin.stderr)
             print("Delta debugging completed.")
+        return stats
 
     @abstractmethod
     def get_delta_debugger_cmd(self, build_script, directory, potential_violation, script_location):
         pass
 
-    def create_script(self, job: DeltaDebuggingJob, directory: str) -> str:
+    def reduce_files(self, job: DeltaDebuggingJob, directory: str,
+                     timeout: Optional[int] = None, build_cache: Optional[BuildCache] = None) -> \
+            Optional[ParallelDDMin]:
+        """
+        Removes the source files that the violation does not need from the snapshot in directory, with ddmin over
+        the files (see ParallelDDMin). Each probe builds and checks the program in a workspace of its own, so probes
+        can run concurrently. The workspace holds copies (reflinks where possible) of the sources and build script of
+        the snapshot in directory, and links to its dependencies, at the same paths relative to the workspace. The
+        delta debugger then starts from the reduced program.
+
+        Parameters
+        ----------
+        job: The delta debugging job, whose benchmark is the snapshot in directory.
+        directory: The delta debugging directory.
+        timeout: Timeout in minutes for building a probe.
+        build_cache: Where to cache the builds of the probes. By default, a cache in directory.
+        """
+        target = job.potential_violation.job1.job.target
+        units = sorted(os.path.relpath(os.path.join(root, f), directory) for s in target.sources
+                       for root, _, files in os.walk(s) for f in files if f.endswith(self.reducible_suffixes))
+        if len(units) < 2:
+            return None
+        session = os.path.abspath(directory)
+        workspaces = Path(directory) / 'ddmin'
+        workspaces.mkdir(exist_ok=True)
+        if build_cache is None:
+            build_cache = BuildCache(Path(directory) / 'build_cache', directory)
+
+        def test(kept: List[str]) -> bool:
+            workspace = tempfile.mkdtemp(dir=workspaces)
+
+            def move(path: Optional[str]) -> Optional[str]:
+                if path is None or os.path.commonpath([session, os.path.abspath(path)]) != session:
+                    return path
+                return os.path.join(workspace, os.path.relpath(path, session))
+
+            try:
+                variant = copy.deepcopy(target)
+                variant.sources, variant.build_script = [move(s) for s in target.sources], move(target.build_script)
+                # Without a build script, the target is not rebuilt and is read from the session snapshot.
+                if target.build_script is not None:
+                    variant.name = move(target.name)
+                for path in [*target.sources, target.build_script]:
+                    if path is not None and move(path) != path:
+                        self.snapshot.copy(path, move(path))
+                # Dependencies are only read, and the session snapshot holds private copies of them.
+                for path in target.depends_on:
+                    if move(path) != path and os.path.exists(path) and not os.path.lexists(move(path)):
+                        Path(move(path)).parent.mkdir(exist_ok=True, parents=True)
+                        os.symlink(path, move(path))
+                Path(variant.name).parent.mkdir(exist_ok=True, parents=True)
+                for unit in set(units).difference(kept):
+                    os.remove(os.path.join(workspace, unit))
+                if variant.build_script is not None:
+                    os.chmod(variant.build_script, 0o766)
+                    if build_cache.build(variant.name, variant.sources, variant.build_script,
+                                         cwd=os.path.dirname(variant.build_script),
+                                         timeout=None if timeout is None else timeout * 60) != 0:
+                        return False
+                pv = copy.deepcopy(job.potential_violation)
+                pv.job1.job.target = pv.job2.job.target = variant
+                return run_predicate(replace(job, potential_violation=pv), tempfile.mkdtemp(dir=workspace))
+            except Exception:
+                logger.exception(f'ddmin probe in {workspace} failed.')
+                return False
+            finally:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+        if self.scheduler is None:
+            self.scheduler = SlotScheduler(max((os.cpu_count() or 2) // 2, 1))
+        ddmin = ParallelDDMin(test, self.scheduler, self.reduction)
+        kept = ddmin.reduce(units)
+        ddmin.drain()
+        for unit in set(units).difference(kept):
+            os.remove(os.path.join(directory, unit))
+        shutil.rmtree(workspaces, ignore_errors=True)
+        with open(Path(directory) / 'ddmin.json', 'w') as f:
+            json.dump({"units": len(units), "kept": len(kept), **ddmin.as_dict()}, f, indent=4)
+        print(f'ddmin ({self.reduction.name.lower()}) kept {len(kept)} of {len(units)} source files in '
+              f'{ddmin.seconds:.1f} seconds ({ddmin.probes} probes).')
+        return ddmin
+
+    @staticmethod
+    def create_build_script(target: BenchmarkRecord, build_cache: BuildCache, directory: str) -> str:
+        """
+        Creates a script that runs the target's build script through the build cache, passing on its arguments.
+
+        :return: The location of the script.
+        """
+        cmd = [sys.executable, '-m', 'src.ecstatic.debugging.BuildCache', '--cache', str(build_cache.location),
+               '--session', str(build_cache.session_location), '--target', target.name,
+               *[a for s in target.sources for a in ['--sources', s]], '--build-script', target.build_script]
+        with tempfile.NamedTemporaryFile(mode='w', dir=directory, delete=False, suffix='.sh') as f:
+            f.write("#!/bin/bash\n")
+            f.write(f'export PYTHONPATH={shlex.quote(_source_root)}${{PYTHONPATH:+:$PYTHONPATH}}\n')
+            f.write(f'exec {" ".join(shlex.quote(c) for c in cmd)} "$@"\n')
+            result = f.name
+        os.chmod(result, 0o766)
+        return result
+
+    def create_script(self, job: DeltaDebuggingJob, directory: str, socket_path: Optional[str] = None) -> str:
         """
 
         :param job: The delta debugging job.
         :param directory: Where to put the script.
+        :param socket_path: The socket of a PredicateServer for the job, if there is one. The script asks the server,
+        and only checks the predicate itself (from the pickled job) if the server cannot be reached.
         :return: The location of the script.
         """
-        job_tmp = tempfile.NamedTemporaryFile(delete=False, dir=directory)
-        pickle.dump(job, open(job_tmp.name, 'wb'))
+        from src.ecstatic.debugging.JobSpec import JobSpec  # Resolve circular dependency
+        spec = None if self.tool is None or self.task is None else JobSpec.from_job(job, self.tool, self.task)
+        job_tmp = tempfile.NamedTemporaryFile(delete=False, dir=directory, suffix='.pickle' if spec is None else '.json')
         job_tmp.close()
+        if spec is None:
+            import dill as pickle
+            with open(job_tmp.name, 'wb') as f:
+                pickle.dump(job, f)
+        else:
+            spec.save(job_tmp.name)
 
         with tempfile.NamedTemporaryFile(mode='w', dir=directory, delete=False) as f:
             f.write("#!/bin/bash\n")
-            cmd = f"deltadebugger {job_tmp.name}"
+            if socket_path is None:
+                cmd = f"deltadebugger {job_tmp.name}"
+            else:
+                f.write(f'export PYTHONPATH={shlex.quote(_source_root)}${{PYTHONPATH:+:$PYTHONPATH}}\n')
+                cmd = f"{sys.executable} -m src.ecstatic.debugging.PredicateClient {socket_path} {job_tmp.name}"
             f.write(cmd + "\n")
             result = f.name
             logger.info(f"Wrote cmd {cmd} to delta debugging script.")
         return result
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("job", help="The location of the pickled job.")
-    args = parser.parse_args()
-
-    with open(args.job, 'rb') as f:
-        job: DeltaDebuggingJob = pickle.load(f)
-
-    logger.info(f'Read delta debugging job from {args.job}')
-    # Create tool runner.
-    tmpdir = tempfile.mkdtemp(dir = str(Path(args.job).parent))
-
-    partial_function = partial(job.runner.run_job, output_folder=tmpdir)
-    with Pool(2) as p:
-        finished_jobs: Iterable[FinishedFuzzingJob] = p.map(partial_function, [job.potential_violation.job1.job,
-                                                                               job.potential_violation.job2.job])
-    job.violation_checker.output_folder = tmpdir
-    violations: Iterable[PotentialViolation] =\
-        job.violation_checker.check_violations(
-            [f for f in finished_jobs if f is not None and f.results_location is not None])
-    relevant_violation = [v for v in violations if v.partial_orders == job.potential_violation.partial_orders]
-    if (num_violations := len(relevant_violation)) > 1:
-        raise RuntimeError(f"{num_violations} potential violations detected on partial order set "
-                           f"{job.potential_violation.partial_orders}. "
-                           f"Not sure how to proceed.")
+def run_predicate(job: DeltaDebuggingJob, output_folder: str, pool: Optional[Pool] = None) -> bool:
+    """
+    Runs both jobs of the violation on the (reduced) benchmark, and checks the predicate on their comparison.
+    Only the two results are compared, rather than running the checker over the whole (two-job) campaign; whether
+    the violation is reproduced (the usual predicate) is checked with check_pair, which stops at the first
+    unexpected difference.
+
+    Parameters
+    ----------
+    job: The delta debugging job.
+    output_folder: A fresh folder for the results (the runner does not rerun jobs that have results in a folder).
+    pool: A pool with at least two workers to run the jobs in. If None, a pool is created for this call.
+    """
+    cache = job.probe_cache
+    keys = [] if cache is None else cache.variant_keys(job.potential_violation.job1.job.target)
+    if cache is not None and (verdict := cache.get_verdict(keys)) is not None:
+        return verdict
+
+    def run(fuzzing_job: FuzzingJob) -> Optional[FinishedFuzzingJob]:
+        if cache is None:
+            return job.runner.run_job(fuzzing_job, output_folder=output_folder)
+        config_hash = job.runner.get_config_hash(fuzzing_job)
+        if (output := cache.get_output(keys, config_hash)) is not None:
+            return FinishedFuzzingJob(fuzzing_job, 0.0, output)
+        finished = job.runner.run_job(fuzzing_job, output_folder=output_folder)
+        if finished is not None and finished.results_location is not None:
+            cache.put_output(keys, config_hash, finished.results_location)
+        return finished
+
+    jobs = [job.potential_violation.job1.job, job.potential_violation.job2.job]
+    if pool is None:
+        with Pool(2) as p:
+            finished_jobs: List[FinishedFuzzingJob] = p.map(run, jobs)
+    else:
+        finished_jobs = pool.map(run, jobs)
+    if any(f is None or f.results_location is None for f in finished_jobs):
+        raise RuntimeError(f"Could not run both jobs of the violation in {output_folder}.")
+    if isinstance(job.predicate, ViolationReproduced):
+        holds = job.violation_checker.check_pair(finished_jobs[0], finished_jobs[1], job.predicate.partial_orders)
     else:
-        exit(0 if job.predicate(relevant_violation[0]) else 1)
+        option = job.potential_violation.partial_orders[0].option
+        violations: List[PotentialViolation] = []
+        for pair in [(finished_jobs[0], finished_jobs[1], option), (finished_jobs[1], finished_jobs[0], option)]:
+            violations.extend(job.violation_checker.compare_results(pair))
+        relevant_violation = [v for v in violations if v.partial_orders == job.potential_violation.partial_orders]
+        if (num_violations := len(relevant_violation)) > 1:
+            raise RuntimeError(f"{num_violations} potential violations detected on partial order set "
+                               f"{job.potential_violation.partial_orders}. "
+                               f"Not sure how to proceed.")
+        holds = job.predicate(relevant_violation[0])
+    if cache is not None:
+        cache.put_verdict(keys, holds)
+    return holds
+
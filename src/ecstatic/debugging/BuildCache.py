@@ -0,0 +1,183 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Caches the build outputs of the program variants that delta debugging probes. Only uses the standard library,
+since it also runs as a wrapper around the build script of every probe (see main).
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STATS_NAME = 'build_cache.json'
+
+# Builds of a session can run in parallel threads (see ParallelDDMin), and all of them count. Builds in separate
+# processes (e.g., probes run by the delta debugger) are serialized by an fcntl lock on a file next to the counts.
+_stats_lock = threading.Lock()
+
+
+def tree_digest(paths: List[str], chunk_size: int = 1 << 20) -> str:
+    """SHA-256 digest of the files under paths (files or directories), by relative path and content."""
+    h = hashlib.sha256()
+    for root in paths:
+        files = [root] if os.path.isfile(root) else \
+            sorted(os.path.join(d, f) for d, _, fs in os.walk(root) for f in fs)
+        for file in files:
+            h.update(os.path.relpath(file, root).encode() + b'\0')
+            with open(file, 'rb') as f:
+                while chunk := f.read(chunk_size):
+                    h.update(chunk)
+            h.update(b'\0')
+    return h.hexdigest()
+
+
+class BuildCache:
+    """
+    Keeps the build output (the target) of every program variant that was built, keyed by the digests of the
+    variant's sources and of the build script. Delta debugging builds the same variant more than once, e.g., when a
+    reduction is retried, when the delta debugger starts from a variant that ddmin already built, or when
+    several violations on the same program are delta debugged; such builds are replaced by a copy of the output.
+
+    Build scripts are run unchanged (with the same arguments and working directory), and only the target is
+    restored from the cache, so existing build.sh files work as before. Failed builds are cached as well (by their
+    exit code), since reductions often produce variants that do not compile. Build times and hit counts are kept
+    in the session folder (see STATS_NAME).
+    """
+
+    def __init__(self, location: str | Path, session_location: str | Path):
+        self.location = Path(location)
+        self.session_location = Path(session_location)
+
+    @staticmethod
+    def key(target: str, sources: List[str], build_script: str) -> str:
+        khash = hashlib.sha256()
+        for token in [os.path.basename(target), tree_digest([build_script]),
+                      tree_digest([s for s in sources if os.path.exists(s)])]:
+            khash.update(token.encode())
+            khash.update(b'\0')
+        return khash.hexdigest()
+
+    def stats(self) -> Dict[str, float]:
+        try:
+            with open(self.session_location / STATS_NAME) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"hits": 0, "builds": 0, "failed_builds": 0, "build_seconds": 0.0}
+
+    def count(self, **increments: float):
+        self.session_location.mkdir(exist_ok=True, parents=True)
+        with _stats_lock, open(self.session_location / f'{STATS_NAME}.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            stats = self.stats()
+            for k, v in increments.items():
+                stats[k] += v
+            tmp = self.session_location / f'{STATS_NAME}.{uuid.uuid4().hex}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(stats, f)
+            os.replace(tmp, self.session_location / STATS_NAME)
+
+    def summary(self) -> str:
+        stats = self.stats()
+        builds = stats["builds"] + stats["failed_builds"]
+        mean = stats["build_seconds"] / builds if builds > 0 else 0.0
+        return (f'{stats["hits"]} of {stats["hits"] + builds} builds were served from the build cache; '
+                f'{builds} builds took {stats["build_seconds"]:.1f} seconds ({mean:.1f} seconds each).')
+
+    @staticmethod
+    def copy(src: str, dst: str):
+        # Copies, not links: builds may overwrite their output in place.
+        Path(dst).parent.mkdir(exist_ok=True, parents=True)
+        tmp = f'{dst}.{uuid.uuid4().hex}.tmp'
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+
+    def build(self, target: str, sources: List[str], build_script: Optional[str], args: Sequence[str] = (),
+              cwd: Optional[str] = None, timeout: Optional[float] = None, quiet: bool = True) -> int:
+        """
+        Builds target, or restores it from the cache.
+
+        Parameters
+        ----------
+        target: The build output.
+        sources: The source folders of the program.
+        build_script: The build script. If None, there is nothing to build.
+        args: Arguments to the build script.
+        cwd: Working directory of the build script (by default, the current one).
+        timeout: Seconds after which the build is aborted.
+        quiet: Whether to capture the output of the build script, rather than passing it through.
+
+        Returns
+        -------
+        The exit code of the build (0 if the target was restored from the cache).
+        """
+        if build_script is None:
+            return 0
+        key = self.key(target, sources, build_script)
+        cached = self.location / key[:2] / key / os.path.basename(target)
+        failed = self.location / key[:2] / key / 'FAILED'
+        if cached.exists():
+            self.copy(str(cached), target)
+            self.count(hits=1)
+            return 0
+        if failed.exists():
+            self.count(hits=1)
+            return int(failed.read_text())
+        start = time.time()
+        try:
+            code = subprocess.run([build_script, *args], cwd=cwd, capture_output=quiet, timeout=timeout).returncode
+        except subprocess.TimeoutExpired:
+            # Timeouts are not cached, since they may depend on the load of the machine.
+            self.count(failed_builds=1, build_seconds=time.time() - start)
+            return 124
+        if code == 0 and os.path.exists(target):
+            self.copy(target, str(cached))
+            self.count(builds=1, build_seconds=time.time() - start)
+            return 0
+        # A build that succeeds without producing the target is a failure.
+        code = code if code != 0 else 1
+        failed.parent.mkdir(exist_ok=True, parents=True)
+        failed.write_text(str(code))
+        self.count(failed_builds=1, build_seconds=time.time() - start)
+        return code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a build script, unless its output is in the build cache.")
+    parser.add_argument("--cache", required=True, help="The build cache.")
+    parser.add_argument("--session", required=True, help="Folder in which to count builds and hits.")
+    parser.add_argument("--target", required=True, help="The build output.")
+    parser.add_argument("--sources", action='append', default=[], help="A source folder of the program.")
+    parser.add_argument("--build-script", required=True, help="The build script.")
+    args, build_args = parser.parse_known_args()
+    sys.exit(BuildCache(args.cache, args.session).build(args.target, args.sources, args.build_script, build_args,
+                                                        quiet=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+The deltadebugger entry point, which checks a delta debugging predicate on the current (reduced) program.
+
+It may run once per probe, so it only imports what the job it is given needs: the modules that rebuild a job
+specification, or dill for a pickled job. Nothing is imported before the arguments are parsed.
+"""
+import argparse
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("job", help="The location of the job specification (.json) or pickled job.")
+    args = parser.parse_args()
+
+    if args.job.endswith('.json'):
+        from src.ecstatic.debugging.JobSpec import JobSpec
+        job = JobSpec.load(args.job).to_job()
+    else:
+        import dill as pickle
+        with open(args.job, 'rb') as f:
+            job = pickle.load(f)
+    from src.ecstatic.debugging.AbstractDeltaDebugger import run_predicate
+
+    logger.info(f'Read delta debugging job from {args.job}')
+    tmpdir = tempfile.mkdtemp(dir=str(Path(args.job).parent))
+    sys.exit(0 if run_predicate(job, tmpdir) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+
+logger = logging.getLogger(__name__)
+
+
+class DeltaDebuggingPlanner:
+    """
+    Decides which violations to delta debug, and in which order. Violations with the same partial orders, target,
+    and unexpected differences are the same bug found from different seeds, so only one representative of each
+    cluster is delta debugged, and clusters that were delta debugged or found to be flaky (see ViolationConfirmer) in
+    an earlier campaign (according to the index) are skipped altogether. Representatives are ordered cheapest first:
+    by the size of the target's sources times the mean latency of a delta debugging probe on the target (learned
+    from earlier sessions).
+    """
+
+    def __init__(self, index_location: Optional[str | Path] = None):
+        """
+        Parameters
+        ----------
+        index_location: A JSON file in which delta debugged and flaky clusters and probe latencies are kept across
+        campaigns. If None, the index is only kept in memory.
+        """
+        self.index_location = None if index_location is None else Path(index_location)
+        self.clusters: Dict[str, str] = {}
+        # Clusters whose violations did not reproduce -> where that was found.
+        self.flaky: Dict[str, str] = {}
+        # target -> [probe seconds, probes]
+        self.latency: Dict[str, List[float]] = {}
+        if self.index_location is not None and self.index_location.exists():
+            with open(self.index_location) as f:
+                index = json.load(f)
+            self.clusters, self.latency = index["clusters"], index["latency"]
+            self.flaky = index.get("flaky", {})  # Indexes written before flaky clusters were recorded lack it.
+        self.source_sizes: Dict[str, int] = {}
+
+    @staticmethod
+    def cluster_key(violation: PotentialViolation) -> str:
+        khash = hashlib.sha256()
+        for token in [*sorted(str(p) for p in violation.partial_orders),
+                      os.path.basename(violation.job1.job.target.name),
+                      *sorted(str(d) for d in violation.unexpected_diffs)]:
+            khash.update(token.encode())
+            khash.update(b'\0')
+        return khash.hexdigest()
+
+    def source_size(self, target: BenchmarkRecord) -> int:
+        if target.name not in self.source_sizes:
+            self.source_sizes[target.name] = sum(os.path.getsize(os.path.join(root, f)) for s in target.sources
+                                                 for root, _, files in os.walk(s) for f in files)
+        return self.source_sizes[target.name]
+
+    def probe_latency(self, target: BenchmarkRecord) -> float:
+        """Mean seconds per probe on target, or over all targets if there are no probes on it yet."""
+        seconds, probes = self.latency.get(os.path.basename(target.name), (0.0, 0))
+        if probes == 0:
+            seconds = sum(s for s, _ in self.latency.values())
+            probes = sum(p for _, p in self.latency.values())
+        return seconds / probes if probes > 0 else 1.0
+
+    def estimated_cost(self, violation: PotentialViolation) -> float:
+        target = violation.job1.job.target
+        return self.source_size(target) * self.probe_latency(target)
+
+    def expected_session_seconds(self, violation: PotentialViolation) -> Optional[float]:
+        """
+        The expected probe seconds of a delta debugging session on violation: the mean number of probes of the
+        recorded sessions, times the probe latency on its target. None if no session has been recorded yet.
+        """
+        probes = sum(p for _, p in self.latency.values())
+        if len(self.clusters) == 0 or probes == 0:
+            return None
+        return probes / len(self.clusters) * self.probe_latency(violation.job1.job.target)
+
+    def plan(self, violations: List[PotentialViolation]) -> List[PotentialViolation]:
+        """Returns one violation per new cluster that is not known to be flaky, cheapest first."""
+        representatives: Dict[str, PotentialViolation] = {}
+        for v in violations:
+            if v.is_violation and not v.is_transitive:
+                representatives.setdefault(self.cluster_key(v), v)
+        new = {k: v for k, v in representatives.items() if k not in self.clusters and k not in self.flaky}
+        flaky = len([k for k in representatives if k in self.flaky])
+        candidates = len([v for v in violations if v.is_violation and not v.is_transitive])
+        print(f'Delta debugging plan: {candidates} direct violations form {len(representatives)} clusters, '
+              f'{len(representatives) - len(new) - flaky} of which were delta debugged before, and {flaky} of '
+              f'which are flaky.')
+        return sorted(new.values(), key=self.estimated_cost)
+
+    def record(self, violation: PotentialViolation, location: str, probes: int = 0, probe_seconds: float = 0.0):
+        """Records that violation's cluster was delta debugged (in location), with the probes it took."""
+        self.clusters[self.cluster_key(violation)] = str(location)
+        latency = self.latency.setdefault(os.path.basename(violation.job1.job.target.name), [0.0, 0])
+        latency[0] += probe_seconds
+        latency[1] += probes
+        self.save()
+
+    def record_flaky(self, violation: PotentialViolation, location: str):
+        """Records that violation's cluster did not reproduce (in location), so that it is not confirmed again."""
+        self.flaky[self.cluster_key(violation)] = str(location)
+        self.save()
+
+    def save(self):
+        if self.index_location is None:
+            return
+        self.index_location.parent.mkdir(exist_ok=True, parents=True)
+        with tempfile.NamedTemporaryFile('w', dir=self.index_location.parent, delete=False, suffix='.tmp') as f:
+            json.dump({"clusters": self.clusters, "flaky": self.flaky, "latency": self.latency}, f, indent=4)
+        os.replace(f.name, self.index_location)
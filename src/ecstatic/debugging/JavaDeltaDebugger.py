@@ -26,6 +26,8 @@ from src.ecstatic.violation_checkers.AbstractViolationChecker import AbstractVio
 
 
 class JavaDeltaDebugger(AbstractDeltaDebugger, ABC):
+    reducible_suffixes = ('.java',)
+
     def __init__(self, runner: AbstractCommandLineToolRunner, reader: AbstractReader,
                  violation_checker: AbstractViolationChecker, hdd_only: bool = False):
         super().__init__(runner, reader, violation_checker)
@@ -28,7 +28,8 @@ from multiprocessing import Pool
 from pathlib import Path
 from typing import Iterable, Optional, List
 
-from src.ecstatic.debugging.AbstractDeltaDebugger import AbstractDeltaDebugger, DeltaDebuggingPredicate
+from src.ecstatic.debugging.AbstractDeltaDebugger import AbstractDeltaDebugger, DeltaDebuggingPredicate, \
+    ViolationReproduced
 from src.ecstatic.debugging.JavaDeltaDebugger import JavaDeltaDebugger
 from src.ecstatic.debugging.ViolationDeltaDebugger import ViolationDeltaDebugger
 from src.ecstatic.readers import ReaderFactory
@@ -47,8 +48,7 @@ logger = logging.getLogger(__name__)
 class JavaViolationDeltaDebugger(ViolationDeltaDebugger, JavaDeltaDebugger):
     def make_predicates(self, potential_violation: PotentialViolation) -> Iterable[DeltaDebuggingPredicate]:
         if potential_violation.is_violation:
-            def predicate(pv: PotentialViolation):
-                return pv.is_violation and pv.partial_orders == potential_violation.partial_orders
+            predicate = ViolationReproduced(potential_violation.partial_orders)
             gt = {"sample":"sample"}
             yield predicate, gt
         else:
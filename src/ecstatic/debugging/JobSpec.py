@@ -0,0 +1,162 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import json
+import logging
+from dataclasses import dataclass, asdict, field
+from importlib.resources import files
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.ecstatic.debugging.AbstractDeltaDebugger import DeltaDebuggingJob, ViolationReproduced
+from src.ecstatic.debugging.ProbeCache import ProbeCache
+from src.ecstatic.models.Level import Level
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.util.BlobStore import BlobStore
+from src.ecstatic.util.PartialOrder import PartialOrder, PartialOrderType
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.UtilClasses import BenchmarkRecord, FinishedFuzzingJob, FuzzingJob
+
+logger = logging.getLogger(__name__)
+
+# Written into every spec, so that a job file can be told apart from (and is never mistaken for) a pickled job.
+FORMAT = 'ecstatic-delta-debugging-job/1'
+
+
+@dataclass
+class JobSpec:
+    """
+    A declarative description of a delta debugging job, from which the probe rebuilds the runner, reader and
+    checker with the factories, and the options with the tool's configuration space. Unlike a pickled
+    DeltaDebuggingJob, it holds no objects: configurations are lists of [option, level] names, so the file is
+    a few kilobytes, and loading it does not unpickle the violation's results or option graphs.
+    """
+    tool: str
+    task: str
+    # The configurations of job1 and job2, as [option name, level name] pairs in the order of the configuration.
+    configurations: List[List[List[Any]]]
+    # The option under investigation of job1 and job2, by name.
+    options_under_investigation: List[Optional[str]]
+    target: Dict[str, Any]
+    # Each as [option name, left level, PartialOrderType name, right level].
+    partial_orders: List[List[Any]]
+    predicate: str = 'violation_reproduced'
+    sub_campaign: int = 0
+    runner: Dict[str, Any] = field(default_factory=dict)
+    checker: Dict[str, Any] = field(default_factory=dict)
+    # The outputs and session locations of the job's ProbeCache, if it has one.
+    probe_cache: Optional[List[str]] = None
+
+    @staticmethod
+    def from_job(job: DeltaDebuggingJob, tool: str, task: str) -> Optional['JobSpec']:
+        """
+        Describes job, or returns None if it cannot be described declaratively (its predicate is not
+        ViolationReproduced), in which case the job has to be pickled.
+        """
+        if not isinstance(job.predicate, ViolationReproduced):
+            return None
+        pv = job.potential_violation
+        jobs = [pv.job1.job, pv.job2.job]
+        runner = {'timeout': job.runner.timeout,
+                  'whole_program': job.runner.whole_program,
+                  'shard_depth': job.runner.shard_depth,
+                  'compression': job.runner.compression,
+                  'blob_store': None if job.runner.blob_store is None else str(job.runner.blob_store.location)}
+        checker = {'jobs': job.violation_checker.jobs,
+                   'ground_truths': None if job.violation_checker.ground_truths is None else
+                   str(job.violation_checker.ground_truths),
+                   'output_folder': str(job.violation_checker.output_folder)}
+        return JobSpec(tool=tool, task=task,
+                       configurations=[[[o.name, l.level_name] for o, l in j.configuration.items()] for j in jobs],
+                       options_under_investigation=[None if j.option_under_investigation is None else
+                                                    j.option_under_investigation.name for j in jobs],
+                       target=asdict(jobs[0].target),
+                       partial_orders=[[p.option.name, p.left.level_name, p.type.name, p.right.level_name]
+                                       for p in job.predicate.partial_orders],
+                       sub_campaign=jobs[0].sub_campaign,
+                       runner=runner, checker=checker,
+                       probe_cache=None if job.probe_cache is None else
+                       [str(job.probe_cache.outputs_location), str(job.probe_cache.session_location)])
+
+    def to_job(self) -> DeltaDebuggingJob:
+        """Rebuilds the job. The potential violation only has the two jobs and the partial orders; no results."""
+        from src.ecstatic.readers import ReaderFactory
+        from src.ecstatic.runners import RunnerFactory
+        from src.ecstatic.violation_checkers import ViolationCheckerFactory
+
+        options = load_options(self.tool)
+
+        def option(name: str) -> Option:
+            if name not in options:
+                raise ValueError(f'Option {name} is not in the configuration space of {self.tool}.')
+            return options[name]
+
+        runner = RunnerFactory.get_runner_for_tool(self.tool)
+        runner.timeout = self.runner.get('timeout')
+        runner.whole_program = self.runner.get('whole_program', False)
+        runner.shard_depth = self.runner.get('shard_depth', 0)
+        runner.compression = self.runner.get('compression')
+        if self.runner.get('blob_store') is not None:
+            runner.blob_store = BlobStore(self.runner['blob_store'])
+        reader = ReaderFactory.get_reader_for_task_and_tool(self.task, self.tool)
+        ground_truths = self.checker.get('ground_truths')
+        checker = ViolationCheckerFactory.get_violation_checker_for_task(
+            self.task, self.tool, jobs=self.checker.get('jobs', 1), reader=reader,
+            ground_truths=None if ground_truths is None else Path(ground_truths),
+            output_folder=Path(self.checker.get('output_folder', '.')))
+
+        target = BenchmarkRecord(**self.target)
+        finished = []
+        for configuration, under_investigation in zip(self.configurations, self.options_under_investigation):
+            fuzzing_job = FuzzingJob({option(o): Level(o, l) for o, l in configuration},
+                                     None if under_investigation is None else option(under_investigation),
+                                     target, self.sub_campaign)
+            finished.append(FinishedFuzzingJob(fuzzing_job, 0.0, None))
+        partial_orders = tuple(PartialOrder(Level(o, left), PartialOrderType[t], Level(o, right), option(o))
+                               for o, left, t, right in self.partial_orders)
+        match self.predicate:
+            case 'violation_reproduced': predicate = ViolationReproduced(partial_orders)
+            case _: raise ValueError(f'Unknown delta debugging predicate {self.predicate}.')
+        # The probe runs both jobs itself, so the violation needs no diffs of the original results.
+        potential_violation = PotentialViolation(partial_orders if len(partial_orders) > 1 else partial_orders[0],
+                                                 finished[0], finished[1], frozenset, frozenset,
+                                                 diffs=(frozenset(), frozenset()))
+        return DeltaDebuggingJob(predicate=predicate, potential_violation=potential_violation, runner=runner,
+                                 reader=reader, violation_checker=checker,
+                                 probe_cache=None if self.probe_cache is None else ProbeCache(*self.probe_cache))
+
+    def save(self, location: str | Path):
+        with open(location, 'w') as f:
+            json.dump({'format': FORMAT, **asdict(self)}, f)
+
+    @staticmethod
+    def load(location: str | Path) -> 'JobSpec':
+        with open(location) as f:
+            d = json.load(f)
+        if d.pop('format', None) != FORMAT:
+            raise ValueError(f'{location} is not a delta debugging job specification.')
+        return JobSpec(**d)
+
+
+def load_options(tool: str) -> Dict[str, Option]:
+    """
+    The options of tool's configuration space, by name. The space was validated when the campaign started, so it
+    is not validated again here.
+    """
+    model = Tool.from_dict(json.loads(files("src.resources.configuration_spaces")
+                                      .joinpath(f"{tool}_config.json").read_text()))
+    return {o.name: o for o in model.get_options()}
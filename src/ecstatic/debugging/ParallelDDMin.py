@@ -0,0 +1,141 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from enum import Enum, auto
+from typing import Callable, Dict, FrozenSet, Generic, List, Optional, TypeVar
+
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+
+logger = logging.getLogger(__name__)
+
+U = TypeVar('U')
+
+
+class ReductionMode(Enum):
+    SEQUENTIAL = auto()
+    SPECULATIVE = auto()
+
+
+class ParallelDDMin(Generic[U]):
+    """
+    ddmin (Zeller and Hildebrandt) over a list of units, e.g., the source files of a program. In each round, the
+    units are split into n chunks, and the chunks and their complements are tested for a reduction.
+
+    In SEQUENTIAL mode the candidates are tested one at a time, in order. In SPECULATIVE mode they are tested
+    concurrently, each holding a slot of the (shared) scheduler while it runs; the first candidate that
+    reproduces the failure is taken, and candidates that have not started are cancelled. Candidates that are
+    already running are left to finish, and their outcomes are remembered in case they are tested again.
+    """
+
+    def __init__(self, test: Callable[[List[U]], bool], scheduler: SlotScheduler,
+                 mode: ReductionMode = ReductionMode.SPECULATIVE):
+        """
+        Parameters
+        ----------
+        test: True if the program made of the given units still exhibits the behavior being reduced for. Called from
+        several threads at once in SPECULATIVE mode.
+        scheduler: Throttles the tests.
+        mode: Whether to test candidates one at a time or concurrently.
+        """
+        self.test = test
+        self.scheduler = scheduler
+        self.mode = mode
+        self.outcomes: Dict[FrozenSet[int], bool] = {}
+        self.lock = threading.Lock()
+        self.probes = 0
+        self.cancelled = 0
+        self.seconds = 0.0
+        self.executors: List[ThreadPoolExecutor] = []
+
+    def probe(self, units: List[U], candidate: List[int], cancelled: Optional[threading.Event] = None) -> \
+            Optional[bool]:
+        key = frozenset(candidate)
+        with self.lock:
+            if key in self.outcomes:
+                return self.outcomes[key]
+        with self.scheduler.slot(cancelled) as acquired:
+            if not acquired:
+                with self.lock:
+                    self.cancelled += 1
+                return None
+            with self.lock:
+                self.probes += 1
+            outcome = self.test([units[i] for i in candidate])
+        with self.lock:
+            self.outcomes[key] = outcome
+        return outcome
+
+    def first_success(self, units: List[U], candidates: List[List[int]]) -> Optional[int]:
+        """Returns the index of a candidate that passes the test, if any."""
+        if self.mode is ReductionMode.SEQUENTIAL:
+            return next((i for i, c in enumerate(candidates) if self.probe(units, c)), None)
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        self.executors.append(executor)
+        try:
+            futures = {executor.submit(self.probe, units, c, cancelled): i for i, c in enumerate(candidates)}
+            pending = set(futures)
+            while len(pending) > 0:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # Among candidates that finish together, prefer the smaller ones (chunks come first).
+                for future in sorted(done, key=lambda f: futures[f]):
+                    if future.result():
+                        cancelled.set()
+                        cancelled_futures = len([f for f in pending if f.cancel()])
+                        with self.lock:
+                            self.cancelled += cancelled_futures
+                        return futures[future]
+            return None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def reduce(self, units: List[U]) -> List[U]:
+        """Returns a 1-minimal sublist of units that still passes the test (assuming that all of units passes)."""
+        start = time.time()
+        current = list(range(len(units)))
+        n = 2
+        while len(current) >= 2:
+            size = len(current)
+            chunks = [current[size * i // n:size * (i + 1) // n] for i in range(n)]
+            # With two chunks, the complements are the chunks themselves.
+            complements = [] if n == 2 else [[u for j, c in enumerate(chunks) if j != i for u in c]
+                                             for i in range(n)]
+            found = self.first_success(units, chunks + complements)
+            if found is not None and found < n:
+                current, n = chunks[found], 2
+            elif found is not None:
+                current, n = complements[found - n], max(n - 1, 2)
+            elif n >= size:
+                break
+            else:
+                n = min(2 * n, size)
+            logger.info(f'ddmin: {len(current)} of {len(units)} units left, granularity {n}.')
+        self.seconds += time.time() - start
+        return [units[i] for i in current]
+
+    def drain(self):
+        """Waits for the probes that were still running when a round was decided, e.g., before removing their files."""
+        for executor in self.executors:
+            executor.shutdown(wait=True)
+        self.executors = []
+
+    def as_dict(self) -> Dict:
+        return {"mode": self.mode.name, "probes": self.probes, "cancelled": self.cancelled,
+                "seconds": self.seconds}
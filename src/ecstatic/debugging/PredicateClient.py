@@ -0,0 +1,46 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+The violation script's side of the PredicateServer. Only uses the standard library, so that a probe does not pay
+for importing ECSTATIC.
+"""
+import os
+import socket
+import sys
+
+
+def ask(socket_path: str) -> int:
+    """Returns the exit code for the probe: 0 if the predicate holds, 1 if it does not."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        s.sendall(b'probe\n')
+        answer = s.makefile('rb').readline().strip()
+    return 0 if answer == b'0' else 1
+
+
+def main():
+    socket_path, job = sys.argv[1], sys.argv[2]
+    try:
+        code = ask(socket_path)
+    except OSError:
+        # Without a server (e.g., when rerunning a script by hand), check the predicate from the job file.
+        os.execv(sys.executable, [sys.executable, '-m', 'src.ecstatic.debugging.DeltaDebuggerEntry', job])
+    sys.exit(code)
+
+
+if __name__ == '__main__':
+    main()
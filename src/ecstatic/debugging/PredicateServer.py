@@ -0,0 +1,117 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import os
+import shutil
+import socketserver
+import tempfile
+import threading
+import time
+from multiprocessing.dummy import Pool
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class PredicateServer:
+    """
+    Answers the predicate of a delta debugging session over a Unix socket. The violation script that the delta
+    debugger runs for every probe only has to connect to the server (see PredicateClient), instead of starting
+    Python, importing ECSTATIC and unpickling the job each time: the job (with its runner, reader and checker) and
+    the pool that runs the two tool runs stay in memory for the whole session.
+
+    Each request is a single line, and the answer is "0" if the predicate holds and "1" if it does not (the exit
+    code of the script). Probes are answered one at a time, each in a slot of the scheduler, if there is one, so
+    that the probes of concurrent sessions do not oversubscribe the host.
+    """
+
+    def __init__(self, predicate: Callable[[str, Pool], bool], output_folder: str,
+                 scheduler: Optional[SlotScheduler] = None):
+        """
+        Parameters
+        ----------
+        predicate: Checks the predicate, given a fresh output folder and a pool with two workers
+        (e.g., run_predicate for a delta debugging job).
+        output_folder: Where the results of the probes are written (one fresh folder per probe).
+        scheduler: Shared with the other work that runs tools (e.g., ddmin probes and other sessions). None runs
+        probes as soon as they arrive.
+        """
+        self.predicate = predicate
+        self.output_folder = output_folder
+        self.scheduler = scheduler
+        # Socket paths are limited to about 100 characters, which campaign folders easily exceed.
+        self.socket_folder = tempfile.mkdtemp(prefix='ecstatic-')
+        self.socket_path = os.path.join(self.socket_folder, 'predicate.sock')
+        self.pool: Optional[Pool] = None
+        self.probes = 0
+        self.probe_time = 0.0
+        self.server: Optional[socketserver.UnixStreamServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def probe(self) -> bool:
+        start = time.time()
+        try:
+            if self.scheduler is None:
+                return self.predicate(tempfile.mkdtemp(dir=self.output_folder), self.pool)
+            with self.scheduler.slot():
+                return self.predicate(tempfile.mkdtemp(dir=self.output_folder), self.pool)
+        finally:
+            self.probes += 1
+            self.probe_time += time.time() - start
+
+    def start(self) -> 'PredicateServer':
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.rfile.readline()
+                try:
+                    holds = server.probe()
+                except Exception:
+                    # A probe that crashes does not reproduce the violation, as when the script crashes.
+                    logger.exception('Predicate probe failed.')
+                    holds = False
+                self.wfile.write(b'0\n' if holds else b'1\n')
+
+        Path(self.output_folder).mkdir(exist_ok=True, parents=True)
+        self.pool = Pool(2)
+        self.server = socketserver.UnixStreamServer(self.socket_path, Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f'Predicate server listening on {self.socket_path}.')
+        return self
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        shutil.rmtree(self.socket_folder, ignore_errors=True)
+        logger.info(f'Predicate server answered {self.probes} probes in {self.probe_time:.1f} seconds.')
+
+    def __enter__(self) -> 'PredicateServer':
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,127 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import fcntl
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.ecstatic.debugging.BuildCache import tree_digest
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+
+logger = logging.getLogger(__name__)
+
+STATS_NAME = 'probe_cache.json'
+
+# The two jobs of a probe run in parallel threads, and both count. Probes in separate processes are serialized by
+# an fcntl lock on a file next to the counts instead.
+_stats_lock = threading.Lock()
+
+
+class ProbeCache:
+    """
+    Memoizes the probes of delta debugging. A program variant is identified by the digest of its (reduced) source
+    tree and by the digest of its build output, so a variant is recognized if either is unchanged, e.g., when the
+    delta debugger retries a variant, or when a reduction does not change the build output.
+
+    * Tool outputs are cached per (variant, configuration), in a folder that can be shared between the sessions on
+      a campaign, since different violations on a benchmark share configurations.
+    * Predicate verdicts are cached per variant, in the session's own folder, since they depend on the predicate.
+
+    Hit counts are kept in the session folder (see STATS_NAME), so that probes that run in separate processes add to
+    the same counts.
+    """
+
+    def __init__(self, outputs_location: str | Path, session_location: str | Path):
+        self.outputs_location = Path(outputs_location)
+        self.session_location = Path(session_location)
+
+    def variant_keys(self, target: BenchmarkRecord) -> List[str]:
+        # The benchmark's name and dependencies are part of the key, since they are analyzed too.
+        context = os.path.basename(target.name) + ''.join(f'\0{os.path.basename(d)}' for d in target.depends_on)
+        keys = []
+        if len(sources := [s for s in target.sources if os.path.exists(s)]) > 0:
+            keys.append('src-' + hashlib.sha256((context + tree_digest(sources)).encode()).hexdigest())
+        if os.path.exists(target.name):
+            keys.append('bin-' + hashlib.sha256((context + tree_digest([target.name])).encode()).hexdigest())
+        return keys
+
+    def stats(self) -> Dict[str, int]:
+        try:
+            with open(self.session_location / STATS_NAME) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"verdict_hits": 0, "verdict_misses": 0, "output_hits": 0, "output_misses": 0}
+
+    def count(self, stat: str):
+        self.session_location.mkdir(exist_ok=True, parents=True)
+        with _stats_lock, open(self.session_location / f'{STATS_NAME}.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            stats = self.stats()
+            stats[stat] += 1
+            tmp = self.session_location / f'{STATS_NAME}.{uuid.uuid4().hex}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(stats, f)
+            os.replace(tmp, self.session_location / STATS_NAME)
+
+    def summary(self) -> str:
+        stats = self.stats()
+        verdicts = stats["verdict_hits"] + stats["verdict_misses"]
+        outputs = stats["output_hits"] + stats["output_misses"]
+        return (f'{stats["verdict_hits"]} of {verdicts} probes and {stats["output_hits"]} of {outputs} tool runs '
+                f'were served from the probe cache.')
+
+    def get_verdict(self, keys: List[str]) -> Optional[bool]:
+        for key in keys:
+            if (file := self.session_location / 'verdicts' / key).exists():
+                self.count("verdict_hits")
+                return file.read_text() == '0'
+        self.count("verdict_misses")
+        return None
+
+    def put_verdict(self, keys: List[str], holds: bool):
+        (self.session_location / 'verdicts').mkdir(exist_ok=True, parents=True)
+        for key in keys:
+            (self.session_location / 'verdicts' / key).write_text('0' if holds else '1')
+
+    def get_output(self, keys: List[str], config_hash: str) -> Optional[str]:
+        for key in keys:
+            # Outputs keep their file name, whose suffix identifies their compression.
+            matches = [m for m in glob.glob(str(self.outputs_location / key[:6] / f'{key}-{config_hash}-*'))
+                       if not m.endswith('.tmp')]
+            if len(matches) > 0:
+                self.count("output_hits")
+                return matches[0]
+        self.count("output_misses")
+        return None
+
+    def put_output(self, keys: List[str], config_hash: str, output: str):
+        for key in keys:
+            location = self.outputs_location / key[:6] / f'{key}-{config_hash}-{os.path.basename(output)}'
+            location.parent.mkdir(exist_ok=True, parents=True)
+            tmp = f'{location}.{uuid.uuid4().hex}.tmp'
+            try:
+                os.link(output, tmp)
+            except OSError:
+                shutil.copy2(output, tmp)
+            os.replace(tmp, location)
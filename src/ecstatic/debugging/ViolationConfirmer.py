@@ -0,0 +1,115 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.dummy import Pool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.ecstatic.debugging.DeltaDebuggingPlanner import DeltaDebuggingPlanner
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+from src.ecstatic.util.UtilClasses import FinishedFuzzingJob, FuzzingJob
+from src.ecstatic.violation_checkers.AbstractViolationChecker import AbstractViolationChecker, get_file_name
+
+logger = logging.getLogger(__name__)
+
+
+class ViolationConfirmer:
+    """
+    Confirms violations before they are delta debugged, by rerunning both of their jobs and checking that the
+    violation reproduces every time. Analyses can be nondeterministic (e.g., through hash ordering, or timeouts),
+    and a violation that does not reproduce would send the delta debugger after a moving target, so such
+    violations are classified as flaky and dropped.
+
+    Each repetition has its own results folder, in which the runner's job manifest keeps the results: a job shared
+    by several violations is rerun once per repetition, and a restarted campaign reuses the reruns it already has.
+    Each check of a violation runs two tool instances, so it holds one slot of the scheduler.
+    """
+
+    def __init__(self, runner: AbstractCommandLineToolRunner, checker: AbstractViolationChecker,
+                 scheduler: SlotScheduler, repetitions: int = 2):
+        if repetitions < 1:
+            raise ValueError(f'Confirming a violation needs at least one repetition, not {repetitions}.')
+        self.runner = runner
+        self.checker = checker
+        self.scheduler = scheduler
+        self.repetitions = repetitions
+        # Jobs are rerun by one thread at a time, so that the others find the result in the manifest.
+        self._job_locks: Dict[Tuple[str, str, str], threading.Lock] = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+
+    def rerun(self, job: FuzzingJob, output_folder: str) -> Optional[FinishedFuzzingJob]:
+        with self._lock:
+            job_lock = self._job_locks[(output_folder, self.runner.get_config_hash(job), job.target.name)]
+        with job_lock:
+            return self.runner.run_job(job, output_folder=output_folder)
+
+    def confirm(self, violation: PotentialViolation, location: str) -> bool:
+        """
+        Reruns violation's jobs (with results in location) up to repetitions times, and returns whether the
+        violation reproduced every time. A rerun that fails (e.g., times out) does not reproduce the violation.
+        """
+        jobs = [violation.job1.job, violation.job2.job]
+        for repetition in range(self.repetitions):
+            output_folder = os.path.join(location, f'rerun{repetition}')
+            Path(output_folder).mkdir(exist_ok=True, parents=True)
+            with self.scheduler.slot(), Pool(2) as p:
+                finished = p.map(lambda j: self.rerun(j, output_folder), jobs)
+            if any(f is None or f.results_location is None for f in finished) or \
+                    not self.checker.check_pair(finished[0], finished[1], violation.partial_orders):
+                logger.info(f'{get_file_name(violation)} did not reproduce in repetition {repetition}.')
+                return False
+        return True
+
+    def confirm_all(self, violations: List[PotentialViolation], location: str,
+                    planner: Optional[DeltaDebuggingPlanner] = None) -> List[PotentialViolation]:
+        """
+        Confirms violations (as many at once as the scheduler has slots), and returns the confirmed ones in their
+        original order. Writes a report to location/confirmation.json, which estimates the delta debugging time
+        that dropping the flaky violations saved from the planner's record of earlier sessions. Flaky violations are
+        recorded in the planner, which does not plan their clusters again.
+        """
+        start = time.time()
+        with Pool(self.scheduler.slots) as p:
+            confirmed = p.map(lambda v: self.confirm(v, location), violations)
+        flaky = [v for v, c in zip(violations, confirmed) if not c]
+        estimates = [None if planner is None else planner.expected_session_seconds(v) for v in flaky]
+        avoided = None if None in estimates else sum(estimates)
+        if planner is not None:
+            for v in flaky:
+                planner.record_flaky(v, location)
+        report = {"repetitions": self.repetitions,
+                  "violations": len(violations),
+                  "flaky": [str(get_file_name(v)) for v in flaky],
+                  "confirmation_seconds": time.time() - start,
+                  "avoided_seconds": avoided}
+        Path(location).mkdir(exist_ok=True, parents=True)
+        with tempfile.NamedTemporaryFile('w', dir=location, delete=False, suffix='.tmp') as f:
+            json.dump(report, f, indent=4)
+        os.replace(f.name, os.path.join(location, 'confirmation.json'))
+        avoided_str = 'an unknown amount of' if avoided is None else f'an estimated {avoided:.1f} seconds of'
+        print(f'Confirmation: {len(flaky)} of {len(violations)} violations did not reproduce in {self.repetitions} '
+              f'reruns and are not delta debugged (took {report["confirmation_seconds"]:.1f} seconds, and avoided '
+              f'{avoided_str} delta debugging).')
+        return [v for v, c in zip(violations, confirmed) if c]
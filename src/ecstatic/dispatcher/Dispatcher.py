@@ -24,7 +24,12 @@ import pathlib
 
 from enum_actions import enum_action
 
-from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzOptions
+from src.ecstatic.debugging.ParallelDDMin import ReductionMode
+from src.ecstatic.fuzzing.ConfigurationSampler import DEFAULT_MAX_OPTIONS
+from src.ecstatic.fuzzing.FailurePredictor import DEFAULT_EXPLORATION_RATE
+from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzOptions, SeedGenerationMode, \
+    DEFAULT_MAX_SEEDS_PER_CAMPAIGN
+from src.ecstatic.util.Compression import CODECS
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                     datefmt='%m/%d/%Y %I:%M:%S %p')
@@ -107,8 +112,47 @@ def parse_args():
         )
         parser.add_argument("--seed", help="Seed to use for the random fuzzer", type=int, default=2001)
         parser.add_argument("--fuzzing-strategy", action=enum_action(FuzzOptions), default="guided")
+        parser.add_argument("--cpu-budget", help="Estimated CPU seconds each campaign may take with the cost_aware "
+                                                 "fuzzing strategy.", type=float, default=None)
+        parser.add_argument("--max-seeds-per-campaign", help="How many seeds a campaign may merge to keep all "
+                                                             "--jobs slots busy. 1 runs one seed per campaign.",
+                            type=int, default=DEFAULT_MAX_SEEDS_PER_CAMPAIGN)
+        parser.add_argument("--no-top-up", help="Do not add mutants for more partial orders to campaigns that are too "
+                                                "small to keep all --jobs slots busy.", action='store_true')
+        parser.add_argument("--seed-generation", help="How to generate seed configurations: by fuzzing the tool's "
+                                                      "grammar, by sampling the configuration space directly, "
+                                                      "or from t-wise covering arrays.",
+                            action=enum_action(SeedGenerationMode), default="grammar")
+        parser.add_argument("--max-options", help="The largest number of options a seed sets with direct seed "
+                                                  "generation.", type=int, default=DEFAULT_MAX_OPTIONS)
+        parser.add_argument("--interaction-strength", help="t for covering_array seed generation and for the t-wise "
+                                                           "interaction coverage logged per campaign.",
+                            type=int, default=2)
         parser.add_argument("--full-campaigns", help="Do not sample at all, just do full campaigns.", action='store_true')
         parser.add_argument("--hdd-only", help="Disable the delta debugger's CDG phase.", action='store_true')
+        parser.add_argument("--parallel-reduction", help="Before delta debugging, remove unneeded source files "
+                                                         "with ddmin, testing one candidate at a time (sequential) "
+                                                         "or several at once (speculative).",
+                            action=enum_action(ReductionMode), default=None)
+        parser.add_argument("--confirm-violations", help="Before delta debugging, rerun both jobs of each violation "
+                                                         "this many times, and drop the violations that do not "
+                                                         "reproduce every time as flaky.", type=int, default=None)
+        parser.add_argument("--no-comparison-cache", help="Do not reuse pairwise comparisons from earlier campaigns.",
+                            action='store_true')
+        parser.add_argument("--shard-depth", help="Number of hash-prefix directory levels to store results in "
+                                                  "(0 stores all results of a campaign in one folder).",
+                            type=int, default=0)
+        parser.add_argument("--compression", help="Compress tool outputs with this codec once they are written.",
+                            choices=CODECS, default=None)
+        parser.add_argument("--no-seen-set", help="Run jobs even if they were already run in an earlier campaign.",
+                            action='store_true')
+        parser.add_argument("--failure-prediction", help="Skip mutant jobs that are predicted to crash or time out.",
+                            action='store_true')
+        parser.add_argument("--failure-exploration-rate", help="Fraction of the jobs predicted to fail that are run "
+                                                               "anyway, so that the predictor keeps learning.",
+                            type=float, default=DEFAULT_EXPLORATION_RATE)
+        parser.add_argument("--no-dedup", help="Do not store identical outputs of different configurations only once.",
+                            action='store_true')
 
         return parser.parse_args()
 
@@ -19,15 +19,27 @@ from importlib.resources import files, as_file
 import logging
 import os
 import subprocess
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import docker
-from docker.models.containers import Container
+if TYPE_CHECKING:
+    from docker import DockerClient
+    from docker.models.containers import Container
 
-client = docker.from_env()
 logger = logging.getLogger(__name__)
 
 
+@cache
+def get_client() -> 'DockerClient':
+    """
+    The Docker client, connected on first use, so that importing this module (e.g., to parse the dispatcher's
+    arguments, or to build images with the docker CLI) neither imports docker nor needs a running daemon.
+    """
+    import docker
+    return docker.from_env()
+
+
 def build_image(tool: str, nocache: bool = False):
     env = os.environ
     os.environ["DOCKER_DEFAULT_PLATFORM"] = "linux/amd64"
@@ -59,7 +71,9 @@ def start_runner(tool: str, benchmark: str, task: str, args):
     # run build benchmark script
     command = f'tester {tool} {benchmark} -t {task} -j {args.jobs} --fuzzing-timeout {args.fuzzing_timeout} ' \
               f'--delta-debugging-mode {args.delta_debugging_mode} --seed {args.seed} ' \
-              f'--fuzzing-strategy {args.fuzzing_strategy.name.lower()}'
+              f'--fuzzing-strategy {args.fuzzing_strategy.name.lower()} --shard-depth {args.shard_depth} ' \
+              f'--seed-generation {args.seed_generation.name.lower()} ' \
+              f'--interaction-strength {args.interaction_strength} --max-options {args.max_options}'
     if args.timeout is not None:
         command += f' --timeout {args.timeout}'
     if args.verbose > 0:
@@ -68,10 +82,30 @@ def start_runner(tool: str, benchmark: str, task: str, args):
         command += f' --full-campaigns'
     if args.hdd_only:
         command += f' --hdd-only'
+    if args.parallel_reduction is not None:
+        command += f' --parallel-reduction {args.parallel_reduction.name.lower()}'
+    if args.confirm_violations is not None:
+        command += f' --confirm-violations {args.confirm_violations}'
+    if args.no_comparison_cache:
+        command += f' --no-comparison-cache'
+    if args.compression is not None:
+        command += f' --compression {args.compression}'
+    command += f' --max-seeds-per-campaign {args.max_seeds_per_campaign}'
+    if args.no_top_up:
+        command += f' --no-top-up'
+    if args.cpu_budget is not None:
+        command += f' --cpu-budget {args.cpu_budget}'
+    if args.no_seen_set:
+        command += f' --no-seen-set'
+    if args.failure_prediction:
+        command += f' --failure-prediction'
+    command += f' --failure-exploration-rate {args.failure_exploration_rate}'
+    if args.no_dedup:
+        command += f' --no-dedup'
 
     print(f'Starting container with command {command}')
     Path(args.results_location).mkdir(parents=True, exist_ok=True)
-    cntr: Container = client.containers.run(
+    cntr: 'Container' = get_client().containers.run(
         image=get_image_name(tool),
         command="/bin/bash",
         detach=True,
@@ -0,0 +1,63 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import random
+from typing import Dict, Hashable, Iterable, List, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ThompsonBandit:
+    """
+    Thompson sampling over Bernoulli arms, e.g., "testing this partial order finds a new violation".
+
+    Each arm has a Beta(successes + 1, failures + 1) posterior. Arms are keyed by a string (str(arm) by default),
+    so that the posterior can be saved as JSON (as_dict) and resumed (load_dict) with freshly constructed arms.
+    """
+
+    def __init__(self, rng: random.Random = None, key: Callable[[Hashable], str] = str):
+        self.rng = random if rng is None else rng
+        self.key = key
+        self.posterior: Dict[str, List[float]] = {}  # key -> [alpha, beta]
+
+    def _params(self, arm: Hashable) -> List[float]:
+        return self.posterior.get(self.key(arm), [1.0, 1.0])
+
+    def sample(self, arm: Hashable) -> float:
+        alpha, beta = self._params(arm)
+        return self.rng.betavariate(alpha, beta)
+
+    def mean(self, arm: Hashable) -> float:
+        alpha, beta = self._params(arm)
+        return alpha / (alpha + beta)
+
+    def update(self, arm: Hashable, reward: bool):
+        params = self.posterior.setdefault(self.key(arm), [1.0, 1.0])
+        params[0 if reward else 1] += 1
+
+    def choose(self, arms: Iterable[Hashable], k: int, cost: Callable[[Hashable], float] = None) -> List[Hashable]:
+        """
+        Returns the k arms with the highest sampled reward (per unit of cost, if a cost function is given).
+        """
+        scores = {a: self.sample(a) / (1.0 if cost is None else max(cost(a), 1e-3)) for a in arms}
+        return sorted(scores, key=lambda a: scores[a], reverse=True)[:k]
+
+    def as_dict(self) -> Dict[str, List[float]]:
+        return {k: list(v) for k, v in self.posterior.items()}
+
+    def load_dict(self, d: Dict[str, List[float]]):
+        self.posterior = {k: list(v) for k, v in d.items()}
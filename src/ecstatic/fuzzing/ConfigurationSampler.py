@@ -0,0 +1,127 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import random
+from typing import Dict, List, Set, Tuple
+
+from src.ecstatic.models.Level import Level
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+
+logger = logging.getLogger(__name__)
+
+# The largest number of options a directly sampled seed sets, unless --max-options is given.
+DEFAULT_MAX_OPTIONS = 4
+
+# Stands in for all of the values of an integer option when tracking coverage.
+ANY_INTEGER = 'i'
+
+
+def level_choices(option: Option) -> List[str | int]:
+    """
+    The levels to choose from for an option. Integer options have a single symbolic level (ANY_INTEGER), plus any
+    explicit values.
+    """
+    if option.type.startswith('int'):
+        explicit = set()
+        for level in option.get_levels():
+            try:
+                explicit.add(int(level.level_name))
+            except ValueError:
+                pass
+        return [ANY_INTEGER, *sorted(explicit)]
+    return sorted(level.level_name for level in option.get_levels())
+
+
+def choice_to_level(option: Option, choice: str | int, rng: random.Random) -> Level:
+    """
+    Turns a choice of level_choices into a Level, drawing a value in range for ANY_INTEGER. Integer levels hold int
+    values, like the levels built by FuzzGenerator.mutate_config and process_config, so that equal values compare
+    equal.
+    """
+    if option.type.startswith('int'):
+        value = rng.randint(option.min_value, option.max_value) if choice == ANY_INTEGER else int(choice)
+        return Level(option.name, value)
+    return option.get_level(choice)
+
+
+def level_to_choice(option: Option, level: Level, choices: List[str | int]) -> str | int:
+    """The inverse of choice_to_level: integer values that are not explicit levels map to ANY_INTEGER."""
+    if option.type.startswith('int'):
+        try:
+            value = int(level.level_name)
+        except ValueError:
+            return ANY_INTEGER
+        return value if value in choices else ANY_INTEGER
+    return level.level_name
+
+
+class ConfigurationSampler:
+    """
+    Draws configurations directly from a Tool model, as Option -> Level dictionaries.
+
+    This replaces generating configuration strings from the tool's grammar with a GrammarCoverageFuzzer and
+    parsing them back. It keeps the coverage semantics of the grammar fuzzer: like an uncovered expansion in the
+    grammar, an option with uncovered levels is preferred over one whose levels have all been sampled, and an
+    uncovered level is preferred over a covered one. Once everything has been covered, options and levels are
+    drawn uniformly.
+    """
+
+    def __init__(self, model: Tool, max_options: int = DEFAULT_MAX_OPTIONS, rng: random.Random = None):
+        """
+        Parameters
+        ----------
+        model: The configuration space to sample from.
+        max_options: The largest number of options a sample sets (the others keep their defaults).
+        rng: The source of randomness. Defaults to the random module, so that --seed applies.
+        """
+        self.options: List[Option] = sorted(model.get_options())
+        self.max_options = max(1, min(max_options, len(self.options)))
+        self.rng = random if rng is None else rng
+        # Levels to choose from, per option (see level_choices).
+        self.choices: Dict[Option, List[str | int]] = {o: level_choices(o) for o in self.options}
+        self.covered: Set[Tuple[str, str | int]] = set()
+
+    def _uncovered(self, option: Option) -> List[str | int]:
+        return [c for c in self.choices[option] if (option.name, c) not in self.covered]
+
+    def coverage(self) -> float:
+        """Returns the fraction of (option, level) choices that have been sampled at least once."""
+        total = sum(len(c) for c in self.choices.values())
+        return len(self.covered) / total if total > 0 else 1.0
+
+    def sample(self) -> Dict[Option, Level]:
+        """Returns a new configuration, which sets between 1 and max_options options."""
+        if len(self.options) == 0:
+            return dict()
+        num_options = self.rng.randint(1, self.max_options)
+        uncovered = [o for o in self.options if len(self._uncovered(o)) > 0]
+        covered = [o for o in self.options if len(self._uncovered(o)) == 0]
+        self.rng.shuffle(uncovered)
+        self.rng.shuffle(covered)
+        config: Dict[Option, Level] = {}
+        for option in (uncovered + covered)[:num_options]:
+            candidates = self._uncovered(option) or self.choices[option]
+            choice = self.rng.choice(candidates)
+            self.covered.add((option.name, choice))
+            config[option] = choice_to_level(option, choice, self.rng)
+        logger.debug(f'Sampled configuration {[(str(k), str(v)) for k, v in config.items()]}')
+        return config
+
+    def sample_many(self, n: int) -> List[Dict[Option, Level]]:
+        """Returns n configurations, e.g., to precompute a pool of seeds."""
+        return [self.sample() for _ in range(n)]
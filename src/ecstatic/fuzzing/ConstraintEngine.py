@@ -0,0 +1,146 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import importlib.resources
+import json
+import logging
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+from src.ecstatic.models.Constraint import Constraint, REQUIRES
+from src.ecstatic.models.Level import Level
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.util.ConfigMap import ConfigMap
+
+logger = logging.getLogger(__name__)
+
+COMPATIBILITY_FILE = 'compatibility.json'
+
+
+class ConstraintEngine:
+    """
+    Checks configurations against a tool's compatibility rules (see Constraint), and repairs the ones that break
+    them before they are scheduled, so that they do not burn a slot only to crash.
+
+    Options that are not in a configuration are taken to be at their default.
+    """
+
+    def __init__(self, model: Tool, constraints: Iterable[Constraint] = ()):
+        self.model = model
+        self.options: Dict[str, Option] = {o.name: o for o in model.get_options()}
+        self.constraints: List[Constraint] = []
+        for c in constraints:
+            unknown = [o for o in c.options() if o not in self.options]
+            if len(unknown) > 0:
+                logger.warning(f'Ignoring constraint {c}, which refers to unknown options {unknown}.')
+                continue
+            self.constraints.append(c)
+            for o in c.options():
+                self.options[o].constraints.append(c)
+        model.constraints = set(self.constraints)
+        # Only the options that constraints refer to are looked at.
+        self.constrained: List[Option] = [self.options[o] for o in sorted({o for c in self.constraints
+                                                                           for o in c.options()})]
+        # Configurations that broke a constraint, and were repaired or had to be dropped.
+        self.repaired = 0
+        self.dropped = 0
+
+    @staticmethod
+    def for_tool(model: Tool) -> 'ConstraintEngine':
+        """Uses the constraints of the model, and those in the tool's compatibility.json, if it has one."""
+        constraints = list(model.constraints)
+        compatibility = importlib.resources.files("src.resources.tools").joinpath(model.name.lower(),
+                                                                                  COMPATIBILITY_FILE)
+        if compatibility.is_file():
+            constraints.extend(Constraint.from_dict(c)
+                               for c in json.loads(compatibility.read_text()).get('constraints', []))
+        logger.info(f'Loaded {len(constraints)} constraints for {model.name}.')
+        return ConstraintEngine(model, constraints)
+
+    def _levels(self, config: Mapping[Option, Level]) -> Dict[str, str]:
+        levels = {}
+        for o in self.constrained:
+            level = config.get(o) or o.get_default()
+            if level is not None:
+                levels[o.name] = str(level.level_name)
+        return levels
+
+    def violated(self, config: Mapping[Option, Level]) -> List[Constraint]:
+        if len(self.constraints) == 0:
+            return []
+        levels = self._levels(config)
+        return [c for c in self.constraints if not c.is_satisfied(levels)]
+
+    def is_valid(self, config: Mapping[Option, Level]) -> bool:
+        return len(self.violated(config)) == 0
+
+    def _change(self, option: Option, levels: Dict[str, str], allowed: Optional[List[str]],
+                forbidden: List[str]) -> Optional[Level]:
+        """A level of option that is in allowed (if given) and not in forbidden, preferring the default."""
+        candidates = [str(l.level_name) for l in sorted(option.get_levels(), key=lambda l: str(l.level_name))]
+        if option.get_default() is not None:
+            candidates.insert(0, str(option.get_default().level_name))
+        for candidate in candidates:
+            if candidate != levels.get(option.name) and (allowed is None or candidate in allowed) and \
+                    candidate not in forbidden:
+                return option.get_level(candidate)
+        return None
+
+    def _fix(self, c: Constraint, levels: Dict[str, str], fixed: Set[str]) -> Optional[Level]:
+        """A change of one option that satisfies c, or None. Options in fixed are not changed."""
+        if c.kind == REQUIRES:
+            for o, allowed in c.then.items():
+                if o not in fixed and levels.get(o) not in allowed:
+                    return self._change(self.options[o], levels, allowed, [])
+        else:
+            for o, excluded in c.then.items():
+                if o not in fixed:
+                    level = self._change(self.options[o], levels, None, excluded)
+                    if level is not None:
+                        return level
+        # Otherwise, lift the rule's condition.
+        for o, condition in c.when.items():
+            if o not in fixed:
+                level = self._change(self.options[o], levels, None, condition)
+                if level is not None:
+                    return level
+        return None
+
+    def repair(self, config: Mapping[Option, Level], fixed: Iterable[Option] = ()) -> Optional[Mapping[Option, Level]]:
+        """
+        Returns config if it is valid, or a copy of it with as few options changed as we can find that is, or None
+        if it cannot be repaired without changing an option in fixed (e.g., the option under investigation).
+        """
+        fixed_names = {o.name for o in fixed}
+        violated = self.violated(config)
+        if len(violated) == 0:
+            return config
+        repaired = config
+        for _ in range(2 * len(self.constraints)):
+            violated = self.violated(repaired)
+            if len(violated) == 0:
+                logger.info(f'Repaired configuration {[(str(k), str(v)) for k, v in config.items()]}.')
+                self.repaired += 1
+                return repaired
+            level = self._fix(violated[0], self._levels(repaired), fixed_names)
+            if level is None:
+                break
+            option = self.options[level.option_name]
+            repaired = repaired.set(option, level) if isinstance(repaired, ConfigMap) else {**repaired, option: level}
+        logger.info(f'Dropped configuration {[(str(k), str(v)) for k, v in config.items()]}, which breaks '
+                    f'{[str(c) for c in self.violated(repaired)]}.')
+        self.dropped += 1
+        return None
@@ -0,0 +1,156 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import itertools
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.ecstatic.util.JobManifest import JobManifest, MANIFEST_NAME, SUCCESS
+from src.ecstatic.util.PartialOrder import PartialOrder
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.UtilClasses import BenchmarkRecord, FinishedFuzzingJob
+
+logger = logging.getLogger(__name__)
+
+
+class RunningMean:
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: float):
+        self.total += value
+        self.count += 1
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count > 0 else None
+
+
+class CostModel:
+    """
+    Estimates what a partial order costs to test on a benchmark, and how likely testing it is to find a violation.
+
+    Runtimes are learned per (level, benchmark) from finished jobs: a job's execution time is attributed to every
+    non-default level in its configuration. Violation yield is learned per partial order, smoothed towards the yield
+    of its option, so that partial orders that have not been tested yet borrow from their siblings.
+    Levels and benchmarks are keyed by their string representation, so that estimates can be warm-started from the
+    manifests of earlier runs.
+    """
+
+    def __init__(self, defaults: Iterable[str], prior_strength: float = 2.0):
+        """
+        Parameters
+        ----------
+        defaults: The default levels of the tool (as str(Level)). Their runtime is the baseline of a benchmark.
+        prior_strength: How many observations the option-level yield is worth, for each partial order.
+        """
+        self.defaults: Set[str] = set(defaults)
+        self.prior_strength = prior_strength
+        self.level_runtime: Dict[Tuple[str, str], RunningMean] = {}
+        self.benchmark_runtime: Dict[str, RunningMean] = {}
+        self.global_runtime = RunningMean()
+        # [violations, trials]
+        self.partial_order_yield: Dict[str, List[int]] = {}
+        self.option_yield: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def benchmark_key(target: BenchmarkRecord | str) -> str:
+        return os.path.basename(target.name if isinstance(target, BenchmarkRecord) else target)
+
+    def observe_runtime(self, levels: Iterable[str], target: BenchmarkRecord | str, execution_time: float):
+        benchmark = self.benchmark_key(target)
+        for level in levels:
+            if level not in self.defaults:
+                self.level_runtime.setdefault((level, benchmark), RunningMean()).add(execution_time)
+        self.benchmark_runtime.setdefault(benchmark, RunningMean()).add(execution_time)
+        self.global_runtime.add(execution_time)
+
+    def observe_results(self, results: Iterable[FinishedFuzzingJob]):
+        for r in results:
+            self.observe_runtime([str(v) for v in r.job.configuration.values()], r.job.target, r.execution_time)
+
+    def observe_violations(self, violations: Iterable[PotentialViolation]):
+        for v in [v for v in violations if not v.is_transitive]:
+            for p in v.partial_orders:
+                for counts in [self.partial_order_yield.setdefault(str(p), [0, 0]),
+                               self.option_yield.setdefault(str(p.option), [0, 0])]:
+                    counts[0] += int(v.is_violation)
+                    counts[1] += 1
+
+    def load_manifests(self, results_location: str | Path) -> int:
+        """Warm-starts the runtime estimates from the campaign manifests under results_location."""
+        loaded = 0
+        for manifest_file in Path(results_location).rglob(MANIFEST_NAME):
+            for entry in JobManifest(manifest_file.parent).entries():
+                if entry.status == SUCCESS:
+                    # Configurations are recorded as option name -> str(Level).
+                    self.observe_runtime(entry.configuration.values(), entry.target, entry.execution_time)
+                    loaded += 1
+        logger.info(f'Loaded {loaded} runtimes from manifests in {results_location}.')
+        return loaded
+
+    def estimate_runtime(self, level: Optional[str], target: BenchmarkRecord | str) -> float:
+        """Estimated CPU seconds of a job on target that sets level (None for any job on target)."""
+        benchmark = self.benchmark_key(target)
+        for estimate in [self.level_runtime.get((level, benchmark)), self.benchmark_runtime.get(benchmark),
+                         self.global_runtime]:
+            if estimate is not None and estimate.mean is not None:
+                return max(estimate.mean, 1e-3)
+        return 1.0
+
+    def estimate_cost(self, partial_order: PartialOrder, target: BenchmarkRecord | str) -> float:
+        """Estimated CPU seconds to run both sides of a partial order on a benchmark."""
+        return sum(self.estimate_runtime(str(level), target) for level in [partial_order.left, partial_order.right])
+
+    def estimate_yield(self, partial_order: PartialOrder) -> float:
+        """Posterior mean probability that testing the partial order exhibits a violation."""
+        option_violations, option_trials = self.option_yield.get(str(partial_order.option), [0, 0])
+        prior = (option_violations + 1) / (option_trials + 2)
+        violations, trials = self.partial_order_yield.get(str(partial_order), [0, 0])
+        return (violations + self.prior_strength * prior) / (trials + self.prior_strength)
+
+    def select(self, partial_orders: Iterable[PartialOrder], benchmarks: Iterable[BenchmarkRecord],
+               budget: float) -> Tuple[Set[PartialOrder], Set[BenchmarkRecord]]:
+        """
+        Greedily chooses the partial orders and benchmarks of a campaign, in order of expected violations per
+        CPU second, as long as the estimated cost of running every chosen partial order on every chosen benchmark
+        stays within budget. At least one pair is always chosen.
+        """
+        costs = {(p, b): self.estimate_cost(p, b) for p, b in itertools.product(partial_orders, benchmarks)}
+        yields = {p: self.estimate_yield(p) for p, _ in costs}
+        candidates = sorted(costs, key=lambda t: yields[t[0]] / costs[t], reverse=True)
+        chosen_pos: Set[PartialOrder] = set()
+        chosen_benchmarks: Set[BenchmarkRecord] = set()
+        total = 0.0
+        for p, b in candidates:
+            # Adding p or b adds its cost with every benchmark or partial order that is already chosen.
+            new_benchmarks = chosen_benchmarks | {b}
+            added = (sum(costs[p, c] for c in new_benchmarks) if p not in chosen_pos else 0.0) + \
+                    (sum(costs[q, b] for q in chosen_pos) if b not in chosen_benchmarks else 0.0)
+            if len(chosen_pos) == 0 or total + added <= budget:
+                chosen_pos.add(p)
+                chosen_benchmarks.add(b)
+                total += added
+        return chosen_pos, chosen_benchmarks
+
+    def as_dict(self, partial_orders: Iterable[PartialOrder]) -> Dict:
+        """The current estimates, for fuzzer_state.json."""
+        return {"yield": {str(p): self.estimate_yield(p) for p in partial_orders},
+                "benchmark_runtime": {b: r.mean for b, r in self.benchmark_runtime.items()},
+                "level_runtime": {f'{level}@{b}': r.mean for (level, b), r in self.level_runtime.items()}}
@@ -0,0 +1,181 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import itertools
+import logging
+import math
+import random
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from src.ecstatic.fuzzing.ConfigurationSampler import level_choices, choice_to_level, level_to_choice
+from src.ecstatic.models.Level import Level
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.util.ConfigMap import ConfigMap
+
+logger = logging.getLogger(__name__)
+
+Choice = str | int
+# The levels of t options, as ((option index, choice), ...) in increasing option index.
+Interaction = Tuple[Tuple[int, Choice], ...]
+
+
+class InteractionCoverage:
+    """
+    Tracks which t-wise interactions (combinations of levels of any t options) the configurations run so far have
+    covered. Integer options contribute their explicit levels plus one symbolic level for any other value.
+    """
+
+    def __init__(self, model: Tool, strength: int = 2):
+        self.options: List[Option] = sorted(model.get_options())
+        self.strength = max(1, min(strength, len(self.options)))
+        self.choices: List[List[Choice]] = [level_choices(o) for o in self.options]
+        self.covered: Set[Interaction] = set()
+        self.configurations: Set[Tuple[Choice | None, ...]] = set()
+        self.total = sum(math.prod(len(self.choices[i]) for i in indices)
+                         for indices in itertools.combinations(range(len(self.options)), self.strength))
+
+    def interactions(self, row: List[Choice | None]) -> Iterable[Interaction]:
+        """The interactions covered by a row of choices (None for options that are not set)."""
+        return itertools.combinations([(i, c) for i, c in enumerate(row) if c is not None], self.strength)
+
+    def to_row(self, config: Mapping[Option, Level]) -> List[Choice | None]:
+        return [None if config.get(o) is None else level_to_choice(o, config[o], self.choices[i])
+                for i, o in enumerate(self.options)]
+
+    def observe(self, config: Mapping[Option, Level]) -> int:
+        """Records a configuration that is run. Returns the number of interactions it newly covers."""
+        row = self.to_row(config)
+        if tuple(row) in self.configurations:
+            return 0
+        self.configurations.add(tuple(row))
+        before = len(self.covered)
+        changed = [i for i, o in enumerate(self.options) if isinstance(config, ConfigMap) and o in config.changes]
+        base = list(row)
+        for i in changed:
+            level = config.shared.get(self.options[i])
+            base[i] = None if level is None else level_to_choice(self.options[i], level, self.choices[i])
+        if len(changed) > 0 and tuple(base) in self.configurations:
+            # A mutant of a configuration that was already observed only adds interactions with what it changed.
+            unchanged = [(i, c) for i, c in enumerate(row) if c is not None and i not in changed]
+            changed = [(i, row[i]) for i in changed if row[i] is not None]
+            for k in range(1, min(len(changed), self.strength) + 1):
+                for a in itertools.combinations(changed, k):
+                    self.covered.update(tuple(sorted(a + b))
+                                        for b in itertools.combinations(unchanged, self.strength - k))
+        else:
+            self.covered.update(self.interactions(row))
+        return len(self.covered) - before
+
+    def coverage(self) -> float:
+        total = self.total
+        return len(self.covered) / total if total > 0 else 1.0
+
+    def as_dict(self) -> Dict[str, float | int]:
+        return {"strength": self.strength, "covered": len(self.covered), "total": self.total,
+                "coverage": self.coverage(), "configurations": len(self.configurations)}
+
+
+class CoveringArray(InteractionCoverage):
+    """
+    A t-wise covering array over a Tool's options: configurations, setting every option, such that every
+    interaction of t options occurs in at least one of them. Seeds drawn from the array cover all interactions with
+    far fewer configurations than random seeds do.
+
+    The array is built greedily, in the style of AETG: each row starts from an uncovered interaction, and fills the
+    other options one by one (in random order) with the level that covers the most uncovered interactions with
+    the options set so far. The best of several such candidate rows is kept.
+    """
+
+    def __init__(self, model: Tool, strength: int = 2, rng: random.Random = None,
+                 is_valid: Optional[Callable[[Dict[Option, Level]], bool]] = None, candidates: int = 10):
+        """
+        Parameters
+        ----------
+        model: The configuration space.
+        strength: t, the number of options whose interactions are covered.
+        rng: The source of randomness. Defaults to the random module, so that --seed applies.
+        is_valid: Rejects configurations that the tool cannot run (e.g., that violate constraints between options).
+        Interactions that only occur in invalid configurations are left uncovered.
+        candidates: How many candidate rows to build for each row of the array.
+        """
+        super().__init__(model, strength)
+        self.rng = random if rng is None else rng
+        self.is_valid = (lambda config: True) if is_valid is None else is_valid
+        self.candidates = candidates
+        self.uncoverable: Set[Interaction] = set()
+
+    def all_interactions(self) -> List[Interaction]:
+        return [tuple(zip(indices, values))
+                for indices in itertools.combinations(range(len(self.options)), self.strength)
+                for values in itertools.product(*[self.choices[i] for i in indices])]
+
+    def _candidate(self, start: Interaction, uncovered: Set[Interaction]) -> List[Choice]:
+        row: List[Choice | None] = [None] * len(self.options)
+        for i, c in start:
+            row[i] = c
+        order = [i for i in range(len(self.options)) if row[i] is None]
+        self.rng.shuffle(order)
+        for i in order:
+            fixed = [j for j in range(len(self.options)) if row[j] is not None]
+            best: List[Choice] = []
+            best_count = -1
+            for c in self.choices[i]:
+                count = 0
+                for others in itertools.combinations(fixed, self.strength - 1):
+                    count += tuple(sorted([(j, row[j]) for j in others] + [(i, c)])) in uncovered
+                if count > best_count:
+                    best, best_count = [c], count
+                elif count == best_count:
+                    best.append(c)
+            row[i] = self.rng.choice(best)
+        return row
+
+    def to_config(self, row: List[Choice]) -> Dict[Option, Level]:
+        return {o: choice_to_level(o, c, self.rng) for o, c in zip(self.options, row)}
+
+    def build(self) -> List[Dict[Option, Level]]:
+        """Returns the configurations of a new covering array, covering every interaction that is valid."""
+        pending = self.all_interactions()
+        uncovered = set(pending)
+        self.uncoverable = set()
+        configs: List[Dict[Option, Level]] = []
+        position = 0
+        while len(uncovered) > 0:
+            while pending[position] not in uncovered:
+                position += 1
+            start = pending[position]
+            best: Optional[Dict[Option, Level]] = None
+            best_new: Set[Interaction] = set()
+            for _ in range(self.candidates):
+                row = self._candidate(start, uncovered)
+                config = self.to_config(row)
+                if not self.is_valid(config):
+                    continue
+                new = uncovered.intersection(self.interactions(row))
+                if len(new) > len(best_new):
+                    best, best_new = config, new
+            if best is None:
+                # No valid configuration with this interaction was found.
+                uncovered.discard(start)
+                self.uncoverable.add(start)
+                continue
+            configs.append(best)
+            uncovered -= best_new
+        if len(self.uncoverable) > 0:
+            logger.warning(f'{len(self.uncoverable)} interactions only occurred in invalid configurations.')
+        logger.info(f'Built a {self.strength}-wise covering array of {len(configs)} configurations.')
+        return configs
@@ -0,0 +1,116 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import itertools
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.ecstatic.fuzzing.CostModel import RunningMean
+from src.ecstatic.util.JobManifest import JobManifest, MANIFEST_NAME, ERROR
+
+logger = logging.getLogger(__name__)
+
+Feature = Tuple[str, ...]
+
+# Predicted failure probability from which jobs are skipped.
+DEFAULT_FAILURE_THRESHOLD = 0.8
+# Fraction of jobs predicted to fail that are run anyway, so that the predictor keeps learning.
+DEFAULT_EXPLORATION_RATE = 0.1
+
+
+class FailurePredictor:
+    """
+    Predicts which jobs will crash or time out, from the outcomes of earlier jobs.
+
+    A job is described by the non-default levels in its configuration, single and in pairs, each on its own and
+    together with the job's target, plus the target alone. The failure probability of a job is the highest failure
+    rate among its features that have been seen at least min_trials times, so a level (or a combination of levels)
+    that failed every time on a target, or everywhere, predicts that the job will fail as well. Levels and targets
+    are keyed by their string representation, so that the predictor can be trained from manifests.
+    """
+
+    def __init__(self, defaults: Iterable[str], threshold: float = DEFAULT_FAILURE_THRESHOLD,
+                 exploration_rate: float = DEFAULT_EXPLORATION_RATE, min_trials: int = 3, rng: random.Random = None):
+        """
+        Parameters
+        ----------
+        defaults: The default levels of the tool (as str(Level)).
+        threshold: Jobs whose failure probability is at least this are skipped.
+        exploration_rate: The probability of running a job that would be skipped.
+        min_trials: How often a feature must have been seen before it predicts anything.
+        rng: The source of randomness. Defaults to the random module, so that --seed applies.
+        """
+        self.defaults: Set[str] = set(defaults)
+        self.threshold = threshold
+        self.exploration_rate = exploration_rate
+        self.min_trials = min_trials
+        self.rng = random if rng is None else rng
+        # [failures, trials]
+        self.outcomes: Dict[Feature, List[int]] = {}
+        self.failure_time: Dict[Feature, RunningMean] = {}
+        # CPU seconds that skipped jobs were expected to waste.
+        self.prevented_seconds = 0.0
+        self.skipped = 0
+
+    def features(self, levels: Iterable[str], target: str) -> List[Feature]:
+        target = f'@{os.path.basename(target)}'
+        changed = sorted(set(levels) - self.defaults)
+        combinations = [(l,) for l in changed] + list(itertools.combinations(changed, 2))
+        return [(target,)] + combinations + [c + (target,) for c in combinations]
+
+    def observe(self, levels: Iterable[str], target: str, failed: bool, execution_time: float):
+        for feature in self.features(levels, target):
+            outcome = self.outcomes.setdefault(feature, [0, 0])
+            outcome[1] += 1
+            if failed:
+                outcome[0] += 1
+                self.failure_time.setdefault(feature, RunningMean()).add(execution_time)
+
+    def load_manifests(self, results_location: str | Path) -> int:
+        """Trains on the outcomes of every job in the campaign manifests under results_location."""
+        loaded = 0
+        for manifest_file in Path(results_location).rglob(MANIFEST_NAME):
+            for entry in JobManifest(manifest_file.parent).entries():
+                self.observe(entry.configuration.values(), entry.target, entry.status == ERROR, entry.execution_time)
+                loaded += 1
+        logger.info(f'Loaded {loaded} job outcomes from manifests in {results_location}.')
+        return loaded
+
+    def predict(self, levels: Iterable[str], target: str) -> Tuple[float, float]:
+        """
+        Returns
+        -------
+        The probability that the job fails, and how many CPU seconds failing is expected to take.
+        """
+        probability, duration = 0.0, 0.0
+        for feature in self.features(levels, target):
+            failures, trials = self.outcomes.get(feature, [0, 0])
+            if trials < self.min_trials:
+                continue
+            # One imagined success keeps a handful of failures from being certain.
+            rate = failures / (trials + 1)
+            if rate > probability:
+                probability, duration = rate, self.failure_time[feature].mean
+        return probability, duration
+
+    def should_skip(self, probability: float) -> bool:
+        return probability >= self.threshold and self.rng.random() >= self.exploration_rate
+
+    def as_dict(self) -> Dict[str, float | int]:
+        return {"features": len(self.outcomes), "skipped": self.skipped, "prevented_seconds": self.prevented_seconds}
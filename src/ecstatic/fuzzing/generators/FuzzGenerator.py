@@ -16,38 +16,53 @@
 #      along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-import copy
 import json
 import logging
 import os
 import random
+import tempfile
 from enum import Enum, auto
-from typing import List, Dict, Tuple, Iterable, Any
-
-from frozendict import frozendict
-from fuzzingbook.GrammarCoverageFuzzer import GrammarCoverageFuzzer
-from fuzzingbook.Grammars import convert_ebnf_grammar
-
+from pathlib import Path
+from typing import List, Dict, Tuple, Iterable, Any, Optional, Set, Mapping, TYPE_CHECKING
+
+from src.ecstatic.fuzzing.Bandit import ThompsonBandit
+from src.ecstatic.fuzzing.ConfigurationSampler import ConfigurationSampler, DEFAULT_MAX_OPTIONS
+from src.ecstatic.fuzzing.ConstraintEngine import ConstraintEngine
+from src.ecstatic.fuzzing.CostModel import CostModel
+from src.ecstatic.fuzzing.CoveringArray import CoveringArray, InteractionCoverage
+from src.ecstatic.fuzzing.FailurePredictor import FailurePredictor
 from src.ecstatic.models.Level import Level
 from src.ecstatic.models.Option import Option
 from src.ecstatic.models.Tool import Tool
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util.ConfigMap import ConfigMap
 from src.ecstatic.util.ConfigurationSpaceReader import ConfigurationSpaceReader
+from src.ecstatic.util.JobManifest import JobManifest, MANIFEST_NAME
 from src.ecstatic.util.PartialOrder import PartialOrder
 from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.SeenSet import SeenSet
 from src.ecstatic.util.UtilClasses import ConfigWithMutatedOption, FuzzingCampaign, Benchmark, BenchmarkRecord, \
-    FuzzingJob
+    FuzzingJob, FinishedFuzzingJob
 from src.ecstatic.util.Violation import Violation
 
+if TYPE_CHECKING:
+    from fuzzingbook.GrammarCoverageFuzzer import GrammarCoverageFuzzer
+
 logger = logging.getLogger(__name__)
 
+# How many times to sample a new campaign when every job of a sampled campaign has already been run.
+MAX_RESAMPLES = 10
+
+DEFAULT_CPU_BUDGET = 3600.0
+
+# How many seeds a campaign may merge to keep every slot busy (see generate_campaign). 1 runs one seed per campaign.
+DEFAULT_MAX_SEEDS_PER_CAMPAIGN = 8
+
 
 def fill_out_defaults(model: Tool, config: Dict[Option, Level]) -> Dict[Option, Level]:
     for o in model.get_options():
-        logger.info(f"Config that we are filling out is {config}")
         if o not in config:
             config[o] = o.get_default()
-
-    logger.info(f"Filled out config is {config}")
     return config
 
 
@@ -61,6 +76,15 @@ def get_apks(directory: str) -> List[str]:
 class FuzzOptions(Enum):
     RANDOM = auto()
     GUIDED = auto()
+    COST_AWARE = auto()  # Maximize expected violations per CPU second (see CostModel).
+    BANDIT = auto()  # Thompson sampling over partial orders and benchmarks, rewarding new violations.
+
+
+class SeedGenerationMode(Enum):
+    """How seed configurations are generated for campaigns after the first."""
+    GRAMMAR = auto()  # Fuzz a configuration string from the tool's grammar and parse it.
+    DIRECT = auto()  # Sample Option -> Level dictionaries from the configuration space (see ConfigurationSampler).
+    COVERING_ARRAY = auto()  # Draw seeds from t-wise covering arrays over the configuration space (see CoveringArray).
 
 
 class FuzzGenerator:
@@ -69,14 +93,46 @@ class FuzzGenerator:
                  grammar_location: str,
                  benchmark: Benchmark,
                  strategy: FuzzOptions = FuzzOptions.GUIDED,
-                 full_campaigns: bool = False):
+                 full_campaigns: bool = False,
+                 seed_generation: SeedGenerationMode = SeedGenerationMode.GRAMMAR,
+                 interaction_strength: int = 2,
+                 max_options: int = DEFAULT_MAX_OPTIONS):
         self.first_run = True
-        with open(grammar_location) as f:
-            self.json_grammar = json.load(f)
-        self.grammar = convert_ebnf_grammar(self.json_grammar)
+        self.grammar_location = grammar_location
+        self._fuzzer = None
         self.benchmark: Dict[BenchmarkRecord, int] = {b: 1 for b in benchmark.benchmarks}
-        self.fuzzer = GrammarCoverageFuzzer(self.grammar)
         self.model = ConfigurationSpaceReader().read_configuration_space(model_location)
+        self.seed_generation = seed_generation
+        # Compatibility rules between options; configurations that break them are repaired or dropped.
+        self.constraints = ConstraintEngine.for_tool(self.model)
+        self.prevented_jobs = 0
+        self.sampler = ConfigurationSampler(self.model, max_options)
+        # Seeds left in the current covering array (COVERING_ARRAY mode), and the interactions covered so far.
+        self.interaction_strength = interaction_strength
+        self.covering_array_seeds: List[Dict[Option, Level]] = []
+        self.interaction_coverage = InteractionCoverage(self.model, interaction_strength)
+        # Jobs run in earlier campaigns (see SeenSet). None disables skipping them.
+        self.seen: Optional[SeenSet] = None
+        # Skips jobs that are likely to crash or time out (see FailurePredictor). None runs every job.
+        self.failure_predictor: Optional[FailurePredictor] = None
+        self.campaign_index = 0
+        self.cost_model = CostModel(str(o.get_default()) for o in self.model.get_options()
+                                    if o.get_default() is not None)
+        # (campaign folder, config hash, target) of the jobs learned from by load_manifests.
+        self.loaded_jobs: Set[Tuple[str, str, str]] = set()
+        # Estimated CPU seconds a COST_AWARE campaign may take.
+        self.cpu_budget: float = DEFAULT_CPU_BUDGET
+        # Parallel job slots of the runner, and how a campaign is grown to fill them: first with mutants of its seed
+        # for more partial orders (if top_up is set), then by merging up to max_seeds_per_campaign seeds.
+        self.slots = 1
+        self.top_up = True
+        self.max_seeds_per_campaign = DEFAULT_MAX_SEEDS_PER_CAMPAIGN
+        # BANDIT strategy: posteriors, the violations found so far, and the arms pulled in the last campaign.
+        self.partial_order_bandit = ThompsonBandit()
+        self.benchmark_bandit = ThompsonBandit(key=lambda b: b.name)
+        self.bandit_state: Optional[Path] = None
+        self.found_violations: Set[str] = set()
+        self.last_sample: Tuple[Set[PartialOrder], Set[BenchmarkRecord]] = (set(), set())
         self.strategy = strategy
         self.full_campaigns = full_campaigns
 
@@ -87,6 +143,20 @@ class FuzzGenerator:
 
         self.benchmark_population = {b: 1 for b in benchmark.benchmarks}
 
+    @property
+    def fuzzer(self) -> 'GrammarCoverageFuzzer':
+        """
+        The grammar fuzzer. Converting the grammar is expensive, so it is only done in GRAMMAR mode (which is also
+        the only mode that imports fuzzingbook, since importing it alone takes close to half a second).
+        """
+        if self._fuzzer is None:
+            from fuzzingbook.GrammarCoverageFuzzer import GrammarCoverageFuzzer
+            from fuzzingbook.Grammars import convert_ebnf_grammar
+            with open(self.grammar_location) as f:
+                self.json_grammar = json.load(f)
+            self._fuzzer = GrammarCoverageFuzzer(convert_ebnf_grammar(self.json_grammar))
+        return self._fuzzer
+
     def process_config(self, config: str) -> Dict[Option, Level]:
         """
         Converts the string config produced by the fuzzer to a dictionary mapping options to settings.
@@ -138,10 +208,29 @@ class FuzzGenerator:
 
         Returns
         -------
-
+        The seed configuration for the next campaign, without defaults filled out. The first campaign's seed is
+        the default configuration. Seeds that break a constraint are repaired, or resampled if they cannot be.
         """
         if self.first_run:
             return dict()
+        for _ in range(MAX_RESAMPLES):
+            seed = self.constraints.repair(self.sample_seed())
+            if seed is not None:
+                return seed
+        logger.warning(f'Could not sample a valid seed in {MAX_RESAMPLES} tries. Using the default configuration.')
+        return dict()
+
+    def sample_seed(self) -> Dict[Option, Level]:
+        if self.seed_generation is SeedGenerationMode.DIRECT:
+            return self.sampler.sample()
+        elif self.seed_generation is SeedGenerationMode.COVERING_ARRAY:
+            if len(self.covering_array_seeds) == 0:
+                # Once an array is used up, the next one covers the interactions again, with different rows.
+                self.covering_array_seeds = CoveringArray(self.model, self.interaction_strength,
+                                                          is_valid=self.constraints.is_valid).build()
+                print(f'Built a {self.interaction_strength}-wise covering array of '
+                      f'{len(self.covering_array_seeds)} seeds.')
+            return self.covering_array_seeds.pop(0)
         else:
             config = ""
             while config == "":
@@ -150,13 +239,266 @@ class FuzzGenerator:
 
     def generate_campaign(self) -> Tuple[FuzzingCampaign, Dict[Any, Any]]:
         """
-        This method generates the next task for the fuzzer.
+        This method generates the next task for the fuzzer. If a seen-set is attached, jobs that were already run
+        in an earlier campaign are skipped, and if that leaves nothing to run, a new campaign is sampled.
+
+        A sampled campaign can be too small to keep all slots busy until it finishes. In that case, it is first
+        topped up with mutants of its seed for partial orders it did not sample (see top_up_mutants), and if that
+        is not enough, further seeds are sampled as sub-campaigns and merged into it (up to max_seeds_per_campaign
+        seeds). Each sub-campaign is a seed with its own mutants and benchmarks; the checker only compares jobs
+        within a sub-campaign, so feedback is the same as if the sub-campaigns had been run one after another.
+        """
+        first_run = self.first_run
+        campaign, state = self.next_sub_campaign()
+        if not first_run and not self.full_campaigns:
+            if self.top_up:
+                added = self.top_up_mutants(campaign)
+                if len(added) > 0:
+                    state["partial_order_sample"] = [str(p) for p in self.last_sample[0]]
+                    state["topped_up_partial_orders"] = [str(p) for p in added]
+                    print(f'Topped up the campaign with mutants for {len(added)} more partial orders, '
+                          f'to {len(campaign.jobs)} jobs for {self.slots} slots.')
+            states = [state]
+            pos, benchmarks = self.last_sample
+            attempts = 1
+            while attempts < self.max_seeds_per_campaign * 2 and len(states) < self.max_seeds_per_campaign and \
+                    not self.fills_slots(campaign):
+                attempts += 1
+                extra, extra_state = self.next_sub_campaign()
+                # Identical jobs in two sub-campaigns would be run twice, concurrently, into the same output file.
+                keys = {self.job_key(j) for j in campaign.jobs}
+                if len(extra.jobs) == 0 or any(self.job_key(j) in keys for j in extra.jobs):
+                    continue
+                for job in extra.jobs:
+                    job.sub_campaign = len(states)
+                campaign.jobs.extend(extra.jobs)
+                states.append(extra_state)
+                pos, benchmarks = pos | self.last_sample[0], benchmarks | self.last_sample[1]
+            self.last_sample = (pos, benchmarks)
+            if len(states) > 1:
+                state["sub_campaigns"] = states[1:]
+                print(f'Merged {len(states)} seeds into a campaign of {len(campaign.jobs)} jobs '
+                      f'for {self.slots} slots.')
+        if first_run:
+            campaign = self.prioritize(campaign)
+        # Seeds first, so that their mutants are cheap to observe.
+        for config in sorted({j.configuration for j in campaign.jobs}, key=lambda c: len(c.changes)):
+            self.interaction_coverage.observe(config)
+        state["interaction_coverage"] = self.interaction_coverage.as_dict()
+        print(f'{self.interaction_coverage.strength}-wise interaction coverage is '
+              f'{self.interaction_coverage.coverage():.1%} after '
+              f'{len(self.interaction_coverage.configurations)} distinct configurations.')
+        self.campaign_index += 1
+        return campaign, state
+
+    def target_cost(self, target: BenchmarkRecord) -> Tuple[int, float]:
+        """
+        Sort key for how expensive a target is to analyze: its learned runtime if there is one, and otherwise the size
+        of the benchmark on disk.
+        """
+        if CostModel.benchmark_key(target) in self.cost_model.benchmark_runtime:
+            return 0, self.cost_model.estimate_runtime(None, target)
+        return 1, os.path.getsize(target.name) if os.path.exists(target.name) else 0
+
+    def prioritize(self, campaign: FuzzingCampaign) -> FuzzingCampaign:
+        """
+        Orders the jobs of a campaign so that its results can be checked as a stream: cheap targets first, and all
+        jobs of a target (the seed, then one mutant per partial order) before those of the next target. Since jobs
+        are only compared to jobs on the same target, each target's violations are known once its jobs are done.
+        The sort is stable, so jobs that are more likely to fail (see skip_doomed_jobs) stay at the end of a target.
+        """
+        costs = {t.name: self.target_cost(t) for t in {j.target for j in campaign.jobs}}
+        return FuzzingCampaign(sorted(campaign.jobs, key=lambda j: (costs[j.target.name], j.target.name,
+                                                                    j.option_under_investigation is not None)))
+
+    @staticmethod
+    def job_key(job: FuzzingJob) -> Tuple[str, str]:
+        return AbstractCommandLineToolRunner.dict_hash(job.configuration), job.target.name
+
+    def next_sub_campaign(self) -> Tuple[FuzzingCampaign, Dict[Any, Any]]:
+        """
+        Samples a campaign, resampling while all of its jobs were already run (see skip_seen_jobs) or are predicted
+        to fail (see skip_doomed_jobs).
+        """
+        first_run = self.first_run
+        for _ in range(MAX_RESAMPLES):
+            campaign, state = self.sample_campaign()
+            if not first_run and self.seen is not None:
+                campaign, state["seen_skipped_jobs"], state["seen_saved_seconds"] = self.skip_seen_jobs(campaign)
+            if self.failure_predictor is not None:
+                campaign, state["doomed_skipped_jobs"], state["doomed_saved_seconds"] = \
+                    self.skip_doomed_jobs(campaign)
+            if first_run or len(campaign.jobs) > 0:
+                break
+            print("Every job in the sampled campaign was skipped. Resampling.")
+        return campaign, state
+
+    def skip_doomed_jobs(self, campaign: FuzzingCampaign) -> Tuple[FuzzingCampaign, int, float]:
+        """
+        Removes mutant jobs that the failure predictor expects to crash or time out (except for a fraction that is
+        run anyway, to keep learning), and moves the jobs that are more likely to fail to the end of the campaign.
+        Seed jobs are never removed, since every mutant on their target is compared to them.
+
+        Returns
+        -------
+        The remaining campaign, the number of jobs skipped, and the CPU seconds those jobs were expected to waste.
+        """
+        scored: List[Tuple[float, FuzzingJob]] = []
+        skipped = 0
+        saved = 0.0
+        for job in campaign.jobs:
+            probability, duration = self.failure_predictor.predict([str(l) for l in job.configuration.values()],
+                                                                   job.target.name)
+            if job.option_under_investigation is not None and self.failure_predictor.should_skip(probability):
+                skipped += 1
+                # Failures imported without a duration are assumed to take as long as a job on the target.
+                saved += duration or self.cost_model.estimate_runtime(None, job.target)
+            else:
+                scored.append((probability, job))
+        self.failure_predictor.skipped += skipped
+        self.failure_predictor.prevented_seconds += saved
+        if skipped > 0:
+            print(f'Skipped {skipped} jobs that are predicted to fail, saving {saved:.1f} seconds of compute '
+                  f'({self.failure_predictor.prevented_seconds:.1f} seconds in total).')
+        return FuzzingCampaign([job for _, job in sorted(scored, key=lambda s: s[0])]), skipped, saved
+
+    def fills_slots(self, campaign: FuzzingCampaign) -> bool:
+        """
+        True if the estimated work of the campaign keeps every slot busy for as long as its longest job runs, i.e.,
+        the campaign is not bounded by a few long jobs while the other slots idle.
+        """
+        if len(campaign.jobs) == 0:
+            return False
+        estimates = [self.cost_model.estimate_runtime(
+            None if j.option_under_investigation is None else str(j.configuration[j.option_under_investigation]),
+            j.target) for j in campaign.jobs]
+        return sum(estimates) >= self.slots * max(estimates)
+
+    def top_up_mutants(self, campaign: FuzzingCampaign) -> List[PartialOrder]:
+        """
+        Adds mutants of the campaign's seed for partial orders that were not sampled, on the targets the seed runs
+        on, until the campaign fills all slots. The mutants are compared to the seed jobs already in the campaign,
+        so topping up is cheaper than merging another seed, which brings its own seed jobs.
+
+        Returns
+        -------
+        The partial orders that were added, which are also added to last_sample.
+        """
+        seeds = [j for j in campaign.jobs if j.option_under_investigation is None and j.sub_campaign == 0]
+        if len(seeds) == 0:
+            return []
+        seed_config = seeds[0].configuration
+        targets = list({j.target.name: j.target for j in seeds}.values())
+        pos, benchmarks = self.last_sample
+        keys = {self.job_key(j) for j in campaign.jobs}
+        added: List[PartialOrder] = []
+        held_out = [p for p in self.partial_orders if p not in pos]
+        for p in random.sample(held_out, len(held_out)):
+            if self.fills_slots(campaign):
+                break
+            jobs = [FuzzingJob(c.config, c.option, t) for c in self.mutate_config(seed_config, p) for t in targets]
+            jobs = [j for j in jobs if self.job_key(j) not in keys]
+            if self.failure_predictor is not None:
+                jobs = self.skip_doomed_jobs(FuzzingCampaign(jobs))[0].jobs
+            if len(jobs) == 0:
+                continue
+            campaign.jobs.extend(jobs)
+            keys.update(self.job_key(j) for j in jobs)
+            # The partial order was sampled after all, so it does not gain the weight of held-out partial orders.
+            self.partial_orders[p] -= 1
+            added.append(p)
+        self.last_sample = (set(pos) | set(added), benchmarks)
+        return added
+
+    def skip_seen_jobs(self, campaign: FuzzingCampaign) -> Tuple[FuzzingCampaign, int, float]:
+        """
+        Removes jobs that were run in an earlier campaign. A job is only kept or removed together with every job it
+        is compared to: jobs are compared to jobs with the same target and sub-campaign, and either the same option
+        under investigation or none (the seed), so a seed ties all of its mutants together. Such a group is only
+        removed if all of its jobs were run before, in which case all of its comparisons have been done before.
+
+        Returns
+        -------
+        The remaining campaign, the number of jobs skipped, and the execution time those jobs took originally.
+        """
+        by_target: Dict[Tuple[str, int], List[FuzzingJob]] = {}
+        for job in campaign.jobs:
+            by_target.setdefault((job.target.name, job.sub_campaign), []).append(job)
+        groups: Dict[Tuple[str, int, Option | None], List[FuzzingJob]] = {}
+        for (target, sub_campaign), jobs in by_target.items():
+            has_seed = any(j.option_under_investigation is None for j in jobs)
+            for job in jobs:
+                groups.setdefault((target, sub_campaign, None if has_seed else job.option_under_investigation),
+                                  []).append(job)
+        kept: List[FuzzingJob] = []
+        saved = 0.0
+        for group in groups.values():
+            earlier = [self.seen.get(AbstractCommandLineToolRunner.dict_hash(j.configuration),
+                                     os.path.basename(j.target.name)) for j in group]
+            if all(e is not None and e[0] < self.campaign_index for e in earlier):
+                saved += sum(e[1] for e in earlier)
+            else:
+                kept.extend(group)
+        skipped = len(campaign.jobs) - len(kept)
+        if skipped > 0:
+            print(f'Skipped {skipped} jobs that were already run, saving {saved:.1f} seconds of compute.')
+        return FuzzingCampaign(kept), skipped, saved
+
+    def load_manifests(self, results_location: str | Path) -> int:
+        """
+        Warm-starts the cost model, and the failure predictor if there is one, from the campaign manifests under
+        results_location. The jobs they contain are not learned from again when their campaign is replayed.
+        """
+        for manifest_file in Path(results_location).rglob(MANIFEST_NAME):
+            folder = manifest_file.parent
+            self.loaded_jobs.update((str(folder.resolve()), e.config_hash, e.target)
+                                    for e in JobManifest(folder).entries())
+        if self.failure_predictor is not None:
+            self.failure_predictor.load_manifests(results_location)
+        return self.cost_model.load_manifests(results_location)
+
+    def record_finished(self, campaign: FuzzingCampaign, results: Iterable[FinishedFuzzingJob], campaign_index: int,
+                        campaign_folder: Optional[str | Path] = None):
+        """
+        Learns the runtimes and failures of a campaign that has been run, and adds its jobs to the seen-set, if there
+        is one. The durations of failed jobs are read from the manifest in campaign_folder. Jobs that were already
+        learned from by load_manifests (i.e., of a campaign that is being replayed) are not learned from again.
+        """
+        results = [r for r in results if r is not None]
+        folder = None if campaign_folder is None else str(Path(campaign_folder).resolve())
+        new_jobs = [j for j in campaign.jobs if (folder, AbstractCommandLineToolRunner.dict_hash(j.configuration),
+                                                 os.path.basename(j.target.name)) not in self.loaded_jobs]
+        new_keys = {self.job_key(j) for j in new_jobs}
+        self.cost_model.observe_results(r for r in results if self.job_key(r.job) in new_keys)
+        # Results are matched to jobs by value: results that were pickled (or reloaded) hold copies of the jobs.
+        execution_times = {self.job_key(r.job): r.execution_time for r in results}
+        if self.failure_predictor is not None:
+            # Read afresh, in case the jobs were recorded by another process.
+            manifest = None if campaign_folder is None else JobManifest(campaign_folder)
+            for job in new_jobs:
+                failed = self.job_key(job) not in execution_times
+                execution_time = execution_times.get(self.job_key(job), 0.0)
+                if failed and manifest is not None:
+                    entry = manifest.get(*self.job_key(job))
+                    execution_time = 0.0 if entry is None else entry.execution_time
+                self.failure_predictor.observe([str(l) for l in job.configuration.values()], job.target.name,
+                                               failed, execution_time)
+        if self.seen is None:
+            return
+        for job in campaign.jobs:
+            self.seen.add(AbstractCommandLineToolRunner.dict_hash(job.configuration),
+                          os.path.basename(job.target.name), campaign_index, execution_times.get(self.job_key(job), 0.0))
+
+    def sample_campaign(self) -> Tuple[FuzzingCampaign, Dict[Any, Any]]:
+        """
+        Samples a campaign: a seed configuration, its mutants, and the benchmarks to run them on.
         """
         if len(self.partial_orders) == 0:
             print("All out of partial orders!")
             exit(0)
+        invalid_before = self.constraints.repaired + self.constraints.dropped
         seed_config = self.make_new_seed()
-        seed_config = fill_out_defaults(self.model, seed_config)
+        seed_config = ConfigMap(fill_out_defaults(self.model, seed_config))
         logger.info(f"Configuration is {[(str(k), str(v)) for k, v in seed_config.items()]}")
         results: List[FuzzingJob] = list()
         candidate_sample = set()
@@ -170,7 +512,16 @@ class FuzzGenerator:
             candidate_sample.add(ConfigWithMutatedOption(seed_config, None, None))
             benchmarks_sample = self.benchmark_population.keys()
         else:
-            if not self.full_campaigns:
+            if self.strategy is FuzzOptions.COST_AWARE and not self.full_campaigns:
+                pos, benchmarks_sample = self.cost_model.select(self.partial_orders.keys(),
+                                                                self.benchmark_population.keys(), self.cpu_budget)
+            elif self.strategy is FuzzOptions.BANDIT and not self.full_campaigns:
+                benchmarks_sample = set(self.benchmark_bandit.choose(
+                    self.benchmark_population.keys(), 4, cost=lambda b: self.cost_model.estimate_runtime(None, b)))
+                pos = set(self.partial_order_bandit.choose(
+                    self.partial_orders.keys(), 2,
+                    cost=lambda p: sum(self.cost_model.estimate_cost(p, b) for b in benchmarks_sample)))
+            elif not self.full_campaigns:
                 while len(pos) < min(len(self.partial_orders), 2):
                     pos.update(random.sample(self.partial_orders.keys(), 1,
                                              counts=self.partial_orders.values() if self.strategy is
@@ -179,15 +530,16 @@ class FuzzGenerator:
                 # Use all partial orders.
                 pos = self.partial_orders.keys()
             [candidate_sample.update(self.mutate_config(seed_config, p)) for p in pos]
-            benchmarks_sample = set()
 
-            if not self.full_campaigns:
+            if self.full_campaigns:
+                benchmarks_sample = self.benchmark_population.keys()
+            elif self.strategy not in [FuzzOptions.COST_AWARE, FuzzOptions.BANDIT]:
+                # The other strategies chose the benchmarks together with the partial orders.
+                benchmarks_sample = set()
                 while len(benchmarks_sample) < min(4, len(self.benchmark_population)):
                     benchmarks_sample.update(random.sample(self.benchmark_population.keys(), 1,
                                                            counts=self.benchmark_population.values() if
                                                            self.strategy is FuzzOptions.GUIDED else None))
-            else:
-                benchmarks_sample = self.benchmark_population.keys()
 
             # Levels not selected
             held_out = [p for p in self.partial_orders if p not in pos]
@@ -206,20 +558,88 @@ class FuzzGenerator:
                 benchmark_record: BenchmarkRecord
                 results.append(FuzzingJob(choice, option_under_investigation, benchmark_record))
 
+        # Each configuration that broke a constraint would have crashed on every benchmark.
+        prevented = (self.constraints.repaired + self.constraints.dropped - invalid_before) * len(benchmarks_sample)
+        if prevented > 0:
+            self.prevented_jobs += prevented
+            print(f'Prevented {prevented} invalid jobs ({self.prevented_jobs} in total) by repairing or dropping '
+                  f'configurations that break constraints.')
+
         self.first_run = False
+        self.last_sample = (set(pos), set(benchmarks_sample))
         state = {"seed": {str(k): str(v) for k, v in seed_config.items()},
                  "first_run": self.first_run,
                  "partial_orders": {str(k): str(v) for k, v in self.partial_orders.items()},
                  "benchmarks": {str(k): str(v) for k, v in self.benchmark.items()},
                  "partial_order_sample": [str(k) for k in pos],
-                 "benchmarks_sample": [str(k) for k in benchmarks_sample]
+                 "benchmarks_sample": [str(k) for k in benchmarks_sample],
+                 "prevented_invalid_jobs": prevented
                  }
+        if self.strategy is FuzzOptions.COST_AWARE:
+            state["estimates"] = self.cost_model.as_dict(self.partial_orders.keys())
+            state["estimated_cost"] = sum(self.cost_model.estimate_cost(p, b) for p in pos for b in benchmarks_sample)
+        if self.strategy is FuzzOptions.BANDIT:
+            state["bandit"] = self.bandit_as_dict()
         return FuzzingCampaign(results), state
 
+    def bandit_as_dict(self) -> Dict[str, Any]:
+        return {"partial_orders": self.partial_order_bandit.as_dict(),
+                "benchmarks": self.benchmark_bandit.as_dict(),
+                "found_violations": sorted(self.found_violations)}
+
+    def load_bandit_state(self) -> bool:
+        """Resumes the BANDIT posteriors from bandit_state, if it exists."""
+        if self.bandit_state is None or not os.path.exists(self.bandit_state):
+            return False
+        with open(self.bandit_state) as f:
+            state = json.load(f)
+        self.partial_order_bandit.load_dict(state["partial_orders"])
+        self.benchmark_bandit.load_dict(state["benchmarks"])
+        self.found_violations = set(state["found_violations"])
+        return True
+
+    def update_bandits(self, violations: List[PotentialViolation]):
+        """
+        Rewards each partial order and benchmark of the last campaign that exhibited a violation that had not been
+        found before. Rediscovering a known violation is not a reward, so arms that keep finding the same
+        violations lose out to arms that find new ones.
+        """
+        new_violations: List[PotentialViolation] = []
+        for v in [v for v in violations if v.is_violation and not v.is_transitive]:
+            signature = f'{sorted(str(p) for p in v.partial_orders)}@{os.path.basename(v.job1.job.target.name)}'
+            if signature not in self.found_violations:
+                self.found_violations.add(signature)
+                new_violations.append(v)
+
+        def exhibits(p: PartialOrder, v: PotentialViolation) -> bool:
+            # Violations of integer options have concrete levels, rather than the symbolic ones of the model.
+            return p in v.partial_orders or (p.option.type.startswith('int') and
+                                             p.option == v.get_option_under_investigation())
+
+        pos, benchmarks = self.last_sample
+        for p in pos:
+            self.partial_order_bandit.update(p, any(exhibits(p, v) for v in new_violations))
+        for b in benchmarks:
+            self.benchmark_bandit.update(b, any(v.job1.job.target == b for v in new_violations))
+        if self.bandit_state is not None:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.bandit_state)), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.bandit_as_dict(), f)
+            os.replace(tmp, self.bandit_state)
+        print(f'{len(new_violations)} new violations.')
+
     def feedback(self, violations: Iterable[PotentialViolation]):
+            violations = list(violations)
+            self.cost_model.observe_violations(violations)
+            if self.strategy is FuzzOptions.BANDIT:
+                self.update_bandits(violations)
             buggy_benchmarks = set()
             for v in [v for v in violations if v.is_violation and not v.is_transitive]:
                 o: Option = v.get_option_under_investigation()
+                if self.strategy is FuzzOptions.BANDIT:
+                    # The bandit keeps testing partial orders on other benchmarks if that keeps paying off.
+                    buggy_benchmarks.add(v.job1.job.target)
+                    continue
 
                 # Don't retest levels that already exhibited violations.
                 if o.type.lower().startswith('int'):
@@ -239,16 +659,17 @@ class FuzzGenerator:
                 else:
                     self.benchmark_population[k] = max(self.benchmark_population[k] - 1, 1)
 
-    def mutate_config(self, config: Dict[Option, Level], partial_order) -> List[Tuple[ConfigWithMutatedOption, int]]:
+    def mutate_config(self, config: Mapping[Option, Level], partial_order) -> List[ConfigWithMutatedOption]:
         """
         Given a configuration, generate every potential mutant of it that uses a configuration option in a partial
-        order.
+        order. Mutants share the configuration's entries (see ConfigMap), so pass a ConfigMap to avoid a copy.
         """
         candidates: List[ConfigWithMutatedOption] = list()
+        config = config if isinstance(config, ConfigMap) else ConfigMap(config)
         for level in [partial_order.left, partial_order.right]:
             o = partial_order.option
             if o not in config:
-                config[o] = o.get_default()
+                config = config.set(o, o.get_default())
             if level == config[o]:
                 continue
             if o.type.startswith('int'):
@@ -258,7 +679,10 @@ class FuzzGenerator:
                     logging.info(f'Sampled level {str(level)}')
                 else:
                     level = Level(o.name, int(level.level_name))
-            config_copy = copy.deepcopy(config)
-            config_copy[o] = level
-            candidates.append((ConfigWithMutatedOption(frozendict(config_copy), o, level)))
+            # A mutant may only differ from its configuration in o, or the comparison would not isolate o; a mutant
+            # that breaks a constraint cannot be repaired without changing another option, so it is dropped.
+            mutant = self.constraints.repair(config.set(o, level), fixed=self.model.get_options())
+            if mutant is None:
+                continue
+            candidates.append(ConfigWithMutatedOption(mutant, o, level))
         return candidates
@@ -20,8 +20,8 @@ from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator
 from src.ecstatic.fuzzing.generators.SOOTFuzzGenerator import SOOTFuzzGenerator
 
 
-def get_fuzz_generator_for_name(name: str, *args):
+def get_fuzz_generator_for_name(name: str, *args, **kwargs):
     if name.lower() == "soot":
-        return SOOTFuzzGenerator(*args)
+        return SOOTFuzzGenerator(*args, **kwargs)
     else:
-        return FuzzGenerator(*args)
+        return FuzzGenerator(*args, **kwargs)
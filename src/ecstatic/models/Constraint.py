@@ -0,0 +1,73 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+REQUIRES = 'requires'
+EXCLUDES = 'excludes'
+
+
+@dataclass
+class Constraint:
+    """
+    A compatibility rule between options, as option name -> allowed level names.
+
+    If every option in `when` is set to one of its levels, then a `requires` rule needs every option in `then` to be
+    set to one of its levels, and an `excludes` rule forbids every option in `then` to be set to one of its levels
+    at the same time.
+    """
+    kind: str
+    when: Dict[str, List[str]]
+    then: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __hash__(self):
+        return hash(json.dumps(self.as_dict(), sort_keys=True))
+
+    def __str__(self):
+        return f'{self.when} {self.kind} {self.then}'
+
+    def options(self) -> List[str]:
+        return [*self.when, *self.then]
+
+    def applies(self, levels: Dict[str, str]) -> bool:
+        """True if the rule's condition holds for a configuration, given as option name -> level name."""
+        return all(levels.get(o) in allowed for o, allowed in self.when.items())
+
+    def is_satisfied(self, levels: Dict[str, str]) -> bool:
+        if not self.applies(levels):
+            return True
+        matches = [levels.get(o) in allowed for o, allowed in self.then.items()]
+        return all(matches) if self.kind == REQUIRES else not all(matches)
+
+    @staticmethod
+    def from_dict(d):
+        """
+        Reads {"when": {option: level(s)}, "requires" | "excludes": {option: level(s)}}, where level(s) is a level
+        name or a list of them.
+        """
+        kind = REQUIRES if REQUIRES in d else EXCLUDES
+        if kind not in d:
+            raise ValueError(f'Constraint {d} has neither "{REQUIRES}" nor "{EXCLUDES}".')
+
+        def levels(conditions: Dict[str, str | List[str]]) -> Dict[str, List[str]]:
+            return {o: [str(l) for l in (v if isinstance(v, list) else [v])] for o, v in conditions.items()}
+
+        return Constraint(kind, levels(d.get('when', {})), levels(d[kind]))
+
+    def as_dict(self):
+        return {'when': self.when, self.kind: self.then}
@@ -47,12 +47,23 @@ class Option:
     """ A single configuration option. """
     soundness = 0
     precision = 0
+    _hash = None  # Also the value for Options pickled before hashes were cached.
 
     def __hash__(self) -> int:
-        return hash((self.name, frozenset(self.all)))
+        # Options key every configuration, so the hash is cached until the levels change.
+        if self._hash is None:
+            self._hash = hash((self.name, frozenset(self.all)))
+        return self._hash
+
+    def __getstate__(self):
+        # String hashes differ between processes, so a cached hash must not travel with a pickled Option.
+        state = self.__dict__.copy()
+        state.pop('_hash', None)
+        return state
 
     def __init__(self, name, type="enum",
                  min_value=-2147483648, max_value=2147483647):
+        self._hash = None
         self.partial_orders = set()
         self.name = name
         self.precision = DiGraph()
@@ -87,6 +98,7 @@ class Option:
 
     def add_level(self, level):
         """Add a level of the option to the master list."""
+        self._hash = None
         if isinstance(level, Level):
             self.all.add(level)
         else:
@@ -16,6 +16,7 @@
 #      along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
+from src.ecstatic.models.Constraint import Constraint
 from src.ecstatic.models.Level import Level
 from src.ecstatic.models.Option import Option
 
@@ -35,8 +36,8 @@ class Tool:
         """Construct a Tool object from a dictionary produced by self.as_dict()"""
         t = Tool(d["name"])
         t.options = [Option.from_dict(o) for o in d['options']]
+        t.constraints = {Constraint.from_dict(c) for c in d.get('constraints', [])}
         return t
-        #t.constraints = [from_dict(c) for c in d['options']]
 
     def as_dict(self):
         """Return the dictionary representation of this object."""
@@ -21,13 +21,15 @@ import xml.etree.ElementTree as ElementTree
 
 from src.ecstatic.models.Flow import Flow
 from src.ecstatic.readers.AbstractReader import AbstractReader
+from src.ecstatic.util.Compression import open_result
 
 logger = logging.getLogger(__name__)
 class FlowDroidFlowReader(AbstractReader):
 
     def import_file(self, file: str) -> Iterable[Flow]:
         try:
-            result = [Flow(f) for f in ElementTree.parse(file).getroot().find('flows').findall('flow')]
+            with open_result(file, 'rb') as infile:
+                result = [Flow(f) for f in ElementTree.parse(infile).getroot().find('flows').findall('flow')]
             logger.info(f'Found {len(result)} flows in file {file}')
             return result
         except AttributeError:
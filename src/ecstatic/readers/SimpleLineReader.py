@@ -33,10 +33,11 @@
 from typing import Iterable
 
 from src.ecstatic.readers.AbstractReader import AbstractReader, T
+from src.ecstatic.util.Compression import open_result
 
 
 class SimpleLineReader(AbstractReader):
     def import_file(self, file: str) -> Iterable[T]:
-        with open(file, 'r') as f:
+        with open_result(file) as f:
             lines = f.readlines()
             return lines
\ No newline at end of file
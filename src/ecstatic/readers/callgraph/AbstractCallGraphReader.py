@@ -23,6 +23,7 @@ from typing import Tuple, List, Any
 from src.ecstatic.readers.AbstractReader import AbstractReader
 from src.ecstatic.util.CGCallSite import CGCallSite
 from src.ecstatic.util.CGTarget import CGTarget
+from src.ecstatic.util.Compression import open_result
 
 logger = logging.getLogger(__name__)
 
@@ -32,13 +33,13 @@ class AbstractCallGraphReader(AbstractReader):
     def import_file(self, file: Path) -> Any:
         logger.info(f'Reading callgraph from {file}')
         callgraph: List[Tuple[CGCallSite, CGTarget]] = []
-        with open(file) as f:
-            lines = f.readlines()
-        for line in lines:
-            try:
-                callgraph.append(self.process_line(line))
-            except IndexError:
-                logging.critical(f"Could not read line: {line}")
+        # Lines are processed as they are decompressed, rather than reading the whole file into memory first.
+        with open_result(file) as f:
+            for line in f:
+                try:
+                    callgraph.append(self.process_line(line))
+                except IndexError:
+                    logging.critical(f"Could not read line: {line}")
         return list(filter(lambda x: x is not None, callgraph))
 
     def process_line(self, line: str) -> Tuple[Any, Any]:
@@ -23,13 +23,20 @@ import os
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, Tuple, Optional
 
 from src.ecstatic.models.Level import Level
 from src.ecstatic.models.Option import Option
+from src.ecstatic.util.BlobStore import BlobStore
+from src.ecstatic.util.Compression import compress_file, open_result, SUFFIXES
+from src.ecstatic.util.JobManifest import get_manifest, ManifestEntry, SUCCESS, ERROR
+from src.ecstatic.util.OutputLayout import shard_directory
 from src.ecstatic.util.UtilClasses import FinishedFuzzingJob, FuzzingJob
 
 logger = logging.getLogger(__name__)
+
+# How much of a failed job's output is kept in the manifest.
+MAX_EXIT_REASON_LENGTH = 2000
 """
 Base class for command line tool runners.
 """
@@ -45,6 +52,12 @@ class AbstractCommandLineToolRunner(ABC):
     def __init__(self):
         self._timeout = None
         self.whole_program: bool = False
+        # How many levels of hash-prefix directories to put results in (0 is a flat campaign folder).
+        self.shard_depth: int = 0
+        # Codec to compress outputs with once the tool has finished (see Compression.CODECS), or None.
+        self.compression: Optional[str] = None
+        # Where to store outputs by content, so that identical outputs are only on disk once. None disables this.
+        self.blob_store: Optional[BlobStore] = None
 
     @property
     def timeout(self):
@@ -72,22 +85,77 @@ class AbstractCommandLineToolRunner(ABC):
                 result += f'--{k.name} '
         return result.strip()
 
+    @staticmethod
+    def get_sidecar_file(output: str, suffix: str) -> str:
+        """Hidden file next to an output, e.g., .<output>.log"""
+        return os.path.join(os.path.dirname(output), '.' + os.path.basename(output) + suffix)
+
     def get_time_file(self, output_folder: str, job: FuzzingJob):
-        return os.path.join(output_folder,
-                            '.' + os.path.basename(self.get_output(output_folder, job)) + '.time')
+        """Location of the legacy time sidecar file. Only read, to import results from before job manifests."""
+        return self.get_sidecar_file(self.get_output(output_folder, job), '.time')
 
     def get_log_file(self, output_folder: str, job: FuzzingJob):
-        return os.path.join(output_folder,
-                            '.' + os.path.basename(self.get_output(output_folder, job)) + '.log')
+        return self.get_sidecar_file(self.get_output(output_folder, job), '.log')
 
     def get_error_file(self, output_folder: str, job):
+        """Location of the legacy error sidecar file. Only read, to import results from before job manifests."""
         return os.path.abspath(self.get_output(output_folder, job) + '.error')
 
+    def get_config_hash(self, job: FuzzingJob) -> str:
+        """Returns dict_hash of the job's configuration, computing it at most once per job."""
+        if getattr(job, 'config_hash', None) is None:
+            job.config_hash = self.dict_hash(job.configuration)
+        return job.config_hash
+
+    def make_manifest_entry(self, job: FuzzingJob, output_folder: str, status: str, execution_time: float,
+                            output: Optional[str] = None, output_digest: Optional[str] = None,
+                            exit_reason: Optional[str] = None) -> ManifestEntry:
+        return ManifestEntry(config_hash=self.get_config_hash(job),
+                             target=os.path.basename(job.target.name),
+                             status=status,
+                             execution_time=execution_time,
+                             output=None if output is None else os.path.relpath(output, output_folder),
+                             output_digest=output_digest,
+                             exit_reason=exit_reason,
+                             configuration={str(k): str(v) for k, v in job.configuration.items()},
+                             config_str=self.dict_to_config_str(job.configuration),
+                             option_under_investigation=None if job.option_under_investigation is None else
+                             str(job.option_under_investigation))
+
+    def import_legacy_results(self, job: FuzzingJob, output_folder: str) -> Optional[ManifestEntry]:
+        """
+        Recovers the status of a job from the sidecar files (.time, .error, .error.time) that were written
+        before job manifests existed. Results are looked for in both the configured layout and the flat layout,
+        so folders created before sharding was enabled can still be resumed. Returns None if the job has not been run.
+        """
+        basename = os.path.basename(self.get_output(output_folder, job))
+        for depth in dict.fromkeys([self.shard_depth, 0]):
+            output = os.path.join(shard_directory(output_folder, self.get_config_hash(job), depth), basename)
+            try:
+                if os.path.exists(output):
+                    with open(self.get_sidecar_file(output, '.time'), 'r') as f:
+                        execution_time = float(f.read().strip())
+                    return self.make_manifest_entry(job, output_folder, SUCCESS, execution_time, output,
+                                                    self.file_digest(output))
+            except Exception:
+                logging.exception("Time file was not created, so starting over.")
+                os.remove(output)
+            if os.path.exists(error_file := output + '.error'):
+                with open(error_file, 'r') as f:
+                    exit_reason = f.read()
+                try:
+                    with open(self.get_sidecar_file(output, '.error.time'), 'r') as f:
+                        execution_time = float(f.read().strip())
+                except (OSError, ValueError):
+                    execution_time = 0.0
+                return self.make_manifest_entry(job, output_folder, ERROR, execution_time, exit_reason=exit_reason)
+        return None
+
     def run_job(self, job: FuzzingJob, output_folder: str, num_retries: int = 1) -> FinishedFuzzingJob | None:
         """
         Runs the job, producing outputs in output_folder. Can try to rerun the job if the execution fails
-        (i.e., if try_run_job throws an exception). If we cannot run the job within num_retries tries,
-        this will produce a .error file indicating to future executions that we should not try to rerun.
+        (i.e., if try_run_job throws an exception). Every outcome is recorded in the campaign's job manifest;
+        a job that succeeded is not rerun, and a job that failed num_retries times is not retried in the future.
 
         Parameters
         ----------
@@ -99,66 +167,67 @@ class AbstractCommandLineToolRunner(ABC):
         -------
         A FinishedFuzzingJob if running the job was successful. Otherwise None.
         """
+        manifest = get_manifest(output_folder)
+        entry = manifest.get(self.get_config_hash(job), job.target.name)
+        if entry is None and manifest.legacy_import_pending:
+            # Results folders from before manifests existed are imported job by job.
+            if (entry := self.import_legacy_results(job, output_folder)) is not None:
+                manifest.record(entry)
 
-        # Create a configurations folder so we can map hashes to configurations.
-        configurations_folder = os.path.join(output_folder, 'configurations')
-        Path(configurations_folder).mkdir(exist_ok=True, parents=True)
-        configuration_file = os.path.join(configurations_folder,
-                                          f'{AbstractCommandLineToolRunner.dict_hash(job.configuration)}.txt')
-        if not os.path.exists(configuration_file):
-            with open(configuration_file, 'w') as f:
-                f.write(self.dict_to_config_str(job.configuration))
+        if entry is not None:
+            if entry.status == SUCCESS:
+                logging.info(f'{entry.output} already exists. Returning that.')
+                return FinishedFuzzingJob(job, entry.execution_time, os.path.join(output_folder, entry.output),
+                                          output_digest=entry.output_digest)
+            logger.critical(f"Job {entry.config_hash} on {entry.target} already failed, aborting.")
+            return None
 
+        Path(os.path.dirname(self.get_output(output_folder, job))).mkdir(exist_ok=True, parents=True)
+        # An output left by an earlier attempt may be a link to a shared blob; a tool that truncated it in place
+        # would corrupt every result with the same content. Tools always write to a fresh file instead.
+        for stale in [self.get_output(output_folder, job) + suffix for suffix in ['', *SUFFIXES.values()]]:
+            if os.path.lexists(stale):
+                os.unlink(stale)
         exception = None
         num_runs = 0
-
-        try:
-            if os.path.exists(self.get_output(output_folder, job)):
-                logging.info(f'{self.get_output(output_folder, job)} already exists. Returning that.')
-                with open(self.get_time_file(output_folder, job), 'r') as f:
-                    execution_time = float(f.read().strip())
-
-                return FinishedFuzzingJob(job, execution_time, self.get_output(output_folder, job))
-        except Exception:
-            logging.exception("Time file was not created, so starting over.")
-            os.remove(self.get_output(output_folder, job))
-
-        while num_runs < num_retries and not os.path.exists(
-                self.get_output(output_folder, job) + '.error'):
+        start = time.time()
+        while num_runs < num_retries:
             # noinspection PyBroadException
             try:
                 start = time.time()
                 result, log_output = self.try_run_job(job, output_folder)
                 logging.info(f'Successfully ran job! Result is in {result}')
                 total_time = time.time() - start
-                with open(self.get_time_file(output_folder, job), 'w') as f:
-                    f.write(f'{str(total_time)}\n')
                 with open(self.get_log_file(output_folder, job), 'w') as f:
                     f.write(log_output)
-                return FinishedFuzzingJob(job, total_time, result)
+                digest = self.file_digest(result)
+                if self.compression is not None:
+                    result = compress_file(result, self.compression)
+                if self.blob_store is not None:
+                    self.blob_store.put(result, digest)
+                manifest.record(self.make_manifest_entry(job, output_folder, SUCCESS, total_time, result, digest))
+                return FinishedFuzzingJob(job, total_time, result, output_digest=digest)
             except Exception as ex:
                 exception = ex
                 num_runs += 1
                 logger.exception(f"Failed running job {num_runs} time(s).")
 
         # If we get here we failed too many times and we just abort.
-        if os.path.exists(self.get_error_file(output_folder, job)):
-            logger.critical(f"Error file {self.get_error_file(output_folder, job)} already exists, aborting.")
-        else:
-            logger.critical("Failed running job maximum number of times. Sorry!")
-            # Create a file so we know not to retry this job in the future.
-            if exception is None:
-                raise RuntimeError(f"Job {job} failed, but didn't produce an exception.")
-            with open(self.get_output(output_folder, job) + '.error', 'w') as f:
-                f.write(str(exception))
-            with open(self.get_time_file(output_folder, job).replace('.time', '.error.time'), 'w') as f:
-                f.write(f'{str(time.time() - start)}')
+        logger.critical("Failed running job maximum number of times. Sorry!")
+        if exception is None:
+            raise RuntimeError(f"Job {job} failed, but didn't produce an exception.")
+        # Record the failure so we know not to retry this job in the future. The full output goes to the log file;
+        # the manifest only keeps the tail, so that it stays cheap to scan.
+        with open(self.get_log_file(output_folder, job), 'w') as f:
+            f.write(str(exception))
+        manifest.record(self.make_manifest_entry(job, output_folder, ERROR, time.time() - start,
+                                                 exit_reason=str(exception)[-MAX_EXIT_REASON_LENGTH:]))
         return None
 
     def get_output(self, output_folder: str, job: FuzzingJob) -> str:
         """
-        Returns the name of the output file. If this file exists, then the tool will not try to
-        rerun it -- rather, it will just return this file.
+        Returns the name of the output file. With a nonzero shard_depth, the file is placed in hash-prefix
+        subdirectories of the output folder.
         Parameters
         ----------
         output_folder: Where to write results.
@@ -168,8 +237,9 @@ class AbstractCommandLineToolRunner(ABC):
         -------
         The output file name, including the output folder.
         """
-        return os.path.join(output_folder,
-                            f'{self.dict_hash(job.configuration)}_{os.path.basename(job.target.name)}.raw')
+        config_hash = self.get_config_hash(job)
+        return os.path.join(shard_directory(output_folder, config_hash, self.shard_depth),
+                            f'{config_hash}_{os.path.basename(job.target.name)}.raw')
 
     @abstractmethod
     def try_run_job(self, job: FuzzingJob, output_folder: str) -> Tuple[str, str]:
@@ -202,3 +272,16 @@ class AbstractCommandLineToolRunner(ABC):
         encoded = json.dumps(clone, sort_keys=True).encode()
         dhash.update(encoded)
         return dhash.hexdigest()
+
+    @staticmethod
+    def file_digest(file: str, chunk_size: int = 1 << 20) -> str:
+        """SHA-256 digest of a result file's content.
+        Unlike dict_hash, which identifies the configuration that produced an output, this identifies the output
+        itself, so two runs that produced byte-identical results share a digest. Compressed results are digested
+        by their decompressed content, so the digest does not depend on the codec.
+        """
+        fhash = hashlib.sha256()
+        with open_result(file, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                fhash.update(chunk)
+        return fhash.hexdigest()
@@ -28,16 +28,17 @@ from src.ecstatic.models.Level import Level
 from src.ecstatic.models.Option import Option
 from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
 from src.ecstatic.util import FuzzingJob
+from src.ecstatic.util.OutputLayout import shard_directory
 from src.ecstatic.util.UtilClasses import FinishedFuzzingJob, BenchmarkRecord
 
 logger = logging.getLogger(__name__)
 
-def create_shell_file(job: FuzzingJob, output_folder: str) -> str:
+def create_shell_file(job: FuzzingJob, output_folder: str, shard_depth: int = 0) -> str:
     """Create a shell script file with the configuration the fuzzer is generating."""
     config_str = FlowDroidRunner.dict_to_config_str(job.configuration)
     hash_value = AbstractCommandLineToolRunner.dict_hash(job.configuration)
-    shell_file_dir = os.path.join(output_folder, "shell_files")
-    Path(shell_file_dir).mkdir(exist_ok=True)
+    shell_file_dir = shard_directory(os.path.join(output_folder, "shell_files"), hash_value, shard_depth)
+    Path(shell_file_dir).mkdir(exist_ok=True, parents=True)
 
     shell_file_name = os.path.join(shell_file_dir,
                                    f"{hash_value}.sh")
@@ -67,11 +68,12 @@ def category_and_apk(path: str) -> str:
     return f'{os.path.basename(os.path.dirname(path))}_{os.path.basename(path)}'
 
 
-def create_xml_config_file(shell_file_path: str, apk: BenchmarkRecord, output_folder: str) -> str:
+def create_xml_config_file(shell_file_path: str, apk: BenchmarkRecord, output_folder: str,
+                           shard_depth: int = 0) -> str:
     """Fill out the template file with information from ecstatic's config."""
-    xml_output_folder = os.path.join(output_folder, "xml_scripts")
-    Path(xml_output_folder).mkdir(exist_ok=True)
     prefix = os.path.basename(shell_file_path).replace('.sh', '')
+    xml_output_folder = shard_directory(os.path.join(output_folder, "xml_scripts"), prefix, shard_depth)
+    Path(xml_output_folder).mkdir(exist_ok=True, parents=True)
     xml_output_file = os.path.join(xml_output_folder,
                                    f"{prefix + '_' + os.path.basename(apk.name)}.xml")
     flowdroid_output = os.path.abspath(xml_output_file) + ".flowdroid.result"
@@ -125,8 +127,8 @@ class FlowDroidRunner(AbstractCommandLineToolRunner):
 
     def try_run_job(self, job: FuzzingJob, output_folder: str) -> Tuple[str, str]:
         result_location: str
-        shell_location: str = create_shell_file(job, output_folder)
-        xml_location: str = create_xml_config_file(shell_location, job.target, output_folder)
+        shell_location: str = create_shell_file(job, output_folder, self.shard_depth)
+        xml_location: str = create_xml_config_file(shell_location, job.target, output_folder, self.shard_depth)
         logger.info(f'Running job with configuration {xml_location} on apk {job.target.name}')
         result_location, output = self.run_aql(job, self.get_output(output_folder, job), xml_location)
         logger.info(f'Job on configuration {xml_location} on apk {job.target} done.')
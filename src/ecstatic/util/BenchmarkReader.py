@@ -22,8 +22,6 @@ import logging
 import os.path
 from pathlib import Path
 
-from jsonschema.validators import RefResolver, Draft7Validator
-
 from src.ecstatic.util.ApplicationCodeFilter import ApplicationCodeFilter
 from src.ecstatic.util.JavaApplicationCodeFilter import JavaApplicationCodeFilter
 from src.ecstatic.util.UtilClasses import Benchmark, BenchmarkRecord
@@ -84,6 +82,7 @@ class BenchmarkReader:
         self.schema = schema
         with open(schema, 'r') as f:
             self.schema = json.load(f)
+        from jsonschema.validators import RefResolver, Draft7Validator
         self.resolver = RefResolver.from_schema(self.schema)
         self.validator = Draft7Validator(self.schema, self.resolver)
         self.application_code_filter = application_code_filter
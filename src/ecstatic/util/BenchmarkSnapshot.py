@@ -0,0 +1,108 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import copy
+import fcntl
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_ROOT = "/benchmarks"
+
+# ioctl that shares a file's blocks with another file (btrfs, xfs, ...).
+FICLONE = 0x40049409
+
+
+def clone_file(src: str, dst: str) -> bool:
+    """
+    Copies src to dst as a reflink, which is instant and shares blocks until one of the files is written. Falls back
+    to an ordinary copy on file systems without reflinks. Returns True if the file was reflinked.
+    """
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        shutil.copy2(src, dst)
+        return False
+
+
+class BenchmarkSnapshot:
+    """
+    Creates a private workspace for a benchmark, e.g., for delta debugging, which rewrites a benchmark's sources and
+    rebuilds it. The workspace only holds what belongs to one benchmark record: its sources, build script, target, and
+    dependencies, at the same paths relative to the root folder as in the corpus. Everything else in the corpus is
+    left out, so a record must list what its build needs. A build may write to any of these files, so none of them is
+    linked to the corpus; they are copied as reflinks where the file system supports them, which makes a snapshot
+    almost free, and copied outright otherwise.
+
+    Paths in a snapshot are the original paths with the root folder moved into the workspace, as if the root had
+    been copied there (so BenchmarkReader.validate resolves them the same way).
+    """
+
+    def __init__(self, root: str = BENCHMARKS_ROOT):
+        self.root = os.path.abspath(root)
+        self.copied = 0
+        self.reflinked = 0
+
+    def snapshot_path(self, path: str, directory: str) -> str:
+        return os.path.join(directory, os.path.basename(self.root), os.path.relpath(path, self.root))
+
+    def in_root(self, path: Optional[str]) -> bool:
+        return path is not None and os.path.commonpath([self.root, os.path.abspath(path)]) == self.root
+
+    def copy(self, src: str, dst: str):
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, copy_function=self.copy, dirs_exist_ok=True)
+        else:
+            Path(dst).parent.mkdir(exist_ok=True, parents=True)
+            self.reflinked += clone_file(src, dst)
+            self.copied += 1
+        return dst
+
+    def materialize(self, benchmark: BenchmarkRecord, directory: str) -> BenchmarkRecord:
+        """
+        Creates the snapshot of benchmark in directory.
+
+        Returns
+        -------
+        A copy of the benchmark record whose paths point into the snapshot.
+        """
+        directory = os.path.abspath(directory)
+        result = copy.deepcopy(benchmark)
+        for path in [*benchmark.sources, benchmark.name, benchmark.build_script, *benchmark.depends_on]:
+            if self.in_root(path) and os.path.exists(path):
+                self.copy(path, self.snapshot_path(path, directory))
+
+        def move(path: Optional[str]) -> Optional[str]:
+            return self.snapshot_path(path, directory) if self.in_root(path) else path
+
+        result.name = move(benchmark.name)
+        result.depends_on = [move(p) for p in benchmark.depends_on]
+        result.sources = [move(p) for p in benchmark.sources]
+        result.build_script = move(benchmark.build_script)
+        logger.info(f'Snapshot of {benchmark.name} in {directory}: {self.as_dict()}')
+        return result
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"copied": self.copied, "reflinked": self.reflinked}
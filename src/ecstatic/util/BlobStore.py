@@ -0,0 +1,98 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import os
+import uuid
+from pathlib import Path
+
+from src.ecstatic.util.Compression import SUFFIXES, detect_codec
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY = 0o444
+
+
+class BlobStore:
+    """
+    Content-addressed storage for tool outputs. Different configurations often produce byte-identical results;
+    put() stores the content once under its digest, and turns every result file with that content into a hardlink
+    to the stored blob. Campaign folders therefore keep their usual layout (readers and scripts see ordinary files),
+    while the content is only on disk once.
+
+    References are counted by the file system: a blob's link count is one more than the number of results
+    that refer to it, so a blob whose results have all been deleted can be found and removed with collect_garbage.
+    Hardlinks require the blobs to be on the same file system as the results, so the store should live inside
+    the results folder. Since a blob and its results are the same file, blobs are made read-only, and the runner
+    removes a job's old output before the job is rerun.
+    """
+
+    def __init__(self, location: str | Path):
+        self.location = Path(location)
+
+    def blob_path(self, digest: str, suffix: str = '') -> Path:
+        return self.location / digest[:2] / f'{digest}{suffix}'
+
+    def put(self, file: str, digest: str) -> bool:
+        """
+        Adds file to the store.
+
+        Parameters
+        ----------
+        file: The result file.
+        digest: The digest of the file's (decompressed) content.
+
+        Returns
+        -------
+        True if the content was already stored, i.e., if file was deduplicated.
+        """
+        # Blobs are keyed by digest and codec, because the digest is taken over the decompressed content.
+        codec = detect_codec(file)
+        blob = self.blob_path(digest, '' if codec is None else SUFFIXES[codec])
+        blob.parent.mkdir(exist_ok=True, parents=True)
+        try:
+            os.link(file, blob)
+            os.chmod(blob, READ_ONLY)
+            return False
+        except FileExistsError:
+            pass
+        except OSError:
+            logger.warning(f'Could not link {file} into the blob store at {self.location}; it will not be deduplicated.')
+            return False
+        if os.path.samefile(file, blob):
+            return False
+        # Swap the file for a link to the blob without a window in which the file does not exist.
+        tmp = f'{file}.{uuid.uuid4().hex}.tmp'
+        os.link(blob, tmp)
+        os.replace(tmp, file)
+        logger.info(f'{file} has the same content as {blob}; replaced it with a link.')
+        return True
+
+    def references(self, digest: str, suffix: str = '') -> int:
+        """Returns the number of result files that refer to a blob."""
+        try:
+            return os.stat(self.blob_path(digest, suffix)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def collect_garbage(self) -> int:
+        """Removes blobs that no result refers to anymore. Returns the number of blobs removed."""
+        removed = 0
+        for blob in self.location.glob('*/*'):
+            if blob.is_file() and os.stat(blob).st_nlink == 1:
+                blob.unlink()
+                removed += 1
+        return removed
@@ -0,0 +1,120 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import gzip
+import io
+import logging
+import lzma
+import os
+import shutil
+import tempfile
+from typing import IO, Optional
+
+logger = logging.getLogger(__name__)
+
+"""
+Compression of tool outputs. Runners compress a result once the tool has finished writing it, and readers open
+results through open_result, which detects the codec from the file's magic bytes and decompresses as it reads,
+so uncompressed results from older campaigns keep working.
+"""
+
+SUFFIXES = {'gzip': '.gz', 'xz': '.xz', 'zstd': '.zst'}
+CODECS = list(SUFFIXES.keys())
+
+_MAGIC = {'gzip': b'\x1f\x8b', 'xz': b'\xfd7zXZ\x00', 'zstd': b'\x28\xb5\x2f\xfd'}
+
+# Chosen to favor throughput: outputs are written once per job but the gains of higher levels are small on call graphs.
+DEFAULT_LEVELS = {'gzip': 6, 'xz': 3, 'zstd': 3}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as ie:
+        raise RuntimeError('zstd compression requires the zstandard package (pip install zstandard).') from ie
+    return zstandard
+
+
+def detect_codec(file: str) -> Optional[str]:
+    """Returns the codec file is compressed with, or None if it is not compressed."""
+    with open(file, 'rb') as f:
+        head = f.read(max(len(m) for m in _MAGIC.values()))
+    for codec, magic in _MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_compressed(file: str, codec: Optional[str], mode: str = 'rt', level: Optional[int] = None) -> IO:
+    """
+    Opens file for streaming reads or writes with the given codec (None for no compression).
+
+    Parameters
+    ----------
+    file: The file to open.
+    codec: One of CODECS, or None.
+    mode: 'r', 'rt', 'rb', 'w', 'wt', or 'wb'. Text modes use the locale's default encoding, like open.
+    level: The compression level to write with. Defaults to DEFAULT_LEVELS[codec].
+    """
+    binary = 'b' in mode
+    raw_mode = mode.replace('t', '').replace('b', '') + 'b'
+    writing = raw_mode == 'wb'
+    if codec is None:
+        return open(file, mode)
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+    match codec:
+        case 'gzip':
+            f = gzip.open(file, raw_mode, compresslevel=level) if writing else gzip.open(file, raw_mode)
+        case 'xz':
+            f = lzma.open(file, raw_mode, preset=level) if writing else lzma.open(file, raw_mode)
+        case 'zstd':
+            zstandard = _zstandard()
+            if writing:
+                f = zstandard.open(file, raw_mode, cctx=zstandard.ZstdCompressor(level=level))
+            else:
+                f = zstandard.open(file, raw_mode)
+        case _:
+            raise ValueError(f'Unknown compression codec {codec}. Supported codecs are {CODECS}')
+    return f if binary else io.TextIOWrapper(f)
+
+
+def open_result(file: str, mode: str = 'rt') -> IO:
+    """Opens a (possibly compressed) result for reading, decompressing it as it is read."""
+    return open_compressed(file, detect_codec(file), mode)
+
+
+def compress_file(file: str, codec: str, level: Optional[int] = None) -> str:
+    """
+    Compresses file with codec, replacing it with file + SUFFIXES[codec].
+
+    Returns
+    -------
+    The name of the compressed file.
+    """
+    destination = file + SUFFIXES[codec]
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file)), prefix='.', suffix='.tmp')
+    os.close(fd)
+    try:
+        with open(file, 'rb') as infile, open_compressed(tmp, codec, 'wb', level) as outfile:
+            shutil.copyfileobj(infile, outfile, 1 << 20)
+        os.replace(tmp, destination)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.remove(file)
+    logger.debug(f'Compressed {file} to {destination}')
+    return destination
@@ -0,0 +1,96 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+from src.ecstatic.models.Level import Level
+from src.ecstatic.models.Option import Option
+
+# How many options a derived map may override before its entries are flattened into a new base.
+MAX_OVERRIDES = 8
+
+
+class ConfigMap(Mapping):
+    """
+    An immutable Option -> Level configuration.
+
+    Deriving a configuration with one option changed (set) is O(1): the new map shares its parent's entries, and
+    only stores the options it overrides. This is what mutants are, so a campaign of mutants costs little more than
+    its seed, however many options the tool has. The hash is computed once, on first use. Keys are the Options of
+    the tool's model; they are never copied.
+    """
+    __slots__ = ('_base', '_overrides', '_hash')
+
+    def __init__(self, entries: Mapping = ()):
+        self._base: Dict[Option, Level] = dict(entries)
+        self._overrides: Dict[Option, Level] = {}
+        self._hash: Optional[int] = None
+
+    def set(self, option: Option, level: Level) -> 'ConfigMap':
+        """Returns a copy of this configuration with option set to level."""
+        derived = ConfigMap.__new__(ConfigMap)
+        derived._overrides = {**self._overrides, option: level}
+        derived._base = self._base
+        derived._hash = None
+        if len(derived._overrides) > MAX_OVERRIDES:
+            derived._base = {**self._base, **derived._overrides}
+            derived._overrides = {}
+        return derived
+
+    @property
+    def changes(self) -> Mapping:
+        """The entries this map overrides on top of the entries it shares."""
+        return self._overrides
+
+    @property
+    def shared(self) -> Mapping:
+        """The entries this map shares with the map it was derived from (do not modify)."""
+        return self._base
+
+    def __getitem__(self, option: Option) -> Level:
+        if option in self._overrides:
+            return self._overrides[option]
+        return self._base[option]
+
+    def __contains__(self, option) -> bool:
+        return option in self._overrides or option in self._base
+
+    def __iter__(self) -> Iterator[Option]:
+        yield from self._base
+        yield from (o for o in self._overrides if o not in self._base)
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for o in self._overrides if o not in self._base)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, ConfigMap) and hash(self) != hash(other):
+            return False
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        # Pickled (e.g., for worker processes) as a flat map.
+        return ConfigMap, (dict(self.items()),)
+
+    def __repr__(self):
+        return f'ConfigMap({ {str(k): str(v) for k, v in self.items()} })'
@@ -20,20 +20,24 @@ import importlib.resources
 import json
 import logging
 import os
+from typing import TYPE_CHECKING
 
-from jsonschema.validators import RefResolver, Draft7Validator
 from src.ecstatic.models.Tool import Tool
 
+if TYPE_CHECKING:
+    from jsonschema.validators import RefResolver, Draft7Validator
+
 
 class ConfigurationSpaceReader:
     def __init__(self,
                  schema_directory: str = importlib.resources.path('src.resources', 'schema'),
                  master_schema: str = importlib.resources.path('src.resources.schema', 'configuration_space.schema.json')):
-        self.validator: Draft7Validator = None
-        self.resolver: RefResolver = None
+        self.validator: 'Draft7Validator' = None
+        self.resolver: 'RefResolver' = None
         self.__setup(schema_directory, master_schema)
 
     def __setup(self, schema_directory: str, master_schema: str):
+        from jsonschema.validators import RefResolver, Draft7Validator
         # Open all schemata
         schemata = {}
         for root, _, files in os.walk(schema_directory):
@@ -0,0 +1,126 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.jsonl'
+# Written once every job of a folder has been looked up, and so any results from before manifests were imported.
+LEGACY_IMPORT_MARKER = '.legacy_import_complete'
+
+SUCCESS = 'success'
+ERROR = 'error'
+
+
+@dataclass
+class ManifestEntry:
+    """
+    The record of one (configuration, target) job in a campaign.
+    """
+    config_hash: str
+    target: str
+    status: str
+    execution_time: float
+    output: Optional[str] = None  # Relative to the campaign folder.
+    output_digest: Optional[str] = None
+    exit_reason: Optional[str] = None
+    configuration: Dict[str, str] = field(default_factory=dict)
+    config_str: Optional[str] = None
+    option_under_investigation: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.config_hash, self.target
+
+
+class JobManifest:
+    """
+    An append-only JSONL manifest of every job that was run in a campaign folder.
+
+    The manifest is read with a single sequential scan when it is opened, and afterwards answers all
+    "has this job already been run?" questions from memory. Later entries for the same job supersede earlier ones.
+    Use get_manifest to obtain the shared instance for a folder, so that all threads append to the same object.
+    """
+
+    def __init__(self, folder: str | Path):
+        self.folder = Path(folder)
+        self.file = self.folder / MANIFEST_NAME
+        self._entries: Dict[Tuple[str, str], ManifestEntry] = {}
+        self._lock = threading.Lock()
+        # Until the import is marked complete, the folder may hold results from before manifests existed. The
+        # manifest itself is no sign of completion, since a run can crash after importing only some of them.
+        self.legacy_import_pending = not (self.folder / LEGACY_IMPORT_MARKER).exists()
+        if self.file.exists():
+            self._load()
+
+    def _load(self):
+        with open(self.file, 'r') as f:
+            for line_number, line in enumerate(f):
+                try:
+                    entry = ManifestEntry(**json.loads(line))
+                except (json.JSONDecodeError, TypeError):
+                    # Most likely a line that was cut short by a crash. Skip it; the job will be rerun.
+                    logger.warning(f'Skipping malformed line {line_number} in {self.file}.')
+                    continue
+                self._entries[entry.key] = entry
+        logger.info(f'Read {len(self._entries)} jobs from {self.file}.')
+
+    def get(self, config_hash: str, target: str) -> Optional[ManifestEntry]:
+        return self._entries.get((config_hash, os.path.basename(target)))
+
+    def record(self, entry: ManifestEntry):
+        line = json.dumps(asdict(entry)) + '\n'
+        with self._lock:
+            self.folder.mkdir(exist_ok=True, parents=True)
+            with open(self.file, 'a') as f:
+                f.write(line)
+                f.flush()
+            self._entries[entry.key] = entry
+
+    def complete_legacy_import(self):
+        """Records that every job of the folder has been looked up, so there are no legacy results left to import."""
+        if self.legacy_import_pending:
+            self.folder.mkdir(exist_ok=True, parents=True)
+            (self.folder / LEGACY_IMPORT_MARKER).touch()
+            self.legacy_import_pending = False
+
+    def entries(self) -> Iterable[ManifestEntry]:
+        return list(self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_manifests: Dict[str, JobManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(folder: str | Path) -> JobManifest:
+    """Returns the manifest for a campaign folder, reading it from disk the first time it is requested."""
+    key = os.path.abspath(folder)
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = JobManifest(key)
+        return _manifests[key]
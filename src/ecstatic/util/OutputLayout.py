@@ -0,0 +1,77 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import os
+import re
+import shutil
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict
+
+from src.ecstatic.util.JobManifest import get_manifest, MANIFEST_NAME
+
+logger = logging.getLogger(__name__)
+
+"""
+Helpers for the hash-prefix sharded layout of campaign folders. With a shard depth of 2, the result of a job
+whose configuration hashes to abcdef... is stored as <campaign>/ab/cd/abcdef..._<target>.raw instead of directly
+in the campaign folder, which keeps every directory small even when a campaign has hundreds of thousands of files.
+"""
+
+# Per-job files at the top of a flat campaign folder: results (<hash>_<target>.raw, plus legacy .error files)
+# and their hidden sidecars (.<hash>_<target>.raw.time, .log, ...).
+_JOB_FILE = re.compile(r'^\.?(?P<hash>[0-9a-f]{32})_.+')
+
+
+def shard_directory(folder: str, name_hash: str, shard_depth: int) -> str:
+    """
+    Returns the directory that files named by name_hash belong in, i.e., folder itself if shard_depth is 0, and
+    folder/ab/cd for a name_hash starting with abcd and a shard_depth of 2.
+    """
+    if shard_depth < 0 or 2 * shard_depth > len(name_hash):
+        raise ValueError(f'Shard depth must be between 0 and {len(name_hash) // 2}. Supplied depth was {shard_depth}')
+    return os.path.join(folder, *[name_hash[2 * i:2 * i + 2] for i in range(shard_depth)])
+
+
+def migrate(campaign_folder: str, shard_depth: int) -> int:
+    """
+    Moves the per-job files of a flat campaign folder into the sharded layout, and updates the campaign's manifest
+    (if it has one) to point to the new locations. shell_files and xml_scripts are left where they are, because
+    the AQL scripts refer to them by absolute path; they are found there and regenerated on demand.
+
+    Returns
+    -------
+    The number of files that were moved.
+    """
+    moved: Dict[str, str] = {}
+    for f in os.listdir(campaign_folder):
+        if (m := _JOB_FILE.match(f)) is None or not os.path.isfile(source := os.path.join(campaign_folder, f)):
+            continue
+        destination_folder = shard_directory(campaign_folder, m.group('hash'), shard_depth)
+        if os.path.abspath(destination_folder) == os.path.abspath(campaign_folder):
+            continue
+        Path(destination_folder).mkdir(exist_ok=True, parents=True)
+        shutil.move(source, destination := os.path.join(destination_folder, f))
+        moved[f] = os.path.relpath(destination, campaign_folder)
+
+    if os.path.exists(os.path.join(campaign_folder, MANIFEST_NAME)):
+        manifest = get_manifest(campaign_folder)
+        for entry in manifest.entries():
+            if entry.output is not None and entry.output in moved:
+                manifest.record(replace(entry, output=moved[entry.output]))
+    logger.info(f'Moved {len(moved)} files in {campaign_folder} to a layout with shard depth {shard_depth}.')
+    return len(moved)
@@ -15,7 +15,8 @@
 #      You should have received a copy of the GNU General Public License
 #      along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
-from typing import List, Dict, Iterable, Set, TypeVar, Tuple, Callable, Sized, Container, Optional, Collection
+from typing import List, Dict, Iterable, Set, TypeVar, Tuple, Callable, Sized, Container, Optional, Collection, \
+    FrozenSet
 
 from src.ecstatic.models.Level import Level
 from src.ecstatic.util.PartialOrder import PartialOrder, PartialOrderType
@@ -54,6 +55,11 @@ class PotentialViolation:
                 'unexpected_diffs': [str(s) for s in self.unexpected_diffs]
                 }
 
+    @property
+    def identical_outputs(self) -> bool:
+        """True if both jobs produced byte-identical (after decompression) outputs."""
+        return self.job1.output_digest is not None and self.job1.output_digest == self.job2.output_digest
+
     def get_option_under_investigation(self):
         if self.job1.job.option_under_investigation is None:
             logger.debug("Option under investigation is: "+ str(self.job2.job.option_under_investigation))
@@ -144,7 +150,14 @@ class PotentialViolation:
                  job1: FinishedFuzzingJob,
                  job2: FinishedFuzzingJob,
                  job1_reader: Callable[[], Set[T]],
-                 job2_reader: Callable[[], Set[T]]):
+                 job2_reader: Callable[[], Set[T]],
+                 diffs: Optional[Tuple[FrozenSet[T], FrozenSet[T]]] = None):
+        """
+        Parameters
+        ----------
+        diffs: Optionally, the already-computed (job1 minus job2, job2 minus job1) differences, e.g. from a
+        comparison cache. If supplied, the readers are not invoked.
+        """
         self._violated: bool | None = None
         match partial_orders:
             case (_, _): self.partial_orders: Iterable[PartialOrder] = partial_orders
@@ -157,6 +170,9 @@ class PotentialViolation:
         self._job1_minus_job2: Sized[T] = None
         self._job2_minus_job1: Sized[T] = None
         self._expected_diffs: Sized[T] = None
+        self.from_cache = diffs is not None
+        if diffs is not None:
+            self._job1_minus_job2, self._job2_minus_job1 = diffs
         self.is_violation = len(self.unexpected_diffs) > 0
 
 
@@ -0,0 +1,95 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing (Kirsch and Mitzenmacher) from one SHA-256 digest.
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class SeenSet:
+    """
+    A persistent record of every (configuration, target) job that has been run for a tool and benchmark, across
+    campaigns and restarts.
+
+    Membership is answered by an in-memory Bloom filter, so the common case of a job that has never been run costs
+    no I/O. Only when the filter reports a (possibly false) hit is the exact on-disk index consulted, which also
+    stores the campaign the job was first run in and how long it took, so that skipping it can be accounted for.
+    """
+
+    def __init__(self, location: str | Path, capacity: int = 1_000_000):
+        self.location = Path(location)
+        self.location.parent.mkdir(exist_ok=True, parents=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.location, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS seen (config_hash TEXT, target TEXT, campaign INTEGER, '
+                         'execution_time REAL, PRIMARY KEY (config_hash, target))')
+        self._db.commit()
+        self._filter = BloomFilter(capacity)
+        for config_hash, target in self._db.execute('SELECT config_hash, target FROM seen'):
+            self._filter.add(self._key(config_hash, target))
+
+    @staticmethod
+    def _key(config_hash: str, target: str) -> str:
+        return f'{config_hash}\t{target}'
+
+    def add(self, config_hash: str, target: str, campaign: int, execution_time: float):
+        """Records that a job ran in a campaign. A job keeps the campaign it was first run in."""
+        with self._lock:
+            self._db.execute('INSERT OR IGNORE INTO seen VALUES (?, ?, ?, ?)',
+                             (config_hash, target, campaign, execution_time))
+            self._db.commit()
+            self._filter.add(self._key(config_hash, target))
+
+    def get(self, config_hash: str, target: str) -> Optional[Tuple[int, float]]:
+        """Returns the campaign a job was first run in and its execution time, or None if it has not been run."""
+        if self._key(config_hash, target) not in self._filter:
+            return None
+        with self._lock:
+            return self._db.execute('SELECT campaign, execution_time FROM seen WHERE config_hash = ? AND target = ?',
+                                    (config_hash, target)).fetchone()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
@@ -0,0 +1,70 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SlotScheduler:
+    """
+    Hands out a fixed number of slots to work that runs concurrently from different places (e.g., the probes of
+    several delta debugging sessions), so that together they do not oversubscribe the host. What a slot is worth
+    is up to the caller; ECSTATIC uses one slot per delta debugging probe, which runs two tool instances.
+
+    Work that is no longer needed can give up waiting: acquire returns False once its cancelled event is set.
+    """
+
+    def __init__(self, slots: int):
+        if slots < 1:
+            raise ValueError(f'A slot scheduler needs at least one slot, not {slots}.')
+        self.slots = slots
+        self.busy = 0
+        self.peak = 0
+        self.granted = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, cancelled: Optional[threading.Event] = None) -> bool:
+        with self.condition:
+            while self.busy >= self.slots:
+                if cancelled is not None and cancelled.is_set():
+                    return False
+                # Cancellation is not signalled through the condition, so waiters that can be cancelled poll.
+                self.condition.wait(timeout=None if cancelled is None else 0.1)
+            if cancelled is not None and cancelled.is_set():
+                return False
+            self.busy += 1
+            self.granted += 1
+            self.peak = max(self.peak, self.busy)
+            return True
+
+    def release(self):
+        with self.condition:
+            self.busy -= 1
+            self.condition.notify()
+
+    @contextmanager
+    def slot(self, cancelled: Optional[threading.Event] = None) -> Iterator[bool]:
+        """Holds a slot for the duration of the block. Yields False (without a slot) if cancelled while waiting."""
+        acquired = self.acquire(cancelled)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release()
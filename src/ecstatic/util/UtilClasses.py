@@ -19,11 +19,10 @@
 from dataclasses import dataclass, field
 from typing import Dict, Set, List, Any
 
-from frozendict import frozendict
-
 from src.ecstatic.models.Flow import Flow
 from src.ecstatic.models.Level import Level
 from src.ecstatic.models.Option import Option
+from src.ecstatic.util.ConfigMap import ConfigMap
 
 
 @dataclass
@@ -48,10 +47,15 @@ class FuzzingJob:
     def __init__(self,
                  configuration: Dict[Option, Level],
                  option_under_investigation: Option | None,
-                 target: BenchmarkRecord):
+                 target: BenchmarkRecord,
+                 sub_campaign: int = 0):
         self.configuration = configuration
         self.option_under_investigation = option_under_investigation
         self.target = target
+        # Campaigns can merge several seeds; jobs are only compared to jobs of the same seed (sub-campaign).
+        self.sub_campaign = sub_campaign
+        # Cache for the runner's dict_hash of the configuration.
+        self.config_hash: str | None = None
 
     def __eq__(self, other):
         return isinstance(other, FuzzingJob) and self.configuration == other.configuration and \
@@ -71,12 +75,12 @@ class FuzzingCampaign:
 
 @dataclass
 class ConfigWithMutatedOption:
-    config: frozendict[Option, Level]
+    config: ConfigMap
     option: Option | None
     level: Level | None
 
     def __hash__(self):
-        return hash((frozendict(self.config), self.option, self.level))
+        return hash((self.config, self.option, self.level))
 
 
 @dataclass
@@ -84,6 +88,7 @@ class FinishedFuzzingJob:
     job: FuzzingJob
     execution_time: float
     results_location: str
+    output_digest: str | None = field(kw_only=True, default=None)
 
 
 @dataclass
@@ -19,18 +19,14 @@ import json
 import logging
 import os.path
 import pathlib
-import dill as pickle
 import time
 from abc import ABC, abstractmethod
 
-from pathos.multiprocessing import ProcessPool
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import List, Tuple, Set, Iterable, TypeVar, Optional
+from typing import List, Tuple, Set, Iterable, TypeVar, Optional, Callable, Dict
 
 import deprecation as deprecation
-from pathos.parallel import ParallelPool
-from tqdm import tqdm
 
 from src.ecstatic.models.Option import Option
 from src.ecstatic.readers.AbstractReader import AbstractReader
@@ -39,9 +35,12 @@ from src.ecstatic.util.PartialOrder import PartialOrder, PartialOrderType
 from src.ecstatic.util.PotentialViolation import PotentialViolation
 from src.ecstatic.util.UtilClasses import FinishedFuzzingJob
 from src.ecstatic.util.Violation import Violation
+from src.ecstatic.violation_checkers.ComparisonCache import ComparisonCache
 
 logger = logging.getLogger(__name__)
 T = TypeVar('T')  # Indicates the type of content in the results (e.g., call graph edges or flows)
+# Written to the output folder once every result of a campaign has been checked (see mark_checked).
+CHECK_COMPLETE_MARKER = '.check_complete'
 
 
 def get_file_name(potential_violation: PotentialViolation) -> pathlib.Path:
@@ -58,6 +57,11 @@ def get_file_name(potential_violation: PotentialViolation) -> pathlib.Path:
     return filename
 
 
+def get_pickle_name(potential_violation: PotentialViolation) -> str:
+    """The name of the violation's pickle, which (like get_file_name) is the same every time it is found."""
+    return str(get_file_name(potential_violation).with_suffix('.pickle')).replace(os.sep, '_')
+
+
 def summarize(violations: Iterable[PotentialViolation]):
     """
     Print a summary of the run.
@@ -80,18 +84,43 @@ def summarize(violations: Iterable[PotentialViolation]):
 class AbstractViolationChecker(ABC):
 
     def __init__(self, jobs: int, reader: AbstractReader, output_folder: Path, ground_truths: Optional[Path] = None,
-                 write_to_files=True):
+                 write_to_files=True, comparison_cache: Optional[ComparisonCache] = None):
         self.output_folder = output_folder
         self.jobs: int = jobs
         self.reader = reader
         self.ground_truths: Path = ground_truths
         self.write_to_files = write_to_files
+        self.comparison_cache = comparison_cache
+        self._ground_truth_sets: Dict[PartialOrderType, Set[T]] = {}
         logger.debug(f'Ground truths are {self.ground_truths}')
 
-    def check_violations(self, results: List[FinishedFuzzingJob]) -> List[PotentialViolation]:
+    def is_checked(self) -> bool:
+        """True if every result of the campaign in output_folder has been checked, so its pickles are complete."""
+        return (Path(self.output_folder) / CHECK_COMPLETE_MARKER).exists()
+
+    def mark_checked(self):
+        """Records that every result of the campaign in output_folder has been checked (see is_checked)."""
+        Path(self.output_folder).mkdir(exist_ok=True, parents=True)
+        (Path(self.output_folder) / CHECK_COMPLETE_MARKER).touch()
+
+    def check_violations(self, results: List[FinishedFuzzingJob], load_existing: bool = True) -> List[PotentialViolation]:
+        """
+        Compares the results of a campaign, or of part of one (jobs are only compared to jobs on the same target
+        and in the same sub-campaign, so results can be checked target by target). Unless load_existing is False,
+        the violations of a previous run that checked every result (see mark_checked) are reloaded instead.
+        """
+        # Only checking a campaign needs these; the delta debugger's probes, which only compare pairs, do not.
+        import dill as pickle
+        from pathos.multiprocessing import ProcessPool
+        from tqdm import tqdm
+
         start_time = time.time()
 
-        if (pickle_folder := (Path(self.output_folder) / "pickles")).exists():
+        pickle_folder = Path(self.output_folder) / "pickles"
+        # With a comparison cache, already-compared pairs are cheap to recover, so we don't need the
+        # all-or-nothing shortcut of reloading a previous run's pickles. A run that was interrupted while checking
+        # leaves only some of them behind, so they are only reloaded once the whole campaign has been checked.
+        if load_existing and self.comparison_cache is None and self.is_checked():
             finished_results = []
             print("Loading existing violations.")
             for f in tqdm([fil for fil in os.listdir(pickle_folder) if fil.endswith('.pickle')]):
@@ -107,12 +136,14 @@ class AbstractViolationChecker(ABC):
                 if option_under_investigation is None:
                     candidates = [f for f in results if
                                   f.job.target == finished_run.job.target and
+                                  f.job.sub_campaign == finished_run.job.sub_campaign and
                                   f.results_location != finished_run.results_location]
                 else:
                     candidates = [f for f in results if
                                   (f.job.option_under_investigation is None or
                                    f.job.option_under_investigation == option_under_investigation) and
                                   f.job.target == finished_run.job.target and
+                                  f.job.sub_campaign == finished_run.job.sub_campaign and
                                   f.results_location != finished_run.results_location]
                 logger.info(f'Found {len(candidates)} candidates for job {finished_run.results_location}')
                 for candidate in candidates:
@@ -129,11 +160,24 @@ class AbstractViolationChecker(ABC):
 
             finished_results: List[PotentialViolation] = []
             with ProcessPool(self.jobs) as p:
+                # Digests identify jobs with identical outputs, and key the comparison cache. Jobs run by this
+                # version of the runner already have one; the others (e.g., imported results) are hashed in the pool.
+                undigested = [r for r in results if r is not None and r.output_digest is None]
+                locations = list(dict.fromkeys(r.results_location for r in undigested))
+                digests = dict(zip(locations, p.map(AbstractCommandLineToolRunner.file_digest, locations)))
+                for r in undigested:
+                    r.output_digest = digests[r.results_location]
+
                 print(f'Checking violations with {self.jobs} cores.')
                 for result in tqdm(p.imap(self.compare_results, pairs), total=len(pairs)):
                     # Force evaluation of violated
                     # [r for r in result if r.violated]
                     finished_results.extend(result)
+            print(f'{len([r for r in finished_results if r.identical_outputs])} of {len(finished_results)} '
+                  f'comparisons were between identical outputs and were skipped.')
+            if self.comparison_cache is not None:
+                print(f'{len([r for r in finished_results if r.from_cache])} of {len(finished_results)} '
+                      f'comparisons were served from the comparison cache.')
 
             if self.write_to_files:
                 def write_violation(violation: PotentialViolation):
@@ -144,8 +188,11 @@ class AbstractViolationChecker(ABC):
                     with open(filename, 'w') as f:
                         json.dump(violation.as_dict(), f, indent=4)
                     pickle_folder.mkdir(exist_ok=True)
-                    with NamedTemporaryFile(dir=pickle_folder, delete=False, suffix='.pickle') as f:
+                    # Named after the violation, so that checking a campaign again replaces its pickles rather
+                    # than adding to them.
+                    with NamedTemporaryFile(dir=pickle_folder, delete=False, suffix='.tmp') as f:
                         pickle.dump(violation, f)
+                    os.replace(f.name, pickle_folder / get_pickle_name(violation))
 
                 print("Writing to files.")
                 for _ in tqdm(p.imap(write_violation, finished_results), total=len(finished_results)):
@@ -167,6 +214,39 @@ class AbstractViolationChecker(ABC):
     def is_false_positive(self, raw_result: T) -> bool:
         pass
 
+    def check_pair(self, job1: FinishedFuzzingJob, job2: FinishedFuzzingJob,
+                   partial_orders: Tuple[PartialOrder, ...]) -> bool:
+        """
+        Checks whether two results violate partial_orders, i.e., whether the PotentialViolation of the pair would
+        be a violation. Unlike check_violations, it uses no process pool and writes nothing, and it stops at the
+        first unexpected difference. Meant for checking one known pair, e.g., in delta debugging.
+        """
+        if job1.output_digest is not None and job1.output_digest == job2.output_digest:
+            return False
+        # The main partial order is the one that goes from job1 to job2 (see PotentialViolation).
+        main = next((p for p in partial_orders if p.left in job1.job.configuration.values() and
+                     p.right in job2.job.configuration.values()), None)
+        if main is None:
+            raise RuntimeError(f"Unable to find partial order for jobs with partial orders {partial_orders}")
+        # Soundness is violated by results that only job2 has, precision by results that only job1 has.
+        if main.type is PartialOrderType.MORE_SOUND_THAN:
+            expected, checked = job1, job2
+        else:
+            expected, checked = job2, job1
+        relevant = None if self.ground_truths is None else self.ground_truth_set(main.type)
+        superset = set(self.postprocess(self.read_from_input(expected.results_location), expected))
+        return any(r not in superset and (relevant is None or r in relevant)
+                   for r in self.postprocess(self.read_from_input(checked.results_location), checked))
+
+    def ground_truth_set(self, partial_order_type: PartialOrderType) -> Set[T]:
+        """The true positives (for soundness) or false positives (for precision) of the ground truths."""
+        if partial_order_type not in self._ground_truth_sets:
+            is_relevant = self.is_true_positive if partial_order_type is PartialOrderType.MORE_SOUND_THAN \
+                else self.is_false_positive
+            self._ground_truth_sets[partial_order_type] = \
+                {t for t in self.read_from_input(self.ground_truths) if is_relevant(t)}
+        return self._ground_truth_sets[partial_order_type]
+
     def get_true_positives(self, raw_results: Iterable[T]) -> Set[T]:
         tps = [t for t in self.read_from_input(self.ground_truths) if self.is_true_positive(t)]
         logger.info(f'{len(tps)} true positives in groundtruths.')
@@ -193,6 +273,33 @@ class AbstractViolationChecker(ABC):
     def read_from_input(self, file: Path) -> Iterable[T]:
         return self.reader.import_file(file)
 
+    def make_potential_violation(self, partial_orders: PartialOrder | Tuple[PartialOrder, PartialOrder],
+                                 job1: FinishedFuzzingJob, job2: FinishedFuzzingJob,
+                                 job1_reader: Callable[[], Set[T]],
+                                 job2_reader: Callable[[], Set[T]]) -> PotentialViolation:
+        """
+        Creates a PotentialViolation, reusing the differences from the comparison cache if this pair of outputs
+        has already been compared under the same partial order(s). Pairs of jobs with identical outputs are in the
+        same equivalence class, and cannot differ under any partial order, so their results are not read at all.
+        """
+        if job1.output_digest is not None and job1.output_digest == job2.output_digest:
+            pv = PotentialViolation(partial_orders, job1, job2, job1_reader, job2_reader,
+                                    diffs=(frozenset(), frozenset()))
+            pv.from_cache = False
+            return pv
+        if self.comparison_cache is None or job1.output_digest is None or job2.output_digest is None:
+            return PotentialViolation(partial_orders, job1, job2, job1_reader, job2_reader)
+        key = ComparisonCache.make_key(job1.output_digest, job2.output_digest,
+                                       partial_orders if isinstance(partial_orders, tuple) else (partial_orders,),
+                                       job1.job.target.name,
+                                       None if self.ground_truths is None else str(self.ground_truths))
+        if (diffs := self.comparison_cache.get(key)) is not None:
+            logger.info(f'Comparison of {job1.results_location} and {job2.results_location} found in cache.')
+            return PotentialViolation(partial_orders, job1, job2, job1_reader, job2_reader, diffs=diffs)
+        pv = PotentialViolation(partial_orders, job1, job2, job1_reader, job2_reader)
+        self.comparison_cache.put(key, (pv.job1_minus_job2, pv.job2_minus_job1))
+        return pv
+
     def compare_results(self, t: Tuple[FinishedFuzzingJob, FinishedFuzzingJob, Option]) -> Iterable[PotentialViolation]:
         """
 
@@ -233,7 +340,7 @@ class AbstractViolationChecker(ABC):
                                       job1.job.configuration[option_under_investigation],
                                       option_under_investigation))
                     if pos[0].is_explicit():
-                        results.append(PotentialViolation(pos, job1, job2, job1_reader, job2_reader))
+                        results.append(self.make_potential_violation(pos, job1, job2, job1_reader, job2_reader))
                 if option_under_investigation.is_more_precise(job1.job.configuration[option_under_investigation],
                                                               job2.job.configuration[option_under_investigation]):
                     if option_under_investigation.is_more_sound(job2.job.configuration[option_under_investigation],
@@ -247,7 +354,7 @@ class AbstractViolationChecker(ABC):
                                             job1.job.configuration[option_under_investigation],
                                             option_under_investigation))
                         if pos[0].is_explicit():
-                            results.append(PotentialViolation(pos, job1, job2, job1_reader, job2_reader))
+                            results.append(self.make_potential_violation(pos, job1, job2, job1_reader, job2_reader))
         else:
             if option_under_investigation.is_more_sound(job1.job.configuration[option_under_investigation],
                                                         job2.job.configuration[option_under_investigation]):
@@ -257,11 +364,12 @@ class AbstractViolationChecker(ABC):
                 def job1_reader():
                     return self.get_true_positives(self.postprocess(self.read_from_input(job1.results_location), job1))
 
-                results.append(PotentialViolation(PartialOrder(job1.job.configuration[option_under_investigation],
-                                                               PartialOrderType.MORE_SOUND_THAN,
-                                                               job2.job.configuration[option_under_investigation],
-                                                               option_under_investigation),
-                                                  job1, job2, job1_reader, job2_reader))
+                results.append(self.make_potential_violation(
+                    PartialOrder(job1.job.configuration[option_under_investigation],
+                                 PartialOrderType.MORE_SOUND_THAN,
+                                 job2.job.configuration[option_under_investigation],
+                                 option_under_investigation),
+                    job1, job2, job1_reader, job2_reader))
 
             if option_under_investigation.is_more_precise(job1.job.configuration[option_under_investigation],
                                                           job2.job.configuration[option_under_investigation]):
@@ -271,11 +379,12 @@ class AbstractViolationChecker(ABC):
                 def job1_reader():
                     return self.get_false_positives(self.postprocess(self.read_from_input(job1.results_location), job1))
 
-                results.append(PotentialViolation(PartialOrder(job1.job.configuration[option_under_investigation],
-                                                               PartialOrderType.MORE_PRECISE_THAN,
-                                                               job2.job.configuration[option_under_investigation],
-                                                               option_under_investigation),
-                                                  job1, job2, job1_reader, job2_reader))
+                results.append(self.make_potential_violation(
+                    PartialOrder(job1.job.configuration[option_under_investigation],
+                                 PartialOrderType.MORE_PRECISE_THAN,
+                                 job2.job.configuration[option_under_investigation],
+                                 option_under_investigation),
+                    job1, job2, job1_reader, job2_reader))
         return results
 
     @deprecation.deprecated(details="We have passed the functionality of checking for violations to "
@@ -376,6 +485,7 @@ class AbstractViolationChecker(ABC):
                                                                  option_under_investigation)},
                                              job1, job2, differences))
 
+        import dill as pickle
         Path(self.output_folder).mkdir(exist_ok=True, parents=True)
         for violation in filter(lambda v: v.violated, results):
             output_file = get_file_name(violation)
@@ -0,0 +1,84 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import FrozenSet, Iterable, Optional, Tuple, TypeVar
+
+from src.ecstatic.util.PartialOrder import PartialOrder
+
+logger = logging.getLogger(__name__)
+T = TypeVar('T')
+
+Diffs = Tuple[FrozenSet[T], FrozenSet[T]]
+
+
+class ComparisonCache:
+    """
+    A persistent cache of pairwise result comparisons, shared between campaigns.
+
+    Entries are keyed by the digests of the two compared outputs, the partial order(s) under which they were
+    compared, and the target, and store the two set differences (job1 minus job2, job2 minus job1). Each entry is
+    written to its own file as soon as it is computed, so a checker that crashes part-way through a campaign only
+    has to recompute the pairs it had not finished.
+    """
+
+    def __init__(self, location: Path):
+        self.location = Path(location)
+        self.location.mkdir(exist_ok=True, parents=True)
+
+    @staticmethod
+    def make_key(digest1: str, digest2: str, partial_orders: Iterable[PartialOrder], target: str,
+                 ground_truths: Optional[str] = None) -> str:
+        """
+        Computes the cache key for comparing two outputs. The key is ordered, i.e., (a, b) and (b, a) are
+        different keys, because which job is on which side of the partial order matters.
+        """
+        khash = hashlib.sha256()
+        for token in [digest1, digest2, *[str(p) for p in partial_orders],
+                      os.path.basename(target), str(ground_truths)]:
+            khash.update(token.encode())
+            khash.update(b'\0')
+        return khash.hexdigest()
+
+    def _get_file(self, key: str) -> Path:
+        return self.location / key[:2] / f'{key}.pickle'
+
+    def get(self, key: str) -> Optional[Diffs]:
+        import dill as pickle
+        try:
+            with open(self._get_file(key), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A corrupt entry (e.g., from a crash mid-write on a filesystem without atomic rename) is
+            # treated as a miss and will be overwritten.
+            logger.exception(f'Could not read comparison cache entry {key}. Recomputing.')
+            return None
+
+    def put(self, key: str, diffs: Diffs):
+        import dill as pickle
+        file = self._get_file(key)
+        file.parent.mkdir(exist_ok=True, parents=True)
+        # Write to a temporary file and rename, so concurrent writers and crashes never leave partial entries.
+        with tempfile.NamedTemporaryFile(dir=file.parent, delete=False, suffix='.tmp') as f:
+            pickle.dump(diffs, f)
+        os.replace(f.name, file)
+        logger.debug(f'Cached comparison {key}.')
@@ -0,0 +1,69 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Helpers shared by several test modules."""
+import importlib.resources
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util.UtilClasses import FuzzingJob, FinishedFuzzingJob, BenchmarkRecord
+
+
+class CountingRunner(AbstractCommandLineToolRunner):
+    """Writes content as the output of every job (or crashes, if fail is set), and counts its runs."""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.runs = 0
+        self.fail = fail
+        self.content = "result\n"
+
+    def try_run_job(self, job: FuzzingJob, output_folder: str) -> Tuple[str, str]:
+        self.runs += 1
+        if self.fail:
+            raise RuntimeError("tool crashed")
+        output = self.get_output(output_folder, job)
+        with open(output, 'w') as f:
+            f.write(self.content)
+        return output, "log"
+
+
+def make_job() -> FuzzingJob:
+    option = Option("opt")
+    option.add_level("A")
+    return FuzzingJob({option: option.get_level("A")}, option, BenchmarkRecord("/benchmarks/program.jar"))
+
+
+def make_results(directory: Path) -> List[FinishedFuzzingJob]:
+    """Two results on one target whose comparison is a soundness violation of opt: A is more sound than B."""
+    option = Option("opt")
+    option.add_level("A")
+    option.add_level("B")
+    option.set_more_sound_than("A", "B")
+    target = BenchmarkRecord("program.jar")
+    (directory / "a.raw").write_text("x\ty\tz\tw\tv\n")
+    (directory / "b.raw").write_text("x\ty\tz\tw\tv\nq\tr\ts\tt\tu\n")
+    return [FinishedFuzzingJob(FuzzingJob({option: level}, option, target), 0, str(directory / result))
+            for level, result in zip(sorted(option.get_levels(), key=lambda l: l.level_name), ["a.raw", "b.raw"])]
+
+
+def read_model(tool: str) -> Tool:
+    return Tool.from_dict(json.loads(importlib.resources.files("src.resources.configuration_spaces")
+                                     .joinpath(f"{tool}_config.json").read_text()))
@@ -12,6 +12,7 @@ from src.ecstatic.util.PartialOrder import PartialOrderType
 from src.ecstatic.util.PotentialViolation import PotentialViolation
 from src.ecstatic.util.UtilClasses import FuzzingJob, FinishedFuzzingJob, BenchmarkRecord
 from src.ecstatic.violation_checkers.CallgraphViolationChecker import CallgraphViolationChecker
+from tests.helpers import make_results
 
 
 @composite
@@ -98,4 +99,21 @@ def test_different_callgraph_precision_violation(data):
     violations = data.draw(violation_generator(callgraph1=callgraph1, callgraph2=callgraph2,
                                                option=option_generator(partial_order_type=strategies.just(PartialOrderType.MORE_PRECISE_THAN))))
     true_violations = list(filter(lambda v: v.is_violation and v.get_main_partial_order().is_explicit(), violations))
-    assert(len(true_violations) == 1)
\ No newline at end of file
+    assert(len(true_violations) == 1)
+
+
+def test_jobs_of_different_sub_campaigns_are_not_compared(tmp_path):
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path, write_to_files=False)
+    results = make_results(tmp_path)
+    assert len(checker.check_violations(results)) > 0
+    results[1].job.sub_campaign = 1
+    assert len(checker.check_violations(results)) == 0
+
+
+def test_check_pair_agrees_with_check_violations(tmp_path):
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path, write_to_files=False)
+    results = make_results(tmp_path)
+    for v in checker.check_violations(results):
+        assert checker.check_pair(v.job1, v.job2, v.partial_orders) == v.is_violation
+    assert any(v.is_violation for v in checker.check_violations(results))
+    assert not checker.check_pair(results[0], results[0], checker.check_violations(results)[0].partial_orders)
@@ -0,0 +1,55 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import random
+
+from src.ecstatic.fuzzing.Bandit import ThompsonBandit
+
+
+def test_update_moves_posterior_mean():
+    bandit = ThompsonBandit(random.Random(0))
+    assert bandit.mean("a") == 0.5
+    for _ in range(8):
+        bandit.update("a", True)
+    bandit.update("b", False)
+    assert bandit.mean("a") > 0.8
+    assert bandit.mean("b") < 0.5
+
+
+def test_choose_prefers_rewarding_and_cheap_arms():
+    bandit = ThompsonBandit(random.Random(0))
+    for _ in range(20):
+        bandit.update("good", True)
+        bandit.update("bad", False)
+    assert bandit.choose(["bad", "good"], 1) == ["good"]
+    # Equal posteriors: the cheaper arm wins.
+    for _ in range(20):
+        bandit.update("expensive", True)
+        bandit.update("cheap", True)
+    costs = {"cheap": 1.0, "expensive": 1000.0}
+    assert bandit.choose(["expensive", "cheap"], 1, cost=costs.get) == ["cheap"]
+    assert len(bandit.choose(["good", "bad", "cheap"], 5)) == 3
+
+
+def test_posterior_round_trips_through_dict():
+    bandit = ThompsonBandit(key=lambda arm: arm.upper())
+    bandit.update("a", True)
+    bandit.update("b", False)
+    resumed = ThompsonBandit(key=lambda arm: arm.upper())
+    resumed.load_dict(bandit.as_dict())
+    assert resumed.mean("a") == bandit.mean("a")
+    assert resumed.mean("b") == bandit.mean("b")
+    assert "A" in resumed.as_dict()
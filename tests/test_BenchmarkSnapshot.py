@@ -0,0 +1,58 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+from src.ecstatic.util.BenchmarkReader import validate
+from src.ecstatic.util.BenchmarkSnapshot import BenchmarkSnapshot
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+
+
+def make_corpus(root):
+    for f in ["suite/src/Main.java", "suite/target/app.jar", "suite/build.sh", "suite/lib/dep.jar",
+              "suite/lib/unused.jar", "other/big.jar"]:
+        (root / f).parent.mkdir(exist_ok=True, parents=True)
+        (root / f).write_text(f)
+    return BenchmarkRecord(str(root / "suite/target/app.jar"), depends_on=[str(root / "suite/lib/dep.jar")],
+                           sources=[str(root / "suite/src")], build_script=str(root / "suite/build.sh"))
+
+
+def test_snapshot_never_writes_to_the_corpus(tmp_path):
+    root, workspace = tmp_path / "benchmarks", tmp_path / "workspace"
+    record = make_corpus(root)
+    snapshot = BenchmarkSnapshot(str(root))
+    moved = snapshot.materialize(record, str(workspace))
+
+    assert moved.name == str(workspace / "benchmarks/suite/target/app.jar")
+    assert moved.sources == [str(workspace / "benchmarks/suite/src")]
+    # Resolves the same way as a full copy of the benchmarks folder would, but only the record's files are copied.
+    assert validate(BenchmarkRecord("suite/target/app.jar", depends_on=["suite/lib/dep.jar"],
+                                    sources=["suite/src"], build_script="suite/build.sh"),
+                    str(workspace)) == moved
+
+    assert not (workspace / "benchmarks/suite/lib/unused.jar").exists()
+    assert not (workspace / "benchmarks/other").exists()
+
+    # A build may write to any file in the snapshot, including dependencies, without changing the corpus.
+    for f in [*moved.sources, moved.name, moved.build_script, *moved.depends_on]:
+        for file in [os.path.join(f, "Main.java")] if os.path.isdir(f) else [f]:
+            assert not os.path.islink(file)
+            with open(file, 'w') as w:
+                w.write("rebuilt")
+    for f in ["suite/src/Main.java", "suite/target/app.jar", "suite/build.sh", "suite/lib/dep.jar",
+              "suite/lib/unused.jar", "other/big.jar"]:
+        assert (root / f).read_text() == f
+    assert snapshot.copied == 4
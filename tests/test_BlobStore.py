@@ -0,0 +1,70 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+from src.ecstatic.readers.SimpleLineReader import SimpleLineReader
+from src.ecstatic.util import JobManifest as manifest_module
+from src.ecstatic.util.BlobStore import BlobStore
+from src.ecstatic.util.JobManifest import get_manifest
+from src.ecstatic.violation_checkers.CallgraphViolationChecker import CallgraphViolationChecker
+from tests.helpers import CountingRunner, make_job, make_results
+
+
+def test_identical_outputs_are_stored_once(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    runner = CountingRunner()
+    runner.blob_store = store
+    first = runner.run_job(make_job(), str(tmp_path / "campaign0"))
+    second = runner.run_job(make_job(), str(tmp_path / "campaign1"))
+    assert first.output_digest == second.output_digest
+    assert os.path.samefile(first.results_location, second.results_location)
+    assert store.references(first.output_digest) == 2
+
+    os.remove(first.results_location)
+    os.remove(second.results_location)
+    assert store.collect_garbage() == 1
+    assert store.references(first.output_digest) == 0
+
+
+def test_identical_outputs_are_not_compared(tmp_path):
+    results = make_results(tmp_path)
+    for r in results:
+        r.output_digest = "same"
+    os.remove(results[0].results_location)  # Reading either output would fail.
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path, write_to_files=False)
+    violations = checker.check_violations(results)
+    assert len(violations) > 0
+    assert all(v.identical_outputs and not v.is_violation for v in violations)
+
+
+def test_rerun_does_not_write_through_blob(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    runner = CountingRunner()
+    runner.blob_store = store
+    first = runner.run_job(make_job(), str(tmp_path / "campaign0"))
+    second = runner.run_job(make_job(), str(tmp_path / "campaign1"))
+    assert os.stat(first.results_location).st_mode & 0o777 == 0o444
+
+    # The job is rerun, e.g. because its manifest line was lost, and its tool now writes something else.
+    get_manifest(tmp_path / "campaign1").complete_legacy_import()
+    (tmp_path / "campaign1" / "manifest.jsonl").unlink()
+    manifest_module._manifests.clear()
+    runner.content = "changed\n"
+    rerun = runner.run_job(make_job(), str(tmp_path / "campaign1"))
+    assert rerun.results_location == second.results_location and runner.runs == 3
+    with open(first.results_location) as f:
+        assert f.read() == "result\n"
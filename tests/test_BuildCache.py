@@ -0,0 +1,83 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import multiprocessing
+import os
+import subprocess
+
+from src.ecstatic.debugging.AbstractDeltaDebugger import AbstractDeltaDebugger
+from src.ecstatic.debugging.BuildCache import BuildCache
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+
+
+def make_program(root):
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "Main.java").write_text("class Main {}")
+    # Fails on sources that contain "error"; counts its runs.
+    (root / "build.sh").write_text('#!/bin/bash\necho run >> "$(dirname "$0")/runs"\n'
+                                   'grep -q error src/Main.java && exit 3\ncat src/Main.java "$@" > app.jar\n')
+    os.chmod(root / "build.sh", 0o755)
+    return BenchmarkRecord(str(root / "app.jar"), sources=[str(root / "src")], build_script=str(root / "build.sh"))
+
+
+def runs(root):
+    return len((root / "runs").read_text().splitlines())
+
+
+def test_variants_are_built_once(tmp_path):
+    program = make_program(tmp_path / "program")
+    cache = BuildCache(tmp_path / "cache", tmp_path / "session")
+
+    def build():
+        return cache.build(program.name, program.sources, program.build_script, cwd=str(tmp_path / "program"))
+
+    assert build() == 0 and build() == 0
+    assert runs(tmp_path / "program") == 1
+
+    (tmp_path / "program" / "src" / "Main.java").write_text("class Main { error }")
+    assert build() == 3 and build() == 3
+    assert runs(tmp_path / "program") == 2
+
+    # Going back to the first variant restores its output.
+    (tmp_path / "program" / "src" / "Main.java").write_text("class Main {}")
+    os.remove(program.name)
+    assert build() == 0 and open(program.name).read() == "class Main {}"
+    assert runs(tmp_path / "program") == 2
+    assert cache.stats()["hits"] == 3 and cache.stats()["builds"] == 1 and cache.stats()["failed_builds"] == 1
+
+
+def test_build_script_wrapper_passes_arguments(tmp_path):
+    program = make_program(tmp_path / "program")
+    cache = BuildCache(tmp_path / "cache", tmp_path / "session")
+    wrapper = AbstractDeltaDebugger.create_build_script(program, cache, str(tmp_path))
+    (tmp_path / "extra").write_text("!")
+    for _ in range(2):
+        assert subprocess.run([wrapper, str(tmp_path / "extra")], cwd=tmp_path / "program").returncode == 0
+    assert open(program.name).read() == "class Main {}!"
+    assert runs(tmp_path / "program") == 1
+
+
+def count_hits(session):
+    cache = BuildCache(session.parent / "builds", session)
+    for _ in range(50):
+        cache.count(hits=1, build_seconds=0.5)
+
+
+def test_counts_of_separate_processes_add_up(tmp_path):
+    with multiprocessing.Pool(4) as p:
+        p.map(count_hits, [tmp_path / "session"] * 4)
+    assert BuildCache(tmp_path / "builds", tmp_path / "session").stats() == \
+           {"hits": 200, "builds": 0, "failed_builds": 0, "build_seconds": 100.0}
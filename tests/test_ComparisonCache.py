@@ -0,0 +1,78 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from pathlib import Path
+from typing import List
+
+from src.ecstatic.readers.SimpleLineReader import SimpleLineReader
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.UtilClasses import FuzzingJob, FinishedFuzzingJob, BenchmarkRecord
+from src.ecstatic.violation_checkers.CallgraphViolationChecker import CallgraphViolationChecker
+from src.ecstatic.violation_checkers.ComparisonCache import ComparisonCache
+from tests.helpers import make_results
+
+
+def check(directory: Path, cache: ComparisonCache) -> List[PotentialViolation]:
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=directory, write_to_files=False,
+                                        comparison_cache=cache)
+    return checker.check_violations(make_results(directory))
+
+
+def test_second_check_is_served_from_cache(tmp_path):
+    cache = ComparisonCache(tmp_path / "cache")
+    first = check(tmp_path, cache)
+    second = check(tmp_path, cache)
+    assert len(first) > 0 and not any(v.from_cache for v in first)
+    assert all(v.from_cache for v in second)
+    assert [v.is_violation for v in first] == [v.is_violation for v in second]
+    assert any(v.is_violation for v in second)
+
+
+def test_changed_output_misses_cache(tmp_path):
+    cache = ComparisonCache(tmp_path / "cache")
+    check(tmp_path, cache)
+    results = make_results(tmp_path)
+    Path(results[1].results_location).write_text("x\ty\tz\tw\tv\n")
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path, write_to_files=False,
+                                        comparison_cache=cache)
+    violations = checker.check_violations(results)
+    assert not any(v.from_cache for v in violations)
+    assert not any(v.is_violation for v in violations)
+
+
+def test_rechecking_replaces_pickles(tmp_path):
+    cache = ComparisonCache(tmp_path / "cache")
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path / "violations",
+                                        comparison_cache=cache)
+    violations = checker.check_violations(make_results(tmp_path))
+    checker.check_violations(make_results(tmp_path))
+    assert len(list((tmp_path / "violations" / "pickles").iterdir())) == len(violations)
+
+
+def test_interrupted_check_is_redone(tmp_path):
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path / "violations")
+    first = make_results(tmp_path)
+    second = [FinishedFuzzingJob(FuzzingJob(r.job.configuration, r.job.option_under_investigation,
+                                            BenchmarkRecord("other.jar")), 0, r.results_location) for r in first]
+    # Results are checked target by target, and the run is interrupted before the second target was checked.
+    checker.check_violations(first, load_existing=False)
+    assert not checker.is_checked()
+    violations = checker.check_violations(first + second)
+    assert len(violations) == 2 and len(list((tmp_path / "violations" / "pickles").iterdir())) == 2
+
+    checker.mark_checked()
+    next((tmp_path / "violations" / "pickles").iterdir()).unlink()
+    assert len(checker.check_violations(first + second)) == 1  # Reloaded, rather than checked again.
@@ -0,0 +1,55 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+import pytest
+
+from src.ecstatic.readers.SimpleLineReader import SimpleLineReader
+from src.ecstatic.readers.callgraph.SOOTCallGraphReader import SOOTCallGraphReader
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util.Compression import CODECS, compress_file, detect_codec, SUFFIXES
+from src.ecstatic.util.JobManifest import JobManifest
+from tests.helpers import CountingRunner, make_job
+
+CALLGRAPH = "<A: void main()>\tvirtualinvoke $r0.<B: void run()>()\t[]\t<B: void run()>\t[]\n" * 3
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_readers_decompress_transparently(tmp_path, codec):
+    raw = tmp_path / "cg.raw"
+    raw.write_text(CALLGRAPH)
+    expected = SOOTCallGraphReader().import_file(raw)
+    digest = AbstractCommandLineToolRunner.file_digest(str(raw))
+
+    compressed = compress_file(str(raw), codec)
+    assert compressed == str(raw) + SUFFIXES[codec] and not raw.exists()
+    assert detect_codec(compressed) == codec
+    assert SOOTCallGraphReader().import_file(compressed) == expected
+    assert SimpleLineReader().import_file(compressed) == CALLGRAPH.splitlines(keepends=True)
+    assert AbstractCommandLineToolRunner.file_digest(compressed) == digest
+
+
+def test_runner_compresses_output(tmp_path):
+    runner = CountingRunner()
+    runner.compression = 'gzip'
+    finished = runner.run_job(make_job(), str(tmp_path))
+    assert finished.results_location.endswith('.raw.gz')
+    assert not os.path.exists(runner.get_output(str(tmp_path), make_job()))
+    entry = JobManifest(tmp_path).get(runner.get_config_hash(make_job()), "program.jar")
+    assert os.path.join(str(tmp_path), entry.output) == finished.results_location
+    assert runner.run_job(make_job(), str(tmp_path)).results_location == finished.results_location
+    assert runner.runs == 1
@@ -0,0 +1,67 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import pickle
+
+from src.ecstatic.models.Option import Option
+from src.ecstatic.util.ConfigMap import ConfigMap, MAX_OVERRIDES
+
+
+def make_options(n: int):
+    options = []
+    for i in range(n):
+        option = Option(f"o{i}")
+        option.add_level("TRUE")
+        option.add_level("FALSE")
+        options.append(option)
+    return options
+
+
+def test_set_derives_a_new_map_sharing_entries():
+    options = make_options(3)
+    seed = ConfigMap({o: o.get_level("FALSE") for o in options})
+    mutant = seed.set(options[1], options[1].get_level("TRUE"))
+    assert seed[options[1]].level_name == "FALSE"
+    assert mutant[options[1]].level_name == "TRUE"
+    assert mutant.shared is seed.shared
+    assert list(mutant) == options and len(mutant) == 3
+    assert dict(mutant) == {**dict(seed), options[1]: options[1].get_level("TRUE")}
+
+
+def test_equal_maps_hash_equally_however_they_were_derived():
+    options = make_options(2)
+    a = ConfigMap({options[0]: options[0].get_level("TRUE"), options[1]: options[1].get_level("TRUE")})
+    b = ConfigMap({o: o.get_level("FALSE") for o in options})
+    for o in options:
+        b = b.set(o, o.get_level("TRUE"))
+    assert a == b and hash(a) == hash(b)
+    assert a == dict(b)
+    assert a != b.set(options[0], options[0].get_level("FALSE"))
+
+
+def test_many_overrides_are_flattened():
+    options = make_options(MAX_OVERRIDES + 2)
+    config = ConfigMap({o: o.get_level("FALSE") for o in options})
+    for o in options:
+        config = config.set(o, o.get_level("TRUE"))
+    assert len(config.changes) <= MAX_OVERRIDES
+    assert all(config[o].level_name == "TRUE" for o in options)
+
+
+def test_pickled_map_is_equal():
+    options = make_options(2)
+    config = ConfigMap({o: o.get_level("FALSE") for o in options}).set(options[0], options[0].get_level("TRUE"))
+    assert pickle.loads(pickle.dumps(config)) == config
@@ -0,0 +1,56 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import random
+
+import pytest
+
+from src.ecstatic.fuzzing.ConfigurationSampler import ConfigurationSampler, choice_to_level
+from src.ecstatic.models.Level import Level
+from src.ecstatic.models.Option import Option
+from tests.helpers import read_model
+
+
+@pytest.mark.parametrize("tool", ["soot", "wala", "doop", "flowdroid"])
+def test_samples_are_in_configuration_space(tool: str):
+    sampler = ConfigurationSampler(read_model(tool), rng=random.Random(0))
+    for config in sampler.sample_many(200):
+        assert 1 <= len(config) <= sampler.max_options
+        for option, level in config.items():
+            if option.type.startswith('int'):
+                assert option.min_value <= int(level.level_name) <= option.max_value
+            else:
+                assert level in option.get_levels()
+
+
+@pytest.mark.parametrize("tool", ["soot", "flowdroid"])
+def test_levels_are_covered_first(tool: str):
+    sampler = ConfigurationSampler(read_model(tool), rng=random.Random(0))
+    num_choices = sum(len(c) for c in sampler.choices.values())
+    # Every sample covers at least one new choice until all choices are covered.
+    for _ in range(num_choices):
+        sampler.sample()
+        if sampler.coverage() == 1.0:
+            break
+    assert sampler.coverage() == 1.0
+
+
+
+def test_integer_levels_match_mutated_levels():
+    option = Option("k", type="int", min_value=5, max_value=5)
+    # FuzzGenerator.mutate_config and process_config hold integer values as ints.
+    assert choice_to_level(option, 5, random.Random(0)) == Level("k", 5)
+    assert choice_to_level(option, "i", random.Random(0)) == Level("k", 5)
@@ -0,0 +1,98 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from types import SimpleNamespace
+
+from src.ecstatic.fuzzing.ConstraintEngine import ConstraintEngine
+from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator
+from src.ecstatic.models.Constraint import Constraint
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.util.ConfigMap import ConfigMap
+from src.ecstatic.util.PartialOrder import PartialOrder
+from tests.helpers import read_model
+
+
+def make_model() -> Tool:
+    model = Tool("tool")
+    for name in ["a", "b", "c"]:
+        option = Option(name)
+        option.add_level("TRUE")
+        option.add_level("FALSE")
+        option.set_default("FALSE")
+        model.add_option(option)
+    return model
+
+
+def options(model: Tool):
+    return sorted(model.get_options())
+
+
+def test_constraints_are_read_from_dicts():
+    c = Constraint.from_dict({"when": {"a": "TRUE"}, "excludes": {"b": ["TRUE"]}})
+    assert c.kind == "excludes" and c.then == {"b": ["TRUE"]}
+    assert Constraint.from_dict(c.as_dict()) == c
+    assert not c.is_satisfied({"a": "TRUE", "b": "TRUE"})
+    assert c.is_satisfied({"a": "FALSE", "b": "TRUE"})
+
+
+def test_repair_sets_required_levels():
+    model = make_model()
+    a, b, c = options(model)
+    engine = ConstraintEngine(model, [Constraint.from_dict({"when": {"a": "TRUE"}, "requires": {"b": "TRUE"}})])
+    config = {a: a.get_level("TRUE")}
+    assert not engine.is_valid(config)
+    repaired = engine.repair(config)
+    assert repaired[b].level_name == "TRUE" and engine.is_valid(repaired)
+    assert engine.repaired == 1
+    assert a.constraints == b.constraints == list(model.constraints)
+
+
+def test_repair_keeps_fixed_options_or_drops_the_configuration():
+    model = make_model()
+    a, b, c = options(model)
+    engine = ConstraintEngine(model, [Constraint.from_dict({"when": {"a": "TRUE"}, "excludes": {"b": "TRUE"}})])
+    config = {a: a.get_level("TRUE"), b: b.get_level("TRUE")}
+    assert engine.repair(config, fixed=[b])[a].level_name == "FALSE"
+    assert engine.repair(config, fixed=[a])[b].level_name == "FALSE"
+    assert engine.repair(config, fixed=[a, b]) is None
+    assert engine.dropped == 1
+
+
+def test_doop_compatibility_rules_are_loaded():
+    model = read_model("doop")
+    engine = ConstraintEngine.for_tool(model)
+    assert len(engine.constraints) > 0
+    defaults = {o: o.get_default() for o in model.get_options()}
+    assert engine.is_valid(defaults)
+
+
+def test_mutants_differ_from_their_seed_in_one_option():
+    model = make_model()
+    a, b, c = options(model)
+    engine = ConstraintEngine(model, [Constraint.from_dict({"when": {"a": "TRUE"}, "excludes": {"b": "TRUE"}}),
+                                      Constraint.from_dict({"when": {"c": "TRUE"}, "requires": {"b": "FALSE"}})])
+    generator = SimpleNamespace(constraints=engine, model=model)
+    for seed in [{a: a.get_level("FALSE"), b: b.get_level("TRUE"), c: c.get_level("FALSE")},
+                 {a: a.get_level("FALSE"), b: b.get_level("FALSE"), c: c.get_level("FALSE")},
+                 {a: a.get_level("TRUE"), b: b.get_level("FALSE"), c: c.get_level("FALSE")}]:
+        for option in [a, b, c]:
+            partial_order = PartialOrder(option.get_level("TRUE"), "MST", option.get_level("FALSE"), option)
+            for mutant in FuzzGenerator.mutate_config(generator, ConfigMap(seed), partial_order):
+                assert [o for o in seed if mutant.config[o] != seed[o]] == [option]
+                assert engine.is_valid(mutant.config)
+    # Setting a (or c) to TRUE with b TRUE, and b to TRUE with a TRUE, would need b (or a) to be changed as well.
+    assert engine.dropped == 3
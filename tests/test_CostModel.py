@@ -0,0 +1,128 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+from types import SimpleNamespace
+
+from src.ecstatic.fuzzing.ConstraintEngine import ConstraintEngine
+from src.ecstatic.fuzzing.CostModel import CostModel
+from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.util.ConfigMap import ConfigMap
+from src.ecstatic.util.UtilClasses import BenchmarkRecord, FuzzingCampaign, FuzzingJob
+from tests.helpers import CountingRunner, make_job
+
+
+def make_option() -> Option:
+    option = Option("opt")
+    for level in ["A", "B", "C"]:
+        option.add_level(level)
+    option.set_default("A")
+    option.set_more_precise_than("B", "A")
+    option.set_more_precise_than("C", "A")
+    return option
+
+
+def test_select_prefers_cheap_partial_orders_within_budget():
+    option = make_option()
+    cheap, expensive = BenchmarkRecord("cheap.jar"), BenchmarkRecord("expensive.jar")
+    model = CostModel(["opt.A"])
+    model.observe_runtime(["opt.A"], cheap, 1.0)
+    model.observe_runtime(["opt.A"], expensive, 100.0)
+    model.observe_runtime(["opt.C"], cheap, 50.0)
+    pos, benchmarks = model.select(option.partial_orders, [cheap, expensive], budget=10.0)
+    assert benchmarks == {cheap}
+    assert [str(p.left) for p in pos] == ["opt.B"]
+
+
+def test_yield_is_smoothed_towards_option():
+    option = make_option()
+    b_po, c_po = sorted(option.partial_orders, key=str)
+    model = CostModel(["opt.A"])
+    assert model.estimate_yield(b_po) == model.estimate_yield(c_po) == 0.5
+    model.partial_order_yield[str(b_po)] = [2, 2]
+    model.option_yield[str(option)] = [2, 2]
+    assert model.estimate_yield(b_po) > model.estimate_yield(c_po) > 0.5
+
+
+def test_runtimes_are_loaded_from_manifests(tmp_path):
+    runner = CountingRunner()
+    runner.run_job(make_job(), str(tmp_path / "campaign0"))
+    model = CostModel([])
+    assert model.load_manifests(tmp_path) == 1
+    assert model.benchmark_runtime["program.jar"].count == 1
+    assert ("opt.A", "program.jar") in model.level_runtime
+
+
+def test_first_campaign_is_ordered_cheapest_target_first(tmp_path):
+    option = make_option()
+    small, large, unknown = tmp_path / "small.jar", tmp_path / "large.jar", tmp_path / "unknown.jar"
+    small.write_bytes(b"x")
+    large.write_bytes(b"x" * 1000)
+    unknown.write_bytes(b"")
+    model = CostModel(["opt.A"])
+    model.observe_runtime(["opt.A"], "small.jar", 30.0)
+    model.observe_runtime(["opt.A"], "large.jar", 5.0)
+    generator = SimpleNamespace(cost_model=model)
+    generator.target_cost = lambda t: FuzzGenerator.target_cost(generator, t)
+
+    jobs = [FuzzingJob({option: option.get_level(l)}, None if l == "A" else option, BenchmarkRecord(str(t)))
+            for t in [unknown, small, large] for l in ["B", "C", "A"]]
+    campaign = FuzzGenerator.prioritize(generator, FuzzingCampaign(jobs))
+    # Learned runtimes first, then benchmarks without history by size; the seed leads each target.
+    assert [(os.path.basename(j.target.name), j.option_under_investigation is None) for j in campaign.jobs] == \
+        [("large.jar", True), ("large.jar", False), ("large.jar", False),
+         ("small.jar", True), ("small.jar", False), ("small.jar", False),
+         ("unknown.jar", True), ("unknown.jar", False), ("unknown.jar", False)]
+
+
+def test_replayed_campaigns_are_not_learned_from_twice(tmp_path):
+    campaign_folder = tmp_path / "campaign0"
+    CountingRunner().run_job(make_job(), str(campaign_folder))
+    generator = SimpleNamespace(cost_model=CostModel([]), failure_predictor=None, loaded_jobs=set(), seen=None,
+                                job_key=FuzzGenerator.job_key)
+    assert FuzzGenerator.load_manifests(generator, tmp_path) == 1
+
+    # The campaign is replayed after a restart: its job is found in the manifest again.
+    replayed = CountingRunner().run_job(make_job(), str(campaign_folder))
+    FuzzGenerator.record_finished(generator, FuzzingCampaign([make_job()]), [replayed], 0, campaign_folder)
+    assert generator.cost_model.global_runtime.count == 1
+
+
+def test_small_campaigns_are_topped_up_with_mutants_of_their_seed():
+    option = make_option()
+    model = Tool("tool")
+    model.add_option(option)
+    sampled, held_out = sorted(option.partial_orders, key=str)
+    target = BenchmarkRecord("program.jar")
+    seed = ConfigMap({option: option.get_level("A")})
+    generator = SimpleNamespace(model=model, constraints=ConstraintEngine(model), cost_model=CostModel([]), slots=3,
+                                failure_predictor=None, partial_orders={sampled: 1, held_out: 2},
+                                last_sample=({sampled}, {target}), job_key=FuzzGenerator.job_key)
+    generator.mutate_config = lambda c, p: FuzzGenerator.mutate_config(generator, c, p)
+    generator.fills_slots = lambda c: FuzzGenerator.fills_slots(generator, c)
+    campaign = FuzzingCampaign([FuzzingJob(seed, None, target),
+                                FuzzingJob(seed.set(option, option.get_level("B")), option, target)])
+    assert not FuzzGenerator.fills_slots(generator, campaign)
+
+    assert FuzzGenerator.top_up_mutants(generator, campaign) == [held_out]
+    # The new mutant is compared to the seed that is already in the campaign.
+    assert [(str(j.configuration[option]), j.sub_campaign) for j in campaign.jobs] == [("opt.A", 0), ("opt.B", 0),
+                                                                                       ("opt.C", 0)]
+    assert FuzzGenerator.fills_slots(generator, campaign)
+    assert generator.last_sample == ({sampled, held_out}, {target})
+    assert generator.partial_orders[held_out] == 1
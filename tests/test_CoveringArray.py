@@ -0,0 +1,88 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import itertools
+import random
+
+from src.ecstatic.fuzzing.CoveringArray import CoveringArray, InteractionCoverage
+from src.ecstatic.models.Option import Option
+from src.ecstatic.models.Tool import Tool
+from src.ecstatic.util.ConfigMap import ConfigMap
+from tests.helpers import read_model
+
+
+def make_model() -> Tool:
+    model = Tool("tool")
+    for name, levels in [("a", ["1", "2", "3"]), ("b", ["x", "y"]), ("c", ["p", "q"]), ("d", ["u", "v", "w"])]:
+        option = Option(name)
+        for level in levels:
+            option.add_level(level)
+        model.add_option(option)
+    return model
+
+
+def test_array_covers_every_pair_with_fewer_configurations_than_exhaustive():
+    model = make_model()
+    array = CoveringArray(model, 2, rng=random.Random(0))
+    configs = array.build()
+    coverage = InteractionCoverage(model, 2)
+    for config in configs:
+        coverage.observe(config)
+    assert coverage.coverage() == 1.0
+    assert 9 <= len(configs) < 3 * 2 * 2 * 3
+
+
+def test_array_respects_types_of_real_configuration_space():
+    model = read_model("flowdroid")
+    configs = CoveringArray(model, 2, rng=random.Random(0)).build()
+    for config in configs:
+        for option, level in config.items():
+            if option.type.startswith('int'):
+                assert option.min_value <= int(level.level_name) <= option.max_value
+            else:
+                assert level in option.get_levels()
+
+
+def test_invalid_interactions_are_left_uncovered():
+    model = make_model()
+    a, b = sorted(model.get_options())[:2]
+    array = CoveringArray(model, 2, rng=random.Random(0),
+                          is_valid=lambda config: not (config[a].level_name == "1" and config[b].level_name == "x"))
+    configs = array.build()
+    assert all(not (c[a].level_name == "1" and c[b].level_name == "x") for c in configs)
+    assert array.uncoverable == {((0, "1"), (1, "x"))}
+
+
+def test_coverage_counts_interactions_of_set_options_only():
+    model = make_model()
+    coverage = InteractionCoverage(model, 2)
+    a, b, c, d = sorted(model.get_options())
+    assert coverage.total == sum(x * y for x, y in itertools.combinations([3, 2, 2, 3], 2))
+    assert coverage.observe({a: a.get_level("1"), b: b.get_level("x")}) == 1
+    assert coverage.observe({a: a.get_level("1"), b: b.get_level("x"), c: c.get_level("p")}) == 2
+    assert coverage.as_dict()["configurations"] == 2
+
+
+def test_mutants_are_observed_incrementally():
+    model = make_model()
+    seed = ConfigMap({o: sorted(o.get_levels(), key=lambda l: l.level_name)[0] for o in model.get_options()})
+    mutants = [seed.set(o, l) for o in model.get_options() for l in o.get_levels()]
+    incremental, full = InteractionCoverage(model, 2), InteractionCoverage(model, 2)
+    for config in [seed] + mutants:
+        incremental.observe(config)
+        full.observe(dict(config))
+    assert incremental.covered == full.covered
+    assert incremental.as_dict() == full.as_dict()
@@ -0,0 +1,63 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from src.ecstatic.debugging.DeltaDebuggingPlanner import DeltaDebuggingPlanner
+from src.ecstatic.readers.SimpleLineReader import SimpleLineReader
+from src.ecstatic.violation_checkers.CallgraphViolationChecker import CallgraphViolationChecker
+from tests.helpers import make_results
+
+
+def make_violations(directory, source_bytes):
+    results = make_results(directory)
+    (directory / "src").mkdir(exist_ok=True)
+    (directory / "src" / "Main.java").write_text("x" * source_bytes)
+    for r in results:
+        r.job.target.sources = [str(directory / "src")]
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=directory, write_to_files=False)
+    return [v for v in checker.check_violations(results) if v.is_violation]
+
+
+def test_one_violation_per_cluster_cheapest_first(tmp_path):
+    (tmp_path / "small").mkdir()
+    (tmp_path / "large").mkdir()
+    small, large = make_violations(tmp_path / "small", 10), make_violations(tmp_path / "large", 1000)
+    for v in large:
+        v.job1.job.target.name = v.job2.job.target.name = "large.jar"
+    planner = DeltaDebuggingPlanner()
+    # The same bug, found twice on each target.
+    assert planner.plan(large + small + large + small) == [small[0], large[0]]
+
+
+def test_delta_debugged_clusters_are_skipped_across_campaigns(tmp_path):
+    violations = make_violations(tmp_path, 10)
+    planner = DeltaDebuggingPlanner(tmp_path / "index.json")
+    assert planner.plan(violations) == violations[:1]
+    planner.record(violations[0], "campaign0", probes=4, probe_seconds=2.0)
+
+    reloaded = DeltaDebuggingPlanner(tmp_path / "index.json")
+    assert reloaded.plan(make_violations(tmp_path, 10)) == []
+    assert reloaded.probe_latency(violations[0].job1.job.target) == 0.5
+
+
+def test_flaky_clusters_are_skipped_across_campaigns(tmp_path):
+    violations = make_violations(tmp_path, 10)
+    planner = DeltaDebuggingPlanner(tmp_path / "index.json")
+    planner.record_flaky(violations[0], "campaign0/confirmation")
+
+    reloaded = DeltaDebuggingPlanner(tmp_path / "index.json")
+    assert reloaded.plan(make_violations(tmp_path, 10)) == []
+    # Flaky clusters were not delta debugged, so they do not count as sessions.
+    assert reloaded.clusters == {} and reloaded.expected_session_seconds(violations[0]) is None
@@ -0,0 +1,86 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import random
+from types import SimpleNamespace
+
+from src.ecstatic.fuzzing.CostModel import CostModel
+from src.ecstatic.fuzzing.FailurePredictor import FailurePredictor
+from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator
+from src.ecstatic.util.UtilClasses import BenchmarkRecord, FinishedFuzzingJob, FuzzingCampaign
+from tests.helpers import CountingRunner, make_job
+
+
+def test_levels_that_keep_failing_on_a_target_are_predicted_to_fail():
+    predictor = FailurePredictor(["opt.DEFAULT"], rng=random.Random(0))
+    for _ in range(5):
+        predictor.observe(["opt.A", "other.X"], "/b/program.jar", True, 100.0)
+        predictor.observe(["opt.B", "other.X"], "/b/program.jar", False, 10.0)
+        predictor.observe(["opt.A", "other.X"], "/b/other.jar", False, 10.0)
+    probability, duration = predictor.predict(["opt.A", "other.Y"], "program.jar")
+    assert probability >= predictor.threshold and duration == 100.0
+    assert predictor.predict(["opt.A", "other.Y"], "other.jar")[0] < predictor.threshold
+    assert predictor.predict(["opt.B"], "program.jar")[0] < predictor.threshold
+    # Nothing is known about unseen levels on unseen targets.
+    assert predictor.predict(["opt.C"], "new.jar") == (0.0, 0.0)
+
+
+def test_exploration_rate_runs_some_doomed_jobs():
+    assert not FailurePredictor([], exploration_rate=1.0).should_skip(1.0)
+    assert FailurePredictor([], exploration_rate=0.0).should_skip(1.0)
+    predictor = FailurePredictor([], exploration_rate=0.5, rng=random.Random(0))
+    assert 0 < sum(predictor.should_skip(1.0) for _ in range(100)) < 100
+    assert not predictor.should_skip(0.1)
+
+
+def test_failures_are_loaded_from_manifests(tmp_path):
+    CountingRunner(fail=True).run_job(make_job(), str(tmp_path / "campaign0"))
+    predictor = FailurePredictor([], min_trials=1)
+    assert predictor.load_manifests(tmp_path) == 1
+    assert predictor.outcomes[("opt.A",)] == [1, 1]
+    assert predictor.predict(["opt.A"], "program.jar")[0] == 0.5
+
+
+def test_replayed_campaigns_are_not_learned_from_twice(tmp_path):
+    campaign_folder = tmp_path / "campaign0"
+    CountingRunner(fail=True).run_job(make_job(), str(campaign_folder))
+    generator = SimpleNamespace(failure_predictor=FailurePredictor([], min_trials=1), cost_model=CostModel([]),
+                                loaded_jobs=set(), seen=None, job_key=FuzzGenerator.job_key)
+    assert FuzzGenerator.load_manifests(generator, tmp_path) == 0
+    assert generator.failure_predictor.outcomes[("opt.A",)] == [1, 1]
+
+    # The campaign is replayed after a restart: the failed job is looked up in its manifest again.
+    FuzzGenerator.record_finished(generator, FuzzingCampaign([make_job()]), [None], 0, campaign_folder)
+    assert generator.failure_predictor.outcomes[("opt.A",)] == [1, 1]
+
+    # Jobs of the campaign that had not been run before the restart are still learned from.
+    other = make_job()
+    other.target = BenchmarkRecord("other.jar")
+    FuzzGenerator.record_finished(generator, FuzzingCampaign([make_job(), other]),
+                                  [FinishedFuzzingJob(other, 5.0, "other.jar.raw")], 0, campaign_folder)
+    assert generator.failure_predictor.outcomes[("opt.A",)] == [1, 2]
+    assert generator.cost_model.global_runtime.count == 1
+
+
+def test_seed_jobs_are_never_skipped():
+    predictor = FailurePredictor([], exploration_rate=0.0)
+    for _ in range(5):
+        predictor.observe(["opt.A"], "program.jar", True, 100.0)
+    generator = SimpleNamespace(failure_predictor=predictor, cost_model=CostModel([]))
+    seed, mutant = make_job(), make_job()
+    seed.option_under_investigation = None
+    campaign, skipped, saved = FuzzGenerator.skip_doomed_jobs(generator, FuzzingCampaign([seed, mutant]))
+    assert campaign.jobs == [seed] and skipped == 1 and saved == 100.0
@@ -0,0 +1,75 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util import JobManifest as manifest_module
+from src.ecstatic.util.JobManifest import JobManifest, get_manifest, ERROR, SUCCESS
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+from tests.helpers import CountingRunner, make_job
+
+
+def test_finished_job_is_not_rerun(tmp_path):
+    runner = CountingRunner()
+    first = runner.run_job(make_job(), str(tmp_path))
+    second = runner.run_job(make_job(), str(tmp_path))
+    assert runner.runs == 1
+    assert first.results_location == second.results_location
+    assert second.output_digest == AbstractCommandLineToolRunner.file_digest(first.results_location)
+    # A fresh read of the manifest (e.g., after a restart) sees the same job.
+    entry = JobManifest(tmp_path).get(runner.get_config_hash(make_job()), "program.jar")
+    assert entry.status == SUCCESS and entry.config_str == "--opt A"
+
+
+def test_failed_job_is_not_retried(tmp_path):
+    runner = CountingRunner(fail=True)
+    assert runner.run_job(make_job(), str(tmp_path)) is None
+    assert runner.run_job(make_job(), str(tmp_path)) is None
+    assert runner.runs == 1
+    entry = get_manifest(tmp_path).get(runner.get_config_hash(make_job()), "program.jar")
+    assert entry.status == ERROR and "tool crashed" in entry.exit_reason
+
+
+def test_legacy_results_are_imported(tmp_path):
+    runner = CountingRunner()
+    job = make_job()
+    with open(runner.get_output(str(tmp_path), job), 'w') as f:
+        f.write("result\n")
+    with open(runner.get_time_file(str(tmp_path), job), 'w') as f:
+        f.write("12.5\n")
+    finished = runner.run_job(job, str(tmp_path))
+    assert runner.runs == 0
+    assert finished.execution_time == 12.5
+    assert len(JobManifest(tmp_path)) == 1
+
+
+def test_legacy_import_resumes_until_complete(tmp_path):
+    runner = CountingRunner()
+    jobs = [make_job(), make_job()]
+    jobs[1].target = BenchmarkRecord("/benchmarks/other.jar")
+    for job in jobs:
+        with open(runner.get_output(str(tmp_path), job), 'w') as f:
+            f.write("result\n")
+        with open(runner.get_time_file(str(tmp_path), job), 'w') as f:
+            f.write("1.0\n")
+    runner.run_job(jobs[0], str(tmp_path))
+    # A crash before the second job was looked up: the restarted run still imports it.
+    manifest_module._manifests.clear()
+    assert runner.run_job(jobs[1], str(tmp_path)).execution_time == 1.0
+    assert runner.runs == 0
+
+    get_manifest(tmp_path).complete_legacy_import()
+    manifest_module._manifests.clear()
+    assert not get_manifest(tmp_path).legacy_import_pending
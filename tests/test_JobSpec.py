@@ -0,0 +1,82 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+import dill as pickle
+
+from src.ecstatic.debugging.AbstractDeltaDebugger import DeltaDebuggingJob, ViolationReproduced
+from src.ecstatic.debugging.JobSpec import JobSpec, load_options
+from src.ecstatic.debugging.ProbeCache import ProbeCache
+from src.ecstatic.models.Level import Level
+from src.ecstatic.readers import ReaderFactory
+from src.ecstatic.runners import RunnerFactory
+from src.ecstatic.util.PartialOrder import PartialOrder, PartialOrderType
+from src.ecstatic.util.PotentialViolation import PotentialViolation
+from src.ecstatic.util.UtilClasses import BenchmarkRecord, FinishedFuzzingJob, FuzzingJob
+from src.ecstatic.violation_checkers import ViolationCheckerFactory
+from src.ecstatic.violation_checkers.CallgraphViolationChecker import CallgraphViolationChecker
+
+
+def make_job(tmp_path) -> DeltaDebuggingJob:
+    options = load_options('soot')
+    optimize = options['optimize']
+    default = {o: o.get_default() for o in options.values() if o.get_default() is not None}
+    jobs = []
+    target = BenchmarkRecord('/benchmarks/app.jar', sources=['/benchmarks/src'], build_script='/benchmarks/build.sh')
+    for level in ['TRUE', 'FALSE']:
+        fuzzing_job = FuzzingJob({**default, optimize: Level('optimize', level)}, optimize, target, 2)
+        jobs.append(FinishedFuzzingJob(fuzzing_job, 10.0, str(tmp_path / f'{level}.txt')))
+    partial_orders = (PartialOrder(Level('optimize', 'TRUE'), PartialOrderType.MORE_SOUND_THAN,
+                                   Level('optimize', 'FALSE'), optimize),)
+    # The results of the original pair, which a pickled job carries along.
+    diffs = (frozenset(f'<A: void m{i}()> -> <B: void n{i}()>' for i in range(5000)), frozenset())
+    pv = PotentialViolation(partial_orders[0], jobs[0], jobs[1], frozenset, frozenset, diffs=diffs)
+    runner = RunnerFactory.get_runner_for_tool('soot')
+    runner.timeout = 5
+    runner.shard_depth = 2
+    reader = ReaderFactory.get_reader_for_task_and_tool('cg', 'soot')
+    checker = ViolationCheckerFactory.get_violation_checker_for_task('cg', 'soot', jobs=4, reader=reader,
+                                                                     output_folder=tmp_path / 'violations')
+    return DeltaDebuggingJob(ViolationReproduced(partial_orders), pv, runner, reader, checker,
+                             ProbeCache(tmp_path / 'outputs', tmp_path / 'session'))
+
+
+def test_spec_rebuilds_job(tmp_path):
+    job = make_job(tmp_path)
+    JobSpec.from_job(job, 'soot', 'cg').save(tmp_path / 'job.json')
+    rebuilt = JobSpec.load(tmp_path / 'job.json').to_job()
+
+    assert rebuilt.predicate == job.predicate
+    for original, new in [(job.potential_violation.job1.job, rebuilt.potential_violation.job1.job),
+                          (job.potential_violation.job2.job, rebuilt.potential_violation.job2.job)]:
+        assert new == original and new.sub_campaign == 2
+        assert rebuilt.runner.dict_to_config_str(new.configuration) == \
+               job.runner.dict_to_config_str(original.configuration)
+        assert rebuilt.runner.get_config_hash(new) == job.runner.get_config_hash(original)
+    assert (rebuilt.runner.timeout, rebuilt.runner.shard_depth) == (5, 2)
+    assert isinstance(rebuilt.violation_checker, CallgraphViolationChecker) and rebuilt.violation_checker.jobs == 4
+    assert rebuilt.probe_cache.session_location == tmp_path / 'session'
+
+    with open(tmp_path / 'job.pickle', 'wb') as f:
+        pickle.dump(job, f)
+    assert os.path.getsize(tmp_path / 'job.json') * 50 < os.path.getsize(tmp_path / 'job.pickle')
+
+
+def test_other_predicates_are_not_described(tmp_path):
+    job = make_job(tmp_path)
+    job.predicate = lambda pv: pv.is_violation
+    assert JobSpec.from_job(job, 'soot', 'cg') is None
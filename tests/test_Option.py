@@ -14,6 +14,11 @@
 #
 #      You should have received a copy of the GNU General Public License
 #      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
 from hypothesis import given, strategies, assume
 
 from src.ecstatic.models.Option import Option
@@ -54,4 +59,18 @@ def test_implicit_soundness_orders(option_name: str, level1_name: str, level2_na
     assert option.is_more_sound(level1_name, level2_name) and \
            option.is_more_sound(level2_name, level1_name) and \
            not option.is_more_sound(level1_name, level2_name, allow_implicit=False) and \
-           not option.is_more_sound(level2_name, level1_name, allow_implicit=False)
\ No newline at end of file
+           not option.is_more_sound(level2_name, level1_name, allow_implicit=False)
+
+def test_pickled_options_are_rehashed():
+    """Options pickled in another process (e.g., a worker with another hash seed) hash like local ones."""
+    script = ('import pickle, sys\n'
+              'from src.ecstatic.models.Option import Option\n'
+              'o = Option("opt")\n'
+              'o.add_level("A")\n'
+              'hash(o)\n'
+              'sys.stdout.buffer.write(pickle.dumps(o))\n')
+    pickled = subprocess.run([sys.executable, '-c', script], capture_output=True, check=True,
+                             env={'PYTHONHASHSEED': '1', 'PYTHONPATH': str(Path(__file__).parent.parent)}).stdout
+    option = Option("opt")
+    option.add_level("A")
+    assert hash(pickle.loads(pickled)) == hash(option)
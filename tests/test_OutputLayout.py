@@ -0,0 +1,55 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+import pytest
+
+from src.ecstatic.util.JobManifest import JobManifest
+from src.ecstatic.util.OutputLayout import shard_directory, migrate
+from tests.helpers import CountingRunner, make_job
+
+
+def test_shard_directory():
+    assert shard_directory("campaign0", "abcdef", 0) == "campaign0"
+    assert shard_directory("campaign0", "abcdef", 2) == os.path.join("campaign0", "ab", "cd")
+    with pytest.raises(ValueError):
+        shard_directory("campaign0", "abcdef", 4)
+
+
+def test_sharded_results_are_reused(tmp_path):
+    runner = CountingRunner()
+    runner.shard_depth = 2
+    finished = runner.run_job(make_job(), str(tmp_path))
+    config_hash = runner.get_config_hash(make_job())
+    assert os.path.dirname(finished.results_location) == shard_directory(str(tmp_path), config_hash, 2)
+    runner.run_job(make_job(), str(tmp_path))
+    assert runner.runs == 1
+
+
+def test_migrate_moves_results_and_updates_manifest(tmp_path):
+    runner = CountingRunner()
+    flat = runner.run_job(make_job(), str(tmp_path))
+    assert migrate(str(tmp_path), 2) == 2  # The result and its log.
+    assert not os.path.exists(flat.results_location)
+
+    sharded = CountingRunner()
+    sharded.shard_depth = 2
+    finished = sharded.run_job(make_job(), str(tmp_path))
+    assert sharded.runs == 0
+    assert os.path.exists(finished.results_location)
+    assert finished.results_location == sharded.get_output(str(tmp_path), make_job())
+    assert len({e.key for e in JobManifest(tmp_path).entries()}) == 1
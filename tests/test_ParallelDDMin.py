@@ -0,0 +1,58 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import threading
+import time
+
+import pytest
+
+from src.ecstatic.debugging.ParallelDDMin import ParallelDDMin, ReductionMode
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+
+
+@pytest.mark.parametrize("mode", list(ReductionMode))
+def test_reduces_to_the_failure_inducing_units(mode):
+    failure = {3, 17, 18}
+    ddmin = ParallelDDMin(lambda units: failure <= set(units), SlotScheduler(4), mode)
+    assert ddmin.reduce(list(range(40))) == [3, 17, 18]
+    assert ddmin.probes > 0
+
+
+def test_speculative_probes_respect_the_scheduler():
+    scheduler = SlotScheduler(3)
+    running = []
+    lock = threading.Lock()
+
+    def test(units):
+        with lock:
+            running.append(scheduler.busy)
+        time.sleep(0.01)
+        return 5 in units
+
+    ddmin = ParallelDDMin(test, scheduler, ReductionMode.SPECULATIVE)
+    assert ddmin.reduce(list(range(16))) == [5]
+    assert max(running) <= 3 and scheduler.peak <= 3
+
+
+def test_cancelled_waiters_give_up():
+    scheduler = SlotScheduler(1)
+    cancelled = threading.Event()
+    assert scheduler.acquire()
+    cancelled.set()
+    assert not scheduler.acquire(cancelled)
+    scheduler.release()
+    with scheduler.slot() as acquired:
+        assert acquired and scheduler.busy == 1
@@ -0,0 +1,55 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+from src.ecstatic.debugging.PredicateClient import ask
+from src.ecstatic.debugging.PredicateServer import PredicateServer
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+
+
+def test_probes_are_answered_in_fresh_folders(tmp_path):
+    folders = []
+
+    def predicate(output_folder, pool):
+        folders.append(output_folder)
+        # The pool is kept for the whole session.
+        return pool.map(len, [[1], [1, 2]]) == [1, 2] and len(folders) != 2
+
+    with PredicateServer(predicate, str(tmp_path)) as server:
+        assert [ask(server.socket_path) for _ in range(3)] == [0, 1, 0]
+    assert server.probes == 3
+    assert len(set(folders)) == 3 and all(os.path.dirname(f) == str(tmp_path) for f in folders)
+    assert not os.path.exists(server.socket_path)
+
+
+def test_crashing_probe_does_not_hold(tmp_path):
+    def predicate(output_folder, pool):
+        raise RuntimeError("Could not run both jobs.")
+
+    with PredicateServer(predicate, str(tmp_path)) as server:
+        assert ask(server.socket_path) == 1
+
+
+def test_probes_wait_for_a_slot(tmp_path):
+    scheduler = SlotScheduler(1)
+
+    def predicate(output_folder, pool):
+        return scheduler.busy == 1
+
+    with PredicateServer(predicate, str(tmp_path), scheduler) as server:
+        assert ask(server.socket_path) == 0
+    assert scheduler.granted == 1 and scheduler.busy == 0
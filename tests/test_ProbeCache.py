@@ -0,0 +1,72 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import multiprocessing
+
+from src.ecstatic.debugging.ProbeCache import ProbeCache
+from src.ecstatic.util.UtilClasses import BenchmarkRecord
+
+
+def make_variant(root, source, binary):
+    (root / "src").mkdir(exist_ok=True, parents=True)
+    (root / "src/Main.java").write_text(source)
+    (root / "app.jar").write_text(binary)
+    return BenchmarkRecord(str(root / "app.jar"), sources=[str(root / "src")])
+
+
+def test_variants_are_recognized_by_sources_or_build_output(tmp_path):
+    cache = ProbeCache(tmp_path / "outputs", tmp_path / "session")
+    target = make_variant(tmp_path / "program", "class Main {}", "jar1")
+    keys = cache.variant_keys(target)
+    assert cache.get_verdict(keys) is None
+    cache.put_verdict(keys, True)
+
+    # Rebuilt with a new timestamp: same sources.
+    make_variant(tmp_path / "program", "class Main {}", "jar2")
+    assert cache.get_verdict(cache.variant_keys(target)) is True
+    # Reduced, but the reduction did not change the build output.
+    make_variant(tmp_path / "program", "class Main { /* */ }", "jar1")
+    assert cache.get_verdict(cache.variant_keys(target)) is True
+    make_variant(tmp_path / "program", "class Main { /* */ }", "jar3")
+    assert cache.get_verdict(cache.variant_keys(target)) is None
+    assert cache.stats()["verdict_hits"] == 2 and cache.stats()["verdict_misses"] == 2
+
+
+def test_outputs_are_shared_between_sessions(tmp_path):
+    target = make_variant(tmp_path / "program", "class Main {}", "jar1")
+    output = tmp_path / "result" / "abc_app.jar.raw.gz"
+    output.parent.mkdir()
+    output.write_bytes(b"edges")
+    first = ProbeCache(tmp_path / "outputs", tmp_path / "session1")
+    first.put_output(first.variant_keys(target), "abc", str(output))
+
+    second = ProbeCache(tmp_path / "outputs", tmp_path / "session2")
+    cached = second.get_output(second.variant_keys(target), "abc")
+    assert cached.endswith(".raw.gz") and open(cached, 'rb').read() == b"edges"
+    assert second.get_output(second.variant_keys(target), "def") is None
+    assert second.summary() == "0 of 0 probes and 1 of 2 tool runs were served from the probe cache."
+
+
+def count_verdict_hits(session):
+    cache = ProbeCache(session.parent / "outputs", session)
+    for _ in range(50):
+        cache.count("verdict_hits")
+
+
+def test_counts_of_separate_processes_add_up(tmp_path):
+    with multiprocessing.Pool(4) as p:
+        p.map(count_verdict_hits, [tmp_path / "session"] * 4)
+    assert ProbeCache(tmp_path / "outputs", tmp_path / "session").stats()["verdict_hits"] == 200
@@ -0,0 +1,92 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from types import SimpleNamespace
+
+from src.ecstatic.fuzzing.generators.FuzzGenerator import FuzzGenerator
+from src.ecstatic.models.Option import Option
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util.SeenSet import SeenSet, BloomFilter
+from src.ecstatic.util.UtilClasses import FuzzingCampaign, FuzzingJob, BenchmarkRecord
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [str(i) for i in range(1000)]
+    for k in keys:
+        bloom.add(k)
+    assert all(k in bloom for k in keys)
+    assert len([i for i in range(1000, 11000) if str(i) in bloom]) < 500
+
+
+def test_seen_set_persists(tmp_path):
+    seen = SeenSet(tmp_path / "seen.sqlite")
+    seen.add("abc", "program.jar", 1, 12.5)
+    seen.add("abc", "program.jar", 2, 1.0)  # The first campaign is kept.
+    assert SeenSet(tmp_path / "seen.sqlite").get("abc", "program.jar") == (1, 12.5)
+    assert seen.get("abc", "other.jar") is None
+    assert len(seen) == 1
+
+
+def test_groups_are_only_skipped_when_fully_seen(tmp_path):
+    option = Option("opt")
+    for level in ["A", "B", "C"]:
+        option.add_level(level)
+    target = BenchmarkRecord("program.jar")
+    jobs = [FuzzingJob({option: option.get_level(l)}, option, target) for l in ["A", "B"]]
+    generator = SimpleNamespace(seen=SeenSet(tmp_path / "seen.sqlite"), campaign_index=2)
+    for j in jobs:
+        generator.seen.add(AbstractCommandLineToolRunner.dict_hash(j.configuration), "program.jar", 1, 10.0)
+
+    campaign, skipped, saved = FuzzGenerator.skip_seen_jobs(generator, FuzzingCampaign(jobs))
+    assert campaign.jobs == [] and skipped == 2 and saved == 20.0
+
+    new_job = FuzzingJob({option: option.get_level("C")}, option, target)
+    campaign, skipped, _ = FuzzGenerator.skip_seen_jobs(generator, FuzzingCampaign([*jobs, new_job]))
+    assert len(campaign.jobs) == 3 and skipped == 0
+
+    # Jobs recorded by the campaign being regenerated (e.g., after a restart) are not skipped.
+    generator.campaign_index = 1
+    campaign, skipped, _ = FuzzGenerator.skip_seen_jobs(generator, FuzzingCampaign(jobs))
+    assert len(campaign.jobs) == 2 and skipped == 0
+
+
+def test_seen_seeds_are_kept_with_their_new_mutants(tmp_path):
+    option = Option("opt")
+    for level in ["A", "B", "C"]:
+        option.add_level(level)
+    other = Option("other")
+    for level in ["X", "Y"]:
+        other.add_level(level)
+    target = BenchmarkRecord("program.jar")
+    seed = FuzzingJob({option: option.get_level("A"), other: other.get_level("X")}, None, target)
+    seen_mutant = FuzzingJob({option: option.get_level("B"), other: other.get_level("X")}, option, target)
+    new_mutant = FuzzingJob({option: option.get_level("A"), other: other.get_level("Y")}, other, target)
+    generator = SimpleNamespace(seen=SeenSet(tmp_path / "seen.sqlite"), campaign_index=2)
+    for j in [seed, seen_mutant]:
+        generator.seen.add(AbstractCommandLineToolRunner.dict_hash(j.configuration), "program.jar", 1, 10.0)
+
+    # The new mutant is compared to the seed, which is compared to the other mutant, so all of them are kept.
+    campaign, skipped, _ = FuzzGenerator.skip_seen_jobs(generator, FuzzingCampaign([seed, seen_mutant, new_mutant]))
+    assert len(campaign.jobs) == 3 and skipped == 0
+
+    # Another sub-campaign is compared separately.
+    merged = FuzzingJob({option: option.get_level("B"), other: other.get_level("X")}, option, target, sub_campaign=1)
+    merged_seed = FuzzingJob({option: option.get_level("A"), other: other.get_level("X")}, None, target,
+                             sub_campaign=1)
+    campaign, skipped, saved = FuzzGenerator.skip_seen_jobs(generator, FuzzingCampaign([seed, new_mutant,
+                                                                                         merged_seed, merged]))
+    assert campaign.jobs == [seed, new_mutant] and skipped == 2 and saved == 20.0
@@ -0,0 +1,43 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Only the code paths that use these import them.
+LAZY = ['dill', 'pathos', 'jsonschema', 'fuzzingbook', 'docker']
+
+
+def imported(module: str):
+    fin = subprocess.run([sys.executable, '-c', f'import sys, {module}; print(" ".join(sys.modules))'], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return set(fin.stdout.split())
+
+
+@pytest.mark.parametrize('module', ['src.ecstatic.Tester', 'src.ecstatic.dispatcher.Dispatcher',
+                                    'src.ecstatic.debugging.JobSpec'])
+def test_entry_points_import_lazily(module):
+    assert imported(module).isdisjoint(LAZY)
+
+
+def test_deltadebugger_imports_nothing_before_parsing_arguments():
+    assert {m for m in imported('src.ecstatic.debugging.DeltaDebuggerEntry') if m.startswith('src')} == \
+           {'src', 'src.ecstatic', 'src.ecstatic.debugging', 'src.ecstatic.debugging.DeltaDebuggerEntry'}
@@ -0,0 +1,80 @@
+#  ECSTATIC: Extensible, Customizable STatic Analysis Tester Informed by Configuration
+#
+#  Copyright (c) 2022.
+#
+#  This program is free software: you can redistribute it and/or modify
+#      it under the terms of the GNU General Public License as published by
+#      the Free Software Foundation, either version 3 of the License, or
+#      (at your option) any later version.
+#
+#      This program is distributed in the hope that it will be useful,
+#      but WITHOUT ANY WARRANTY; without even the implied warranty of
+#      MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#      GNU General Public License for more details.
+#
+#      You should have received a copy of the GNU General Public License
+#      along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import json
+from typing import Tuple
+
+from src.ecstatic.debugging.DeltaDebuggingPlanner import DeltaDebuggingPlanner
+from src.ecstatic.debugging.ViolationConfirmer import ViolationConfirmer
+from src.ecstatic.readers.SimpleLineReader import SimpleLineReader
+from src.ecstatic.runners.AbstractCommandLineToolRunner import AbstractCommandLineToolRunner
+from src.ecstatic.util.SlotScheduler import SlotScheduler
+from src.ecstatic.util.UtilClasses import FuzzingJob
+from src.ecstatic.violation_checkers.CallgraphViolationChecker import CallgraphViolationChecker
+from tests.helpers import make_results
+
+
+class RerunRunner(AbstractCommandLineToolRunner):
+    """Reproduces the outputs of make_results; unless deterministic, the extra edge of level B only appears once."""
+
+    def __init__(self, deterministic: bool):
+        super().__init__()
+        self.deterministic = deterministic
+        self.runs = 0
+        self.b_runs = 0
+
+    def try_run_job(self, job: FuzzingJob, output_folder: str) -> Tuple[str, str]:
+        self.runs += 1
+        output = self.get_output(output_folder, job)
+        with open(output, 'w') as f:
+            f.write("x\ty\tz\tw\tv\n")
+            if [l.level_name for l in job.configuration.values()] == ["B"]:
+                self.b_runs += 1
+                if self.deterministic or self.b_runs == 1:
+                    f.write("q\tr\ts\tt\tu\n")
+        return output, "log"
+
+
+def confirm(tmp_path, deterministic: bool, planner=None):
+    checker = CallgraphViolationChecker(1, SimpleLineReader(), output_folder=tmp_path, write_to_files=False)
+    violations = [v for v in checker.check_violations(make_results(tmp_path)) if v.is_violation]
+    assert len(violations) == 1
+    runner = RerunRunner(deterministic)
+    confirmer = ViolationConfirmer(runner, checker, SlotScheduler(2), repetitions=3)
+    # The same violation twice, as if found from two seeds: its jobs are only rerun once per repetition.
+    confirmed = confirmer.confirm_all(violations * 2, str(tmp_path / "confirmation"), planner)
+    with open(tmp_path / "confirmation" / "confirmation.json") as f:
+        return confirmed, runner, json.load(f)
+
+
+def test_reproducible_violations_are_confirmed(tmp_path):
+    confirmed, runner, report = confirm(tmp_path, deterministic=True)
+    assert len(confirmed) == 2
+    assert runner.runs == 2 * 3
+    assert report["flaky"] == [] and report["avoided_seconds"] == 0
+
+
+def test_flaky_violations_are_dropped(tmp_path):
+    planner = DeltaDebuggingPlanner()
+    planner.latency = {"program.jar": [50.0, 10]}
+    planner.clusters = {"earlier session": "campaign0"}
+    confirmed, runner, report = confirm(tmp_path, deterministic=False, planner=planner)
+    assert confirmed == []
+    # The second repetition no longer reproduces, so the third is not run.
+    assert runner.runs == 2 * 2
+    assert len(report["flaky"]) == 2 and report["avoided_seconds"] == 2 * 50.0
+    # Both violations are the same bug, which is recorded as flaky so that it is not planned again.
+    assert len(planner.flaky) == 1